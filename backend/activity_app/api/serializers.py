@@ -0,0 +1,23 @@
+"""
+Serializers for the activity application.
+
+This module defines the serializer rendering activity log entries.
+"""
+
+from rest_framework import serializers
+from activity_app.models import ActivityEntry
+
+
+class ActivityEntrySerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the ActivityEntry model.
+
+    The guest sandbox marker is internal and not exposed.
+    """
+
+    class Meta:
+        """Meta class defining model and fields for serialization."""
+
+        model = ActivityEntry
+        fields = ['id', 'ts', 'target', 'object_id', 'action', 'changes', 'actor']
+        read_only_fields = fields
@@ -0,0 +1,12 @@
+"""
+URL configuration for the activity API.
+
+This module defines the URL patterns for the activity feed.
+"""
+
+from django.urls import path
+from .views import ActivityFeed
+
+urlpatterns = [
+    path('', ActivityFeed.as_view(), name='activity-feed'),
+]
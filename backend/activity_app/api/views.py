@@ -0,0 +1,59 @@
+"""
+API views for the activity application.
+
+This module provides the paginated activity feed.
+"""
+
+from django.utils.dateparse import parse_datetime
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from activity_app.models import ActivityEntry
+from .serializers import ActivityEntrySerializer
+
+
+class ActivityPagination(CursorPagination):
+    """Cursor pagination over the activity log, newest entry first."""
+
+    page_size = 50
+    ordering = ('-ts', '-id')
+
+
+class ActivityFeed(generics.ListAPIView):
+    """
+    API view listing the activity log.
+
+    GET: Returns a page of activity visible to the user, newest first.
+    Optional query parameters narrow it down: ``target`` (``task`` or
+    ``contact``) with ``object`` for one object's history, and
+    ``since``/``until`` (ISO 8601) for a time range.
+    """
+
+    queryset = ActivityEntry.objects.all()
+    serializer_class = ActivityEntrySerializer
+    pagination_class = ActivityPagination
+
+    def get_queryset(self):
+        """Return the visible entries matching the query parameters."""
+        params = self.request.query_params
+        entries = super().get_queryset().visible_to(self.request.user)
+        if 'target' in params:
+            entries = entries.filter(target=params['target'])
+        if 'object' in params:
+            if 'target' not in params or not params['object'].isdigit():
+                raise ValidationError({'object': 'Needs a target and a numeric id.'})
+            entries = entries.filter(object_id=int(params['object']))
+        for name, lookup in (('since', 'ts__gte'), ('until', 'ts__lt')):
+            if name in params:
+                entries = entries.filter(**{lookup: self.parse_time(name, params[name])})
+        return entries
+
+    def parse_time(self, name, value):
+        """Parse an ISO 8601 query parameter or raise ValidationError."""
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Must be an ISO 8601 date and time.'})
+        return parsed
@@ -0,0 +1,153 @@
+"""
+Recording and pruning of the activity log.
+
+This module provides a view mixin that appends an ActivityEntry for
+every successful create, update and delete in the same transaction as
+the write itself, and the batched pruning of entries past their
+retention period.
+"""
+
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from activity_app.models import ActivityEntry
+from user_auth_app.models import is_guest
+
+# Response fields never worth logging as changes.
+SKIPPED_FIELDS = {'id', 'version'}
+
+
+def compact(value):
+    """
+    Bound the stored size of one changed value.
+
+    Strings longer than ``ACTIVITY_MAX_VALUE_LENGTH`` are cut, and lists
+    or objects whose JSON is longer are replaced by their item count, so
+    every entry stays small however large the written object is.
+    """
+    limit = settings.ACTIVITY_MAX_VALUE_LENGTH
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + '…'
+    if isinstance(value, (list, dict)):
+        if len(json.dumps(value, separators=(',', ':'), default=str)) > limit:
+            return {'items': len(value)}
+    return value
+
+
+def entry(target, object_id, action, changes, user):
+    """
+    Build one unsaved activity log entry.
+
+    Args:
+        target: ``ActivityEntry.TASK`` or ``ActivityEntry.CONTACT``.
+        object_id: The id of the written object.
+        action: One of ``ActivityEntry.ACTIONS``.
+        changes: Mapping of written fields to their new values.
+        user: The requesting user.
+    """
+    authenticated = user is not None and user.is_authenticated
+    return ActivityEntry(
+        target=target, object_id=object_id, action=action,
+        changes={
+            field: compact(value) for field, value in changes.items()
+            if field not in SKIPPED_FIELDS
+        },
+        actor=user if authenticated else None,
+        guest=user if authenticated and is_guest(user) else None,
+    )
+
+
+def record(target, object_id, action, changes, user):
+    """Append one entry to the activity log, see ``entry``."""
+    entry(target, object_id, action, changes, user).save()
+
+
+class ActivityLogMixin:
+    """
+    Mixin for list and detail views appending to the activity log.
+
+    Wraps create, update and destroy so the entry is inserted in the
+    same transaction as the write and only when it succeeded. Creates
+    log the full object, updates only the fields present in the request
+    and deletes nothing but the id. Set ``activity_target`` on the view;
+    override ``updated`` to make further writes in that transaction.
+
+    The transaction is a savepoint when the request already runs in one,
+    so a rejected write rolls back only its own changes.
+    """
+
+    activity_target = None
+
+    def create(self, request, *args, **kwargs):
+        """Create the object and log it."""
+        with transaction.atomic():
+            response = super().create(request, *args, **kwargs)
+            if response.status_code == status.HTTP_201_CREATED:
+                self.log(ActivityEntry.CREATE, response.data['id'], response.data)
+        return response
+
+    def update(self, request, *args, **kwargs):
+        """Update the object and log the written fields."""
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                written = {
+                    field: response.data[field]
+                    for field in request.data if field in response.data
+                }
+                self.log(ActivityEntry.UPDATE, response.data['id'], written)
+                self.updated(request, response)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        """Delete the object and log the deletion."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        with transaction.atomic():
+            response = super().destroy(request, *args, **kwargs)
+            if response.status_code == status.HTTP_204_NO_CONTENT:
+                self.log(ActivityEntry.DELETE, self.kwargs[lookup_url_kwarg], {})
+        return response
+
+    def updated(self, request, response):
+        """Hook run in the update's transaction after it succeeded."""
+
+    def log(self, action, object_id, changes):
+        """Record ``action`` unless the activity log is disabled."""
+        if settings.ACTIVITY_LOG_ENABLED:
+            record(self.activity_target, object_id, action, changes, self.request.user)
+
+
+def prune(days=None, batch_size=1000, now=None):
+    """
+    Delete entries older than ``days`` days in batches.
+
+    Each batch walks the ``ts`` index from the oldest entry and deletes
+    up to ``batch_size`` rows by primary key in its own transaction.
+
+    Args:
+        days: Retention in days, defaults to ``ACTIVITY_RETENTION_DAYS``.
+        batch_size: Number of entries deleted per transaction.
+        now: Reference time, defaults to the current time.
+
+    Yields:
+        int: Number of entries deleted by each batch.
+    """
+    now = now or timezone.now()
+    if days is None:
+        days = settings.ACTIVITY_RETENTION_DAYS
+    cutoff = now - timedelta(days=days)
+    while True:
+        with transaction.atomic():
+            ids = list(
+                ActivityEntry.objects.filter(ts__lt=cutoff).order_by('ts')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            ActivityEntry.objects.filter(pk__in=ids).delete()
+        if not ids:
+            return
+        yield len(ids)
@@ -0,0 +1,83 @@
+"""
+Benchmark of the activity log overhead on the task update path.
+
+Sends the same PATCH to the task detail view with the activity log
+enabled and disabled, reporting the median time per request and the
+average stored entry size. Runs inside a transaction that is rolled
+back, so the database is left untouched.
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from activity_app.models import ActivityEntry
+from tasks_app.api.views import TaskDetail
+from tasks_app.models import Task
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data."""
+
+
+class Command(BaseCommand):
+    """Measure per-request cost of logging task updates."""
+
+    help = 'Benchmark the activity log overhead on task updates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['requests'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Benchmark data rolled back.')
+
+    def run(self, count):
+        user = User.objects.create_user('bench-activity')
+        task = Task.objects.create(
+            title='Benchmark', priority=2, dueDate='2025-06-01',
+            description='x' * 2000, assignedTo=[1, 2],
+        )
+        factory = APIRequestFactory()
+        view = TaskDetail.as_view(throttle_classes=[])
+
+        def patch(index):
+            request = factory.patch(
+                f'/api/v1/task/{task.pk}/',
+                {'status': index % 4 + 1, 'description': 'y' * 2000},
+                format='json',
+            )
+            force_authenticate(request, user)
+            started = time.perf_counter()
+            view(request, pk=task.pk)
+            return (time.perf_counter() - started) * 1000
+
+        results = {}
+        for enabled in (False, True, False, True):
+            with override_settings(ACTIVITY_LOG_ENABLED=enabled):
+                samples = sorted(patch(index) for index in range(count))
+            results.setdefault(enabled, []).append(samples[len(samples) // 2])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT AVG(LENGTH(changes)) FROM activity_app_activityentry'
+            )
+            (size,) = cursor.fetchone()
+        off, on = min(results[False]), min(results[True])
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{count} task PATCHes per run, median ms per request'
+        ))
+        self.stdout.write(f'log disabled  {off:>8.3f} ms')
+        self.stdout.write(f'log enabled   {on:>8.3f} ms  (+{on - off:.3f} ms)')
+        self.stdout.write(
+            f'{ActivityEntry.objects.count()} entries, '
+            f'{size or 0:.0f} B of changes on average'
+        )
@@ -0,0 +1,27 @@
+"""
+Management command deleting activity entries past their retention.
+"""
+
+from django.core.management.base import BaseCommand
+
+from activity_app.log import prune
+
+
+class Command(BaseCommand):
+    """Prune the activity log in batches."""
+
+    help = 'Delete activity log entries older than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Retention in days (default: ACTIVITY_RETENTION_DAYS).'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = 0
+        for deleted in prune(options['days'], options['batch_size']):
+            total += deleted
+            self.stdout.write(f'Pruned {total} entries so far...')
+        self.stdout.write(self.style.SUCCESS(f'Pruned {total} activity entries.'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activityentry',
+            index=models.Index(fields=['guest', '-ts', '-id'], name='activity_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+"""
+Activity log model definitions for the activity application.
+
+This module contains the ActivityEntry model, an append-only record of
+every create, update and delete of tasks and contacts made through the
+API.
+"""
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+
+from user_auth_app.models import is_guest
+
+
+class ActivityQuerySet(models.QuerySet):
+    """QuerySet adding per-user visibility rules for activity entries."""
+
+    def visible_to(self, user):
+        """
+        Restrict the entries to those ``user`` may see.
+
+        Guests only see the activity of their own sandbox; everyone else
+        sees the shared activity without any guest's.
+        """
+        if is_guest(user):
+            return self.filter(guest=user)
+        return self.filter(guest__isnull=True)
+
+
+class ActivityEntry(models.Model):
+    """
+    Model representing one write to a task or contact.
+
+    Entries are only ever inserted and pruned by age. Updates store just
+    the fields the request wrote, with their new values, and long values
+    are shortened. The log records API writes only: contact merges,
+    archiving, restores and admin edits change rows without an entry,
+    so an object's earlier values cannot be rebuilt from its entries.
+
+    Attributes:
+        ts: When the write happened.
+        target: The kind of object written, ``task`` or ``contact``.
+        object_id: The id of the written object.
+        action: ``create``, ``update`` or ``delete``.
+        changes: JSON object mapping written fields to their new values.
+        actor: The User who made the write, if authenticated.
+        guest: The guest whose sandbox was written, so guest activity
+            stays private and disappears with the guest.
+    """
+
+    TASK = 'task'
+    CONTACT = 'contact'
+    TARGETS = [(TASK, 'Task'), (CONTACT, 'Contact')]
+
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = [(CREATE, 'Create'), (UPDATE, 'Update'), (DELETE, 'Delete')]
+
+    ts = models.DateTimeField(default=timezone.now, db_index=True)
+    target = models.CharField(max_length=8, choices=TARGETS)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    changes = models.JSONField(default=dict, blank=True)
+    actor = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='+'
+    )
+    guest = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    objects = ActivityQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['target', 'object_id', 'ts'], name='activity_object_ts_idx'
+            ),
+            # The feed: one visibility (a guest or the shared board),
+            # newest first, read in index order without a sort.
+            models.Index(
+                fields=['guest', '-ts', '-id'], name='activity_feed_idx'
+            ),
+        ]
+
+    def __str__(self):
+        """Return a string representation of the entry."""
+        return f"{self.target} {self.object_id} {self.action}"
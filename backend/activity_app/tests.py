@@ -0,0 +1,98 @@
+"""
+Tests for the activity application API.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from activity_app.log import prune
+from activity_app.models import ActivityEntry
+from core.queryplan import QueryPlanTestMixin
+from user_auth_app.models import GuestAccount
+
+
+class ActivityLogTests(APITestCase):
+    """Task and contact writes are logged and served as a feed."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.task = self.client.post('/api/v1/task/', {
+            'title': 'Card', 'priority': 1, 'dueDate': '2025-06-01',
+        }, format='json').json()
+
+    def history(self, target, pk):
+        url = f'/api/v1/activity/?target={target}&object={pk}'
+        return self.client.get(url).json()['results']
+
+    def test_task_writes_are_logged_newest_first(self):
+        url = f'/api/v1/task/{self.task["id"]}/'
+        self.client.patch(url, {'status': 2, 'assignedTo': [3]}, format='json')
+        self.client.delete(url)
+        entries = self.history('task', self.task['id'])
+        self.assertEqual([e['action'] for e in entries], ['delete', 'update', 'create'])
+        self.assertEqual(entries[1]['changes'], {'status': 2, 'assignedTo': [3]})
+        self.assertEqual(entries[2]['changes']['title'], 'Card')
+        self.assertEqual(entries[0]['actor'], self.user.pk)
+
+    def test_failed_writes_are_not_logged(self):
+        url = f'/api/v1/task/{self.task["id"]}/'
+        response = self.client.patch(url, {'status': 2}, format='json', HTTP_IF_MATCH='"9"')
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(len(self.history('task', self.task['id'])), 1)
+
+    @override_settings(ACTIVITY_MAX_VALUE_LENGTH=10)
+    def test_large_values_are_compacted(self):
+        contact = self.client.post('/api/v1/contact/', {
+            'firstName': 'Bartholomew', 'lastName': 'Li', 'email': 'b@example.com',
+            'phoneNumber': '123',
+        }, format='json').json()
+        changes = self.history('contact', contact['id'])[0]['changes']
+        self.assertEqual(changes['firstName'], 'Bartholome…')
+        self.assertEqual(changes['lastName'], 'Li')
+
+    def test_prune_deletes_old_entries_in_batches(self):
+        ActivityEntry.objects.update(ts=timezone.now() - timedelta(days=100))
+        self.client.patch(f'/api/v1/task/{self.task["id"]}/', {'status': 2}, format='json')
+        self.assertEqual(list(prune(days=90, batch_size=1)), [1])
+        self.assertEqual(ActivityEntry.objects.count(), 1)
+
+
+class ActivityQueryPlanTests(QueryPlanTestMixin, APITestCase):
+    """Feed pages are read in index order, never sorted as a whole."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.guest = User.objects.create_user('guest-1', password='pw-12345678')
+        GuestAccount.objects.create(user=self.guest)
+        now = timezone.now()
+        ActivityEntry.objects.bulk_create(
+            ActivityEntry(
+                ts=now - timedelta(minutes=index), target=ActivityEntry.TASK,
+                object_id=index % 7, action=ActivityEntry.UPDATE,
+                guest=self.guest if index % 3 == 0 else None,
+            )
+            for index in range(120)
+        )
+
+    def test_feed_pages_follow_the_index(self):
+        self.client.force_authenticate(self.user)
+        first = self.assertHotPath('get', '/api/v1/activity/', queries=2, ordered=True)
+        self.assertHotPath('get', first.json()['next'], queries=2, ordered=True)
+        self.assertHotPath(
+            'get', '/api/v1/activity/?target=task&object=3', queries=2, ordered=True
+        )
+        self.client.force_authenticate(self.guest)
+        self.assertHotPath('get', '/api/v1/activity/', queries=2, ordered=True)
+
+    def test_dropped_feed_index_fails(self):
+        self.client.force_authenticate(self.user)
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX activity_feed_idx')
+        with self.assertRaisesRegex(AssertionError, 'sorts its rows'):
+            self.assertHotPath('get', '/api/v1/activity/', queries=2, ordered=True)
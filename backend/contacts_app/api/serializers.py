@@ -7,6 +7,7 @@ to and from JSON representations.
 
 from rest_framework import serializers
 from contacts_app.models import Contact
+from user_auth_app.models import is_guest
 
 
 class ContactSerializer(serializers.ModelSerializer):
@@ -21,4 +22,36 @@ class ContactSerializer(serializers.ModelSerializer):
         """Meta class defining model and fields for serialization."""
 
         model = Contact
-        fields = ['id', 'firstName', 'lastName', 'email', 'phoneNumber', 'uid']
+        fields = [
+            'id', 'firstName', 'lastName', 'email', 'phoneNumber', 'uid',
+            'version',
+        ]
+        read_only_fields = ['version']
+
+    def validate_uid(self, value):
+        """
+        Keep contacts where they were created.
+
+        The owner of an existing contact cannot be changed, and a new
+        contact can only be put into a guest's sandbox by that guest.
+        """
+        if self.instance is not None:
+            if value != self.instance.uid:
+                raise serializers.ValidationError(
+                    'The owner of a contact cannot be changed.'
+                )
+            return value
+        request = self.context.get('request')
+        if is_guest(value) and value != getattr(request, 'user', None):
+            raise serializers.ValidationError(
+                "Contacts cannot be added to another guest's sandbox."
+            )
+        return value
+
+
+class ContactMergeSerializer(serializers.Serializer):
+    """Serializer for the ids of the contacts to merge into one."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), min_length=2, max_length=1000
+    )
@@ -5,9 +5,11 @@ This module defines the URL patterns for contact-related API endpoints.
 """
 
 from django.urls import path
-from .views import ContactDetail, ContactsList
+from .views import ContactDetail, ContactMerge, ContactsList, DuplicateContactsList
 
 urlpatterns = [
     path('', ContactsList.as_view(), name='contact-list'),
     path('<int:pk>/', ContactDetail.as_view(), name='contact-detail'),
+    path('duplicates/', DuplicateContactsList.as_view(), name='contact-duplicates'),
+    path('merge/', ContactMerge.as_view(), name='contact-merge'),
 ]
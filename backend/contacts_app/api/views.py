@@ -2,34 +2,124 @@
 API views for the contacts application.
 
 This module provides API endpoints for listing, creating, retrieving,
-updating, and deleting contacts.
+updating, and deleting contacts, and for finding and merging duplicates.
 """
 
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from activity_app.log import ActivityLogMixin
+from activity_app.models import ActivityEntry
+from core.concurrency import VersionedUpdateMixin
+from core.idempotency import IdempotencyMixin
+from core.streaming import StreamingListMixin
+from contacts_app.dedup import find_clusters, merge
 from contacts_app.models import Contact
-from .serializers import ContactSerializer
+from user_auth_app.models import is_guest
+from .serializers import ContactMergeSerializer, ContactSerializer
 
 
-class ContactsList(generics.ListCreateAPIView):
+class ContactsList(
+    StreamingListMixin, IdempotencyMixin, ActivityLogMixin, generics.ListCreateAPIView
+):
     """
     API view to list all contacts or create a new contact.
 
-    GET: Returns a list of all contacts.
+    GET: Returns a list of all contacts visible to the user.
     POST: Creates a new contact.
+
+    Writes sent with an Idempotency-Key header are executed once and
+    retries are answered from the stored response. Creations are
+    recorded in the activity log. The list is streamed with
+    ``LIST_STREAMING``.
     """
 
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
+    activity_target = ActivityEntry.CONTACT
+
+    def get_queryset(self):
+        """Return the contacts visible to the requesting user."""
+        return super().get_queryset().visible_to(self.request.user)
+
+    def perform_create(self, serializer):
+        """Keep contacts created by guests inside their sandbox."""
+        if is_guest(self.request.user):
+            serializer.save(uid=self.request.user)
+        else:
+            serializer.save()
 
 
-class ContactDetail(generics.RetrieveUpdateDestroyAPIView):
+class ContactDetail(
+    IdempotencyMixin, ActivityLogMixin, VersionedUpdateMixin,
+    generics.RetrieveUpdateDestroyAPIView
+):
     """
     API view to retrieve, update, or delete a specific contact.
 
     GET: Returns details of a specific contact by ID.
     PUT/PATCH: Updates a specific contact by ID.
     DELETE: Deletes a specific contact by ID.
+
+    Updates and deletes are conditional on the version sent in the
+    If-Match header and answer 412 when the contact changed meanwhile.
+    Both are recorded in the activity log.
     """
 
     queryset = Contact.objects.all()
-    serializer_class = ContactSerializer
\ No newline at end of file
+    serializer_class = ContactSerializer
+    activity_target = ActivityEntry.CONTACT
+
+    def get_queryset(self):
+        """Return the contacts visible to the requesting user."""
+        return super().get_queryset().visible_to(self.request.user)
+
+
+class DuplicateContactsList(APIView):
+    """
+    API view listing clusters of duplicate contacts.
+
+    GET: Returns the visible contacts that share a normalized email or
+    phone number, as clusters of contacts, largest cluster first.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return the duplicate clusters visible to the user."""
+        contacts = Contact.objects.visible_to(request.user)
+        clusters = find_clusters(contacts)
+        rows = contacts.in_bulk([pk for ids in clusters for pk in ids])
+        return Response([
+            ContactSerializer([rows[pk] for pk in ids], many=True).data
+            for ids in clusters
+        ])
+
+
+class ContactMerge(APIView):
+    """
+    API view merging duplicate contacts.
+
+    POST: Merges the contacts ``ids`` into the one linked to an account,
+    or else the one with the lowest id; contacts of two accounts cannot
+    be merged. Tasks assigned to a merged contact are reassigned to the
+    kept one, which is returned.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Merge the requested contacts."""
+        serializer = ContactMergeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = sorted(set(serializer.validated_data['ids']))
+        visible = Contact.objects.visible_to(request.user).filter(pk__in=ids)
+        owners = list(visible.values_list('uid', flat=True))
+        if len(owners) != len(ids):
+            raise ValidationError({'ids': 'Unknown contacts.'})
+        if len({owner for owner in owners if owner is not None}) > 1:
+            raise ValidationError({'ids': 'Contacts of different accounts cannot be merged.'})
+        [kept] = merge([ids], user=request.user)['kept']
+        return Response(ContactSerializer(Contact.objects.get(pk=kept)).data)
@@ -0,0 +1,293 @@
+"""
+Duplicate detection and merging of contacts.
+
+This module finds clusters of contacts sharing a normalized email or
+phone number. Each key column is a blocking key: only contacts within a
+block of equal keys are candidates, found with an index-backed GROUP BY
+instead of comparing every pair. Blocks sharing a contact are joined
+into one cluster. Merging rewrites the merged contacts' ids in
+``assignedTo`` of all affected live and archived tasks in batches and
+deletes the duplicates; ``merge_all`` does so in one short transaction
+per chunk of clusters. The shared contacts and each guest's sandbox are
+deduplicated on their own (``owner_groups``), and a contact linked to
+an account is never merged into another account's contact.
+"""
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Length
+
+from activity_app.log import entry
+from activity_app.models import ActivityEntry
+from contacts_app.models import Contact
+from tasks_app.models import ArchivedTask, Task, TaskAssignment
+from tasks_app.workload import ASSIGNMENT_COLUMNS, replace_assignments
+from user_auth_app.models import GuestAccount
+
+# Block keys; phone keys shorter than MIN_PHONE_KEY digits are too
+# unspecific to block on.
+KEYS = ('emailKey', 'phoneKey')
+MIN_PHONE_KEY = 6
+
+# Contact fields copied from a duplicate when the kept contact lacks them.
+FILLED_FIELDS = ('firstName', 'lastName', 'email', 'phoneNumber')
+
+
+def blocks(contacts, key):
+    """
+    Return the ids of the contacts sharing a value of ``key``.
+
+    Args:
+        contacts: Contact queryset to search.
+        key: ``'emailKey'`` or ``'phoneKey'``.
+
+    Yields:
+        list: Ids of one block of at least two contacts, ascending.
+    """
+    candidates = contacts.exclude(**{key: ''})
+    if key == 'phoneKey':
+        candidates = candidates.annotate(key_length=Length(key)).filter(
+            key_length__gte=MIN_PHONE_KEY
+        )
+    shared = (
+        candidates.order_by().values(key).annotate(count=Count('id'))
+        .filter(count__gt=1).values(key)
+    )
+    rows = (
+        contacts.filter(**{f'{key}__in': shared}).order_by(key, 'id')
+        .values_list(key, 'id').iterator(chunk_size=10000)
+    )
+    block, current = [], None
+    for value, pk in rows:
+        if value != current and len(block) > 1:
+            yield block
+        if value != current:
+            block, current = [], value
+        block.append(pk)
+    if len(block) > 1:
+        yield block
+
+
+def find_clusters(contacts):
+    """
+    Group duplicate contacts into clusters.
+
+    Contacts are joined when they share an email key or a phone key,
+    transitively, with a union-find over the blocks.
+
+    Args:
+        contacts: Contact queryset to search, typically already
+            restricted to one user's visible contacts.
+
+    Returns:
+        list: Clusters as ascending id lists, largest first.
+    """
+    parent = {}
+
+    def find(pk):
+        root = parent.setdefault(pk, pk)
+        while parent[root] != root:
+            root = parent[root]
+        while parent[pk] != root:
+            parent[pk], pk = root, parent[pk]
+        return root
+
+    for key in KEYS:
+        for block in blocks(contacts, key):
+            roots = {find(pk) for pk in block}
+            root = min(roots)
+            for other in roots:
+                parent[other] = root
+
+    clusters = {}
+    for pk in parent:
+        clusters.setdefault(find(pk), []).append(pk)
+    return sorted(
+        (sorted(ids) for ids in clusters.values()),
+        key=lambda ids: (-len(ids), ids[0]),
+    )
+
+
+def affected_tasks(merged, model=Task):
+    """Return a queryset of the ``model`` tasks assigned to any id in ``merged``."""
+    if model is Task and settings.TASK_ASSIGNMENT_INDEX:
+        return Task.objects.filter(
+            pk__in=TaskAssignment.objects.filter(contact_id__in=merged)
+            .values('task_id')
+        )
+    return model.objects.exclude(assignedTo=[])
+
+
+def rewrite_assignments(mapping, batch_size=1000, model=Task):
+    """
+    Point task assignments at the kept contacts.
+
+    Args:
+        mapping: Dict of merged contact id -> kept contact id.
+        batch_size: Tasks rewritten per statement.
+        model: ``Task``, or ``ArchivedTask`` for the archived tasks.
+
+    Returns:
+        int: Number of tasks rewritten.
+    """
+    columns = ASSIGNMENT_COLUMNS if model is Task else ('id', 'assignedTo')
+    tasks = affected_tasks(list(mapping), model).order_by('pk')
+    rewritten, last = 0, 0
+    while True:
+        rows = list(
+            tasks.filter(pk__gt=last).select_for_update()
+            .values(*columns)[:batch_size]
+        )
+        if not rows:
+            return rewritten
+        last = rows[-1]['id']
+        changed = []
+        for row in rows:
+            if not isinstance(row['assignedTo'], list):
+                continue
+            assigned = []
+            for contact in row['assignedTo']:
+                try:
+                    contact = mapping.get(int(contact), contact)
+                except (TypeError, ValueError):
+                    pass
+                if contact not in assigned:
+                    assigned.append(contact)
+            if assigned != row['assignedTo']:
+                changed.append({**row, 'assignedTo': assigned})
+        if changed:
+            update_assigned(changed, model)
+            if model is Task:
+                replace_assignments(changed)
+            rewritten += len(changed)
+
+
+def update_assigned(rows, model=Task):
+    """
+    Write new ``assignedTo`` lists and bump the tasks' versions.
+
+    One prepared statement executed for every row; ``bulk_update``
+    would build a CASE expression per row and is many times slower.
+    """
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    field = model._meta.get_field('assignedTo')
+    sql = (
+        f'UPDATE {quote(model._meta.db_table)} SET {quote(field.column)} = %s, '
+        f'{quote("version")} = {quote("version")} + 1 WHERE {quote("id")} = %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (field.get_db_prep_save(row['assignedTo'], connection), row['id'])
+            for row in rows
+        ])
+
+
+def survivor(contacts):
+    """
+    Return the contact a cluster is merged into.
+
+    A contact linked to an account (``uid``) is kept so the link
+    survives the merge; otherwise, and among linked contacts, the
+    lowest id.
+    """
+    return min(contacts, key=lambda contact: (contact.uid_id is None, contact.pk))
+
+
+def owner_groups():
+    """
+    Yield the contact querysets deduplicated on their own.
+
+    The shared contacts first, then each guest's sandbox, so a merge
+    never moves contacts between sandboxes or into the shared book.
+    """
+    yield Contact.objects.visible_to(None)
+    guests = GuestAccount.objects.order_by('user').values_list('user', flat=True)
+    for guest in guests.iterator():
+        yield Contact.objects.filter(uid=guest)
+
+
+def merge(clusters, user=None, batch_size=1000):
+    """
+    Merge each cluster into its ``survivor`` in one transaction.
+
+    The kept contact takes over any field it lacks from the duplicates
+    (in id order), live and archived tasks assigned to a duplicate are
+    reassigned to it, and the duplicates are deleted. Contacts linked to
+    an account other than the kept contact's are left out.
+
+    Args:
+        clusters: Iterable of contact id lists.
+        user: The user requesting the merge, for the activity log.
+        batch_size: Rows written per statement.
+
+    Returns:
+        dict: Numbers of ``merged`` contacts and ``tasks`` rewritten,
+        and the ids of the ``kept`` contacts in cluster order.
+    """
+    clusters = [sorted(set(ids)) for ids in clusters if len(set(ids)) > 1]
+    if not clusters:
+        return {'merged': 0, 'tasks': 0, 'kept': []}
+    with transaction.atomic():
+        rows = Contact.objects.in_bulk([pk for ids in clusters for pk in ids])
+        merges, mapping = [], {}
+        for ids in clusters:
+            contacts = [rows[pk] for pk in ids if pk in rows]
+            if len(contacts) < 2:
+                continue
+            keep = survivor(contacts)
+            # Contacts linked to another account stay as they are.
+            duplicates = [
+                contact for contact in contacts
+                if contact is not keep and contact.uid_id in (None, keep.uid_id)
+            ]
+            if not duplicates:
+                continue
+            merges.append((keep, duplicates))
+            mapping.update((duplicate.pk, keep.pk) for duplicate in duplicates)
+        if not mapping:
+            return {'merged': 0, 'tasks': 0, 'kept': []}
+        tasks = (
+            rewrite_assignments(mapping, batch_size)
+            + rewrite_assignments(mapping, batch_size, model=ArchivedTask)
+        )
+        kept, entries = [], []
+        for keep, duplicates in merges:
+            filled = {}
+            for duplicate in duplicates:
+                for field in FILLED_FIELDS:
+                    if not getattr(keep, field) and getattr(duplicate, field):
+                        filled[field] = getattr(duplicate, field)
+                        setattr(keep, field, filled[field])
+            if filled:
+                # Rare: most kept contacts already have every field.
+                Contact.objects.filter(pk=keep.pk).update(**filled)
+            kept.append(keep.pk)
+            entries.append(entry(
+                ActivityEntry.CONTACT, keep.pk, ActivityEntry.UPDATE,
+                {'mergedFrom': [duplicate.pk for duplicate in duplicates], **filled},
+                user,
+            ))
+        for start in range(0, len(kept), batch_size):
+            Contact.objects.filter(pk__in=kept[start:start + batch_size]).update(
+                version=F('version') + 1
+            )
+        if settings.ACTIVITY_LOG_ENABLED:
+            ActivityEntry.objects.bulk_create(entries, batch_size=batch_size)
+        merged = list(mapping)
+        for start in range(0, len(merged), batch_size):
+            Contact.objects.filter(pk__in=merged[start:start + batch_size]).delete()
+    return {'merged': len(mapping), 'tasks': tasks, 'kept': kept}
+
+
+def merge_all(contacts, clusters_per_batch=1000, batch_size=1000):
+    """
+    Find and merge every duplicate cluster among ``contacts``.
+
+    Yields:
+        dict: The ``merge`` result of each batch of clusters.
+    """
+    clusters = find_clusters(contacts)
+    for start in range(0, len(clusters), clusters_per_batch):
+        yield merge(clusters[start:start + clusters_per_batch], batch_size=batch_size)
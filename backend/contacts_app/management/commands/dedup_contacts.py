@@ -0,0 +1,45 @@
+"""
+Management command finding and merging duplicate contacts.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from contacts_app.dedup import find_clusters, merge_all, owner_groups
+
+
+class Command(BaseCommand):
+    """Report duplicate clusters of the shared contacts and sandboxes, or merge them."""
+
+    help = 'Find contacts sharing a normalized email or phone and optionally merge them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apply', action='store_true',
+            help='Merge every cluster into one contact, keeping account links.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if not options['apply']:
+            clusters = [
+                ids for contacts in owner_groups() for ids in find_clusters(contacts)
+            ]
+            duplicates = sum(len(ids) - 1 for ids in clusters)
+            self.stdout.write(
+                f'{len(clusters)} clusters, {duplicates} duplicate contacts '
+                f'({time.perf_counter() - started:.1f} s). Merge them with --apply.'
+            )
+            return
+        merged = tasks = 0
+        for contacts in owner_groups():
+            for result in merge_all(contacts, batch_size=options['batch_size']):
+                merged += result['merged']
+                tasks += result['tasks']
+                self.stdout.write(f'Merged {merged} contacts so far...')
+        self.stdout.write(self.style.SUCCESS(
+            f'Merged {merged} duplicate contacts, reassigned {tasks} tasks '
+            f'in {time.perf_counter() - started:.1f} s.'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts_app', '0004_alter_contact_phonenumber'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
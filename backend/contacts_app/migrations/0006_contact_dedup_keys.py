@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:12
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts_app', '0005_contact_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='emailKey',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('email')), output_field=models.CharField(max_length=254)),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='phoneKey',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Right(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(models.F('phoneNumber'), models.Value(' '), models.Value('')), models.Value('-'), models.Value('')), models.Value('('), models.Value('')), models.Value(')'), models.Value('')), models.Value('/'), models.Value('')), models.Value('.'), models.Value('')), models.Value('+'), models.Value('')), 9), output_field=models.CharField(max_length=40)),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['emailKey'], name='contact_email_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['phoneKey'], name='contact_phone_key_idx'),
+        ),
+    ]
@@ -6,8 +6,33 @@ stored in the database.
 """
 
 from django.db import models
+from django.db.models.functions import Lower, Replace, Right, Trim
 from django.contrib.auth.models import User
 
+from user_auth_app.models import GuestAccount, is_guest
+
+
+class ContactQuerySet(models.QuerySet):
+    """QuerySet adding per-user visibility rules for contacts."""
+
+    def visible_to(self, user):
+        """
+        Restrict the contacts to those ``user`` may see.
+
+        Guests only see their own sandbox contacts; everyone else sees
+        the shared contacts without any guest's contacts.
+        """
+        if is_guest(user):
+            return self.filter(uid=user)
+        return self.exclude(uid__in=GuestAccount.objects.values('user'))
+
+
+def phone_digits(expression):
+    """Strip the usual phone number punctuation from ``expression``."""
+    for char in ' -()/.+':
+        expression = Replace(expression, models.Value(char), models.Value(''))
+    return expression
+
 
 class Contact(models.Model):
     """
@@ -19,6 +44,13 @@ class Contact(models.Model):
         email: The email address of the contact.
         phoneNumber: The phone number of the contact.
         uid: Foreign key reference to the User who owns this contact.
+        version: Row version incremented on every update, used for
+            optimistic concurrency control.
+        emailKey: Trimmed, lower-cased email, maintained by the
+            database, used to find duplicates.
+        phoneKey: Last nine digits of the phone number, maintained by
+            the database, used to find duplicates regardless of
+            formatting and country prefix.
     """
 
     firstName = models.CharField(max_length=100)
@@ -28,6 +60,23 @@ class Contact(models.Model):
     uid = models.ForeignKey(
         User, null=True, blank=True, on_delete=models.CASCADE
     )
+    version = models.PositiveIntegerField(default=1)
+    emailKey = models.GeneratedField(
+        expression=Lower(Trim('email')),
+        output_field=models.CharField(max_length=254), db_persist=True,
+    )
+    phoneKey = models.GeneratedField(
+        expression=Right(phone_digits(models.F('phoneNumber')), 9),
+        output_field=models.CharField(max_length=40), db_persist=True,
+    )
+
+    objects = ContactQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['emailKey'], name='contact_email_key_idx'),
+            models.Index(fields=['phoneKey'], name='contact_phone_key_idx'),
+        ]
 
     def __str__(self):
         """Return a string representation of the contact."""
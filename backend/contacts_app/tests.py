@@ -1,3 +1,269 @@
-from django.test import TestCase
+"""
+Tests for the contacts application API.
+"""
 
-# Create your tests here.
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from contacts_app.dedup import merge, merge_all, owner_groups
+from contacts_app.models import Contact
+from core.queryplan import QueryPlanTestMixin
+from core.renderers import msgpack
+from tasks_app.models import ArchivedTask, Task, TaskAssignment
+from tasks_app.workload import ASSIGNMENT_COLUMNS, replace_assignments
+from user_auth_app.models import GuestAccount
+
+MSGPACK = 'application/msgpack'
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+class ContactMessagePackTests(APITestCase):
+    """MessagePack responses and requests must round-trip the JSON API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.contact = Contact.objects.create(
+            firstName='Ada', lastName='Lovelace', email='ada@example.com',
+            phoneNumber='+44 20 1234', uid=self.user,
+        )
+
+    def assert_same_payload(self, url):
+        as_json = self.client.get(url, HTTP_ACCEPT='application/json')
+        as_msgpack = self.client.get(url, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(as_msgpack['Content-Type'], MSGPACK)
+        self.assertEqual(msgpack.unpackb(as_msgpack.content), as_json.json())
+
+    def test_list_matches_json(self):
+        self.assert_same_payload('/api/v1/contact/')
+
+    def test_detail_matches_json(self):
+        self.assert_same_payload(f'/api/v1/contact/{self.contact.pk}/')
+
+    def test_update_from_msgpack_body(self):
+        response = self.client.patch(
+            f'/api/v1/contact/{self.contact.pk}/',
+            msgpack.packb({'phoneNumber': '+44 20 9999'}),
+            content_type=MSGPACK, HTTP_ACCEPT=MSGPACK,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(msgpack.unpackb(response.content)['phoneNumber'], '+44 20 9999')
+
+
+class ContactVersioningTests(APITestCase):
+    """Contact updates are conditional on the If-Match version."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.contact = Contact.objects.create(
+            firstName='Ada', lastName='Lovelace', email='ada@example.com',
+            phoneNumber='123', uid=self.user,
+        )
+        self.url = f'/api/v1/contact/{self.contact.pk}/'
+
+    def test_concurrent_edit_loses_with_412(self):
+        first = self.client.patch(self.url, {'lastName': 'King'}, HTTP_IF_MATCH='"1"')
+        second = self.client.patch(self.url, {'lastName': 'Byron'}, HTTP_IF_MATCH='"1"')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 412)
+        self.contact.refresh_from_db()
+        self.assertEqual((self.contact.lastName, self.contact.version), ('King', 2))
+
+    def test_owner_cannot_be_changed(self):
+        other = User.objects.create_user('other', password='pw-12345678')
+        response = self.client.patch(self.url, {'uid': other.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        # Sending the current owner back, as a full PUT does, is fine.
+        response = self.client.patch(self.url, {'uid': self.user.pk, 'lastName': 'King'})
+        self.assertEqual(response.status_code, 200)
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.uid, self.user)
+
+
+class ContactSandboxTests(APITestCase):
+    """Guests cannot move contacts out of or into a guest sandbox."""
+
+    body = {
+        'firstName': 'Grace', 'lastName': 'Hopper', 'email': 'grace@example.com',
+        'phoneNumber': '555 0100',
+    }
+
+    def setUp(self):
+        self.guest = User.objects.create_user('guest-1', password='pw-12345678')
+        self.other_guest = User.objects.create_user('guest-2', password='pw-12345678')
+        GuestAccount.objects.create(user=self.guest)
+        GuestAccount.objects.create(user=self.other_guest)
+        self.member = User.objects.create_user('member', password='pw-12345678')
+        self.contact = Contact.objects.create(firstName='Sandboxed', uid=self.guest)
+        self.client.force_authenticate(self.guest)
+
+    def test_guest_cannot_move_contact_out_of_sandbox(self):
+        url = f'/api/v1/contact/{self.contact.pk}/'
+        for owner in (self.member, self.other_guest):
+            response = self.client.patch(url, {'uid': owner.pk}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('uid', response.json())
+        response = self.client.put(
+            url, {**self.body, 'uid': None}, format='json', HTTP_IF_MATCH='"1"'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.contact.refresh_from_db()
+        self.assertEqual((self.contact.uid, self.contact.version), (self.guest, 1))
+
+    def test_guest_cannot_patch_task_owner(self):
+        task = Task.objects.create(
+            title='Mine', priority=1, dueDate='2025-06-01', owner=self.guest
+        )
+        response = self.client.patch(
+            f'/api/v1/task/{task.pk}/', {'owner': self.member.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db()
+        self.assertEqual(task.owner, self.guest)
+
+    def test_contact_cannot_be_created_in_another_sandbox(self):
+        self.client.force_authenticate(self.member)
+        response = self.client.post(
+            '/api/v1/contact/', {**self.body, 'uid': self.guest.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('uid', response.json())
+        self.assertFalse(Contact.objects.filter(firstName='Grace').exists())
+
+    def test_guest_cannot_touch_shared_contacts(self):
+        shared = Contact.objects.create(firstName='Shared', uid=self.member)
+        response = self.client.patch(
+            f'/api/v1/contact/{shared.pk}/', {'uid': self.guest.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class ContactDedupTests(APITestCase):
+    """Duplicates are found by normalized keys and merged into one."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+
+    def contact(self, email, phone, uid=None):
+        return Contact.objects.create(
+            firstName='Ada', lastName='L', email=email, phoneNumber=phone, uid=uid
+        ).pk
+
+    def test_clusters_join_email_and_phone_blocks(self):
+        first = self.contact('Ada@Example.com ', '+49 170 1234567')
+        second = self.contact('ada@example.com', '')
+        third = self.contact('other@example.com', '0170-123 4567')
+        self.contact('solo@example.com', '123')
+        self.contact('solo2@example.com', '123')
+        clusters = self.client.get('/api/v1/contact/duplicates/').json()
+        self.assertEqual(
+            [[c['id'] for c in cluster] for cluster in clusters],
+            [[first, second, third]],
+        )
+
+    def test_merge_rewrites_task_assignments(self):
+        keep = self.contact('', '030 111111')
+        duplicate = self.contact('ada@example.com', '030/111111')
+        other = self.contact('bob@example.com', '')
+        task = Task.objects.create(
+            title='T', priority=1, dueDate='2025-06-01', assignedTo=[duplicate, keep, other]
+        )
+        replace_assignments(Task.objects.filter(pk=task.pk).values(*ASSIGNMENT_COLUMNS))
+
+        response = self.client.post(
+            '/api/v1/contact/merge/', {'ids': [duplicate, keep]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], 'ada@example.com')
+        task.refresh_from_db()
+        self.assertEqual((task.assignedTo, task.version), ([keep, other], 2))
+        self.assertFalse(Contact.objects.filter(pk=duplicate).exists())
+        self.assertEqual(
+            sorted(TaskAssignment.objects.values_list('contact_id', flat=True)),
+            sorted([keep, other]),
+        )
+
+    def test_merge_keeps_the_contact_linked_to_an_account(self):
+        older = self.contact('ada@example.com', '')
+        linked = self.contact('ada@example.com', '030 111111', uid=self.user)
+        response = self.client.post(
+            '/api/v1/contact/merge/', {'ids': [older, linked]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], linked)
+        self.assertEqual(Contact.objects.get().uid, self.user)
+
+    def test_contacts_of_two_accounts_are_not_merged(self):
+        other = User.objects.create_user('other', password='pw-12345678')
+        first = self.contact('ada@example.com', '', uid=self.user)
+        second = self.contact('ada@example.com', '', uid=other)
+        response = self.client.post(
+            '/api/v1/contact/merge/', {'ids': [first, second]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Contact.objects.count(), 2)
+
+    def test_merge_keeps_other_accounts_contacts(self):
+        other = User.objects.create_user('other', password='pw-12345678')
+        first = self.contact('ada@example.com', '', uid=self.user)
+        second = self.contact('ada@example.com', '030 111111', uid=other)
+        unlinked = self.contact('', '030 111111')
+        self.assertEqual(merge([[first, second, unlinked]])['kept'], [first])
+        self.assertEqual(
+            sorted(Contact.objects.values_list('pk', flat=True)), [first, second]
+        )
+
+    def test_owner_groups_merge_apart_and_rewrite_archived_tasks(self):
+        guest = User.objects.create_user('sandboxed')
+        GuestAccount.objects.create(user=guest)
+        shared = [self.contact('ada@example.com', '') for _ in range(2)]
+        sandbox = [self.contact('ada@example.com', '', uid=guest) for _ in range(2)]
+        archived = ArchivedTask.objects.create(
+            id=999, title='Old', priority=1, dueDate='2025-06-01',
+            assignedTo=[shared[1], sandbox[1]], archivedAt=timezone.now(),
+        )
+
+        results = [
+            result for contacts in owner_groups() for result in merge_all(contacts)
+        ]
+        self.assertEqual(sum(result['merged'] for result in results), 2)
+        self.assertEqual(
+            sorted(Contact.objects.values_list('pk', flat=True)), [shared[0], sandbox[0]]
+        )
+        archived.refresh_from_db()
+        self.assertEqual((archived.assignedTo, archived.version), ([shared[0], sandbox[0]], 3))
+
+
+class ContactQueryPlanTests(QueryPlanTestMixin, APITestCase):
+    """The hot contact queries stay on their indexes and within budget."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('planner', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.contact = Contact.objects.create(
+            firstName='Ada', lastName='L', email='ada@example.com',
+            phoneNumber='+49 170 1234567', uid=self.user,
+        )
+        Contact.objects.create(firstName='Ada', lastName='L', email='Ada@Example.com')
+        Contact.objects.create(firstName='Bob', lastName='B', phoneNumber='0170-123 4567')
+
+    def test_list_and_detail(self):
+        # The address book lists every shared contact by design.
+        self.assertHotPath(
+            'get', '/api/v1/contact/', queries=2, scans={'contacts_app_contact'}
+        )
+        self.assertHotPath('get', f'/api/v1/contact/{self.contact.pk}/', queries=2)
+
+    def test_duplicates_search_key_indexes(self):
+        # Finding shared keys groups the whole key index, once per key; the
+        # contacts of each block are then searched through it.
+        response = self.assertHotPath(
+            'get', '/api/v1/contact/duplicates/', queries=4,
+            scans={'contacts_app_contact'},
+        )
+        self.assertEqual(len(response.json()), 1)
@@ -0,0 +1,113 @@
+"""
+Board bootstrap endpoint.
+
+This module serves everything the board needs on load (tasks, contacts,
+users and the activity log position) in one response, fetched with one
+query per section. Each section carries a version fingerprint; clients
+send them back to skip unchanged sections or the whole response.
+"""
+
+import hashlib
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from activity_app.models import ActivityEntry
+from contacts_app.api.serializers import ContactSerializer
+from contacts_app.models import Contact
+from tasks_app.api.serializers import TaskSerializer
+from tasks_app.models import Task
+from user_auth_app.api.serializers import UserProfileSerializer
+
+
+def fingerprint(keys):
+    """Return a short digest identifying the sequence of ``keys``."""
+    digest = hashlib.blake2b(digest_size=8)
+    for key in keys:
+        digest.update(repr(key).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def parse_versions(value):
+    """Parse ``tasks:abc,contacts:def`` into a section -> version dict."""
+    versions = {}
+    for part in (value or '').split(','):
+        section, _, version = part.strip().partition(':')
+        if section and version:
+            versions[section] = version
+    return versions
+
+
+def none_match(header, etag):
+    """
+    Return whether an ``If-None-Match`` header matches ``etag``.
+
+    The comparison is weak, as RFC 9110 prescribes for If-None-Match:
+    ``CompressionMiddleware`` hands out the tag as ``W/"..."`` on
+    compressed responses and clients echo it that way. Accepts ``*``
+    and lists of tags.
+    """
+    if not header:
+        return False
+    tags = parse_etags(header)
+    if tags == ['*']:
+        return True
+    target = etag.removeprefix('W/')
+    return any(tag.removeprefix('W/') == target for tag in tags)
+
+
+class BootstrapView(APIView):
+    """
+    API view returning the board's initial data in one response.
+
+    GET: Returns ``tasks``, ``contacts`` and ``users`` as the list
+    endpoints would, each as ``{"version": ..., "items": [...]}``, and
+    ``activity.since``, the time of the newest visible activity entry
+    to poll ``/api/v1/activity/?since=`` with. Sections whose version is
+    listed in ``?versions=tasks:<v>,contacts:<v>`` come back with
+    ``"unchanged": true`` instead of items. The response ETag combines
+    all versions and answers a matching If-None-Match, weak or strong,
+    with 304.
+
+    Runs a fixed five queries (the guest check and one per section),
+    however much data the user can see.
+    """
+
+    def get(self, request):
+        """Return the sections visible to the requesting user."""
+        user = request.user
+        tasks = TaskSerializer(Task.objects.visible_to(user), many=True).data
+        contacts = ContactSerializer(Contact.objects.visible_to(user), many=True).data
+        users = UserProfileSerializer(
+            User.objects.filter(deletion__isnull=True).filter(
+                Q(guest_account__isnull=True) | Q(pk=user.pk)
+            ),
+            many=True,
+        ).data
+        latest = (
+            ActivityEntry.objects.visible_to(user).order_by('-ts')
+            .values_list('ts', flat=True).first()
+        )
+
+        sections = {
+            'tasks': (fingerprint((t['id'], t['version']) for t in tasks), tasks),
+            'contacts': (fingerprint((c['id'], c['version']) for c in contacts), contacts),
+            'users': (fingerprint(tuple(u.values()) for u in users), users),
+        }
+        etag = '"{}"'.format('.'.join(version for version, _ in sections.values()))
+        if none_match(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers={'ETag': etag})
+
+        known = parse_versions(request.query_params.get('versions'))
+        data = {}
+        for name, (version, items) in sections.items():
+            if known.get(name) == version:
+                data[name] = {'version': version, 'unchanged': True}
+            else:
+                data[name] = {'version': version, 'items': items}
+        data['activity'] = {'since': latest}
+        return Response(data, headers={'ETag': etag})
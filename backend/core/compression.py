@@ -0,0 +1,150 @@
+"""
+Negotiated response compression for the REST API.
+
+This module provides a middleware compressing API responses with brotli
+(when installed) or gzip, based on the client's ``Accept-Encoding``.
+Streaming responses are compressed chunk by chunk.
+"""
+
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+RE_ACCEPT_ENCODING = re.compile(r'(?:^|,)\s*([a-z*]+)\s*(?:;\s*q=([0-9.]+))?', re.I)
+
+
+def accepted_encodings(header):
+    """
+    Parse an ``Accept-Encoding`` header into the set of usable codings.
+
+    Args:
+        header: The raw header value.
+
+    Returns:
+        set: Lower-cased codings whose quality value is not zero. An
+        unparsable quality value such as ``q=.`` counts as zero.
+    """
+    codings = set()
+    for coding, quality in RE_ACCEPT_ENCODING.findall(header or ''):
+        try:
+            weight = float(quality) if quality else 1.0
+        except ValueError:
+            weight = 0.0
+        if weight:
+            codings.add(coding.lower())
+    return codings
+
+
+def gzip_stream(chunks, level):
+    """Yield the gzip-compressed form of an iterable of byte chunks."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        # Flush so every produced chunk reaches the client promptly.
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def brotli_stream(chunks, quality):
+    """Yield the brotli-compressed form of an iterable of byte chunks."""
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        compressor.process(chunk)
+        data = compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Middleware compressing responses above a size threshold.
+
+    Only content types listed in ``COMPRESSION_CONTENT_TYPES`` are
+    compressed, which keeps HTML pages carrying CSRF tokens out of reach
+    of BREACH-style attacks. Brotli is preferred over gzip when the
+    client accepts both and the ``brotli`` package is installed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY
+        self.content_types = tuple(settings.COMPRESSION_CONTENT_TYPES)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def choose_encoding(self, request):
+        """Return the coding to use for ``request`` or ``None``."""
+        codings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if brotli is not None and 'br' in codings:
+            return 'br'
+        if 'gzip' in codings:
+            return 'gzip'
+        return None
+
+    def process_response(self, request, response):
+        """
+        Compress ``response`` in place when it qualifies.
+
+        Args:
+            request: The HTTP request.
+            response: The response produced by the view.
+
+        Returns:
+            HttpResponse: The (possibly compressed) response.
+        """
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in self.content_types:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            if encoding == 'br':
+                stream = brotli_stream(response.streaming_content, self.brotli_quality)
+            else:
+                stream = gzip_stream(response.streaming_content, self.gzip_level)
+            response.streaming_content = stream
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(
+                    response.content, quality=self.brotli_quality
+                )
+            else:
+                compressed = gzip.compress(
+                    response.content, compresslevel=self.gzip_level, mtime=0
+                )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The representation changed, so a strong ETag no longer applies.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,142 @@
+"""
+Optimistic concurrency control for versioned models.
+
+This module provides a view mixin that turns updates of models carrying
+a ``version`` column into a single conditional ``UPDATE ... WHERE
+version = ?`` driven by the ``If-Match`` request header.
+"""
+
+from django.db.models import F
+from django.http import Http404
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    """Raised when the ``If-Match`` version no longer matches the row."""
+
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource was modified by another request.'
+    default_code = 'precondition_failed'
+
+
+def parse_if_match(header):
+    """
+    Extract the expected version from an ``If-Match`` header.
+
+    Accepts strong and weak entity tags (``"3"`` or ``W/"3"``) as well
+    as a bare number. ``*`` and a missing header mean "any version".
+
+    Args:
+        header: The raw header value or ``None``.
+
+    Returns:
+        int or None: The expected version, or ``None`` if unconditional.
+
+    Raises:
+        PreconditionFailed: If the header cannot be parsed.
+    """
+    if not header or header.strip() == '*':
+        return None
+    tag = header.split(',')[0].strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise PreconditionFailed('If-Match must be a version entity tag.')
+
+
+def version_etag(instance):
+    """Return the entity tag advertising ``instance.version``."""
+    return f'"{instance.version}"'
+
+
+class VersionedUpdateMixin:
+    """
+    Mixin for detail views of models with a ``version`` column.
+
+    Updates load the row through ``get_object()``, so lookups answer 404
+    and object permissions are checked before anything is written, and
+    are applied with one ``UPDATE`` that also increments ``version``.
+    The serializer validates against the loaded row, so fields that may
+    only be set on creation can reject a change. With an ``If-Match``
+    header the statement is conditional on the expected version and a
+    mismatch yields ``412 Precondition Failed``; without it the update
+    is applied unconditionally, as before. Responses carry the current
+    version as ``ETag``.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return the object with its version as ``ETag``."""
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        response['ETag'] = version_etag(instance)
+        return response
+
+    def update(self, request, *args, **kwargs):
+        """
+        Apply a permission-checked conditional update.
+
+        Args:
+            request: The HTTP request carrying the changed fields.
+
+        Returns:
+            Response: The updated object, or 412 on a version conflict.
+        """
+        partial = kwargs.pop('partial', False)
+        expected = parse_if_match(request.headers.get('If-Match'))
+        current = self.get_object()
+        serializer = self.get_serializer(current, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+
+        rows = self.conditional_queryset(expected)
+        values = self.update_values(serializer.validated_data)
+        changed = rows.update(**values, version=F('version') + 1)
+        if not changed:
+            return self.conflict_response()
+
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        response['ETag'] = version_etag(instance)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        """Delete the object, honouring ``If-Match`` when present."""
+        expected = parse_if_match(request.headers.get('If-Match'))
+        if expected is None:
+            return super().destroy(request, *args, **kwargs)
+        self.get_object()
+        deleted, _ = self.conditional_queryset(expected).delete()
+        if not deleted:
+            return self.conflict_response()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def update_values(self, validated_data):
+        """Return the column values written by the conditional update."""
+        return dict(validated_data)
+
+    def conditional_queryset(self, expected):
+        """Return the queryset matching the object at ``expected`` version."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = self.get_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        if expected is not None:
+            rows = rows.filter(version=expected)
+        return rows
+
+    def conflict_response(self):
+        """Raise 404 if the object is gone, otherwise answer 412."""
+        current = self.conditional_queryset(None).values_list(
+            'version', flat=True
+        ).first()
+        if current is None:
+            raise Http404
+        response = Response(
+            {'detail': PreconditionFailed.default_detail, 'version': current},
+            status=status.HTTP_412_PRECONDITION_FAILED,
+        )
+        response['ETag'] = f'"{current}"'
+        return response
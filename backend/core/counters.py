@@ -0,0 +1,136 @@
+"""
+Shared rate counters for throttling and login protection.
+
+This module provides a sliding-window counter store kept in a small
+SQLite file next to the database, so all gunicorn workers of a container
+see the same counts. Every operation is a single indexed statement.
+"""
+
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    window INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    prev INTEGER NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counters_expires ON counters (expires);
+"""
+
+# The SET expressions all see the old row, so the previous window's count
+# is carried over before the current one is reset.
+HIT_SQL = """
+INSERT INTO counters (key, window, count, prev, expires)
+VALUES (:key, :window, 1, 0, :expires)
+ON CONFLICT (key) DO UPDATE SET
+    prev = CASE
+        WHEN window = excluded.window THEN prev
+        WHEN window = excluded.window - 1 THEN count
+        ELSE 0 END,
+    count = CASE WHEN window = excluded.window THEN count + 1 ELSE 1 END,
+    window = excluded.window,
+    expires = excluded.expires
+RETURNING count, prev
+"""
+
+PEEK_SQL = 'SELECT window, count, prev FROM counters WHERE key = ?'
+
+
+def weighted(count, prev, now, period):
+    """Estimate the number of events in the sliding window ending ``now``."""
+    elapsed = (now % period) / period
+    return count + prev * (1 - elapsed)
+
+
+class CounterStore:
+    """
+    Sliding-window counters backed by a SQLite file.
+
+    Each key holds the count of the current and the previous fixed
+    window; the sliding estimate weights the previous window by how much
+    of it still overlaps. This bounds memory to one row per key and
+    makes a hit a single upsert, independent of the request rate.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        """Return this thread's connection, creating the schema once."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.executescript(SCHEMA)
+            self.local.conn = conn
+        return conn
+
+    def hit(self, key, period):
+        """
+        Record one event for ``key`` and return the sliding-window count.
+
+        Args:
+            key: Counter name, e.g. ``"login:ip:203.0.113.5"``.
+            period: Window length in seconds.
+
+        Returns:
+            float: Estimated events in the last ``period`` seconds,
+                including this one.
+        """
+        now = time.time()
+        window = int(now // period)
+        count, prev = self.connection.execute(HIT_SQL, {
+            'key': key,
+            'window': window,
+            'expires': (window + 2) * period,
+        }).fetchone()
+        if random.random() < 0.001:
+            self.purge(now)
+        return weighted(count, prev, now, period)
+
+    def peek(self, key, period):
+        """Return the sliding-window count for ``key`` without a hit."""
+        row = self.connection.execute(PEEK_SQL, (key,)).fetchone()
+        if row is None:
+            return 0.0
+        now = time.time()
+        window, count, prev = row
+        current = int(now // period)
+        if window == current:
+            return weighted(count, prev, now, period)
+        if window == current - 1:
+            return weighted(0, count, now, period)
+        return 0.0
+
+    def reset(self, key):
+        """Forget all events recorded for ``key``."""
+        self.connection.execute('DELETE FROM counters WHERE key = ?', (key,))
+
+    def purge(self, now=None):
+        """Delete counters whose windows have fully expired."""
+        self.connection.execute(
+            'DELETE FROM counters WHERE expires < ?', (now or time.time(),)
+        )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide store for ``RATE_LIMIT_STORE_PATH``."""
+    path = str(settings.RATE_LIMIT_STORE_PATH)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CounterStore(path)
+        return _stores[path]
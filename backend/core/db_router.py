@@ -0,0 +1,105 @@
+"""
+Read-replica routing for the list and detail endpoints.
+
+This module provides a middleware deciding per request whether reads may
+be served by a replica, and a database router applying that decision.
+Writes always go to the primary, and once a request or client has
+written, its reads stay on the primary so it can read its own writes.
+"""
+
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+from core.counters import get_store
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def current_read_alias():
+    """Return the replica alias reads are routed to, or ``None``."""
+    return _read_alias.get()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware choosing the database alias for the request's reads.
+
+    Safe requests to ``REPLICA_READ_PATHS`` read from a randomly chosen
+    replica unless the client wrote within the last
+    ``REPLICA_PIN_SECONDS``. Clients are identified by their
+    ``Authorization`` header or session cookie, and pins are kept in the
+    shared counter store so every worker honours them.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.replicas = list(settings.REPLICA_DATABASES)
+        self.paths = tuple(settings.REPLICA_READ_PATHS)
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+
+    def __call__(self, request):
+        pin_key = self.pin_key(request)
+        safe = request.method in SAFE_METHODS
+        use_replica = (
+            safe and request.path.startswith(self.paths) and
+            not (pin_key and get_store().peek(pin_key, self.pin_seconds))
+        )
+        token = _read_alias.set(random.choice(self.replicas) if use_replica else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        if not safe and pin_key:
+            get_store().hit(pin_key, self.pin_seconds)
+        return response
+
+    def pin_key(self, request):
+        """Return the counter key identifying the client, or ``None``."""
+        credential = (
+            request.META.get('HTTP_AUTHORIZATION') or
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        if not credential:
+            return None
+        digest = hashlib.sha256(credential.encode()).hexdigest()[:32]
+        return f'replica_pin_{digest}'
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router sending eligible reads to the request's replica.
+
+    Only models of ``REPLICA_APP_LABELS`` are read from replicas; tokens,
+    sessions and bookkeeping tables always use the primary so a fresh
+    login never hits replication lag. The first write of a request moves
+    all its remaining reads back to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Return the replica alias for eligible models, else the primary."""
+        alias = _read_alias.get()
+        if alias and model._meta.app_label in settings.REPLICA_APP_LABELS:
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        """Send every write to the primary and stop reading replicas."""
+        _read_alias.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow relations between objects of the primary and replicas."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Leave migration decisions to the default behaviour."""
+        return None
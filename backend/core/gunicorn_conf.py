@@ -0,0 +1,94 @@
+"""
+Gunicorn configuration for the backend container.
+
+Loaded with ``gunicorn -c python:core.gunicorn_conf``. Every setting
+comes from a ``GUNICORN_*`` environment variable, with defaults derived
+from the CPUs the container may use: its cgroup CPU quota and affinity,
+not the core count of the host.
+
+``GUNICORN_WORKER_CLASS`` picks how a worker process serves requests:
+
+- ``gthread`` (default): ``GUNICORN_THREADS`` requests at a time; idle
+  keep-alive connections wait in the worker's poller, not in a thread.
+- ``sync``: one request at a time and no keep-alive, so every poll
+  opens a new connection.
+- ``uvicorn``: the ASGI application on an event loop; Django still runs
+  the sync views in a thread, one at a time.
+
+``GUNICORN_WORKERS`` defaults to 2 x CPUs + 1 processes (CPUs + 1 for
+uvicorn) and ``GUNICORN_THREADS`` to 2 per gthread worker, the fastest
+configuration of ``manage.py bench_gunicorn`` for polling clients.
+Workers are replaced after ``GUNICORN_MAX_REQUESTS`` requests, give or
+take ``GUNICORN_MAX_REQUESTS_JITTER`` so they do not all restart at
+once. Keep-alive connections are held for ``GUNICORN_KEEPALIVE``
+seconds, longer than Traefik keeps idle backend connections, so the
+proxy never reuses one gunicorn just closed.
+"""
+
+import math
+import os
+from pathlib import Path
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+
+
+def cpu_count():
+    """
+    Return the CPUs this process may use, at least 1.
+
+    The smaller of the scheduler affinity and the cgroup CPU quota
+    (``docker run --cpus``, compose ``cpus:``), rounded up.
+    """
+    count = len(os.sched_getaffinity(0))
+    quota_files = (
+        ('/sys/fs/cgroup/cpu.max', None),
+        ('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', '/sys/fs/cgroup/cpu/cpu.cfs_period_us'),
+    )
+    for quota_file, period_file in quota_files:
+        try:
+            values = Path(quota_file).read_text().split()
+            if period_file:
+                values.append(Path(period_file).read_text().strip())
+        except OSError:
+            continue
+        quota, period = values[0], values[-1]
+        if quota not in ('max', '-1'):
+            count = min(count, math.ceil(int(quota) / int(period)))
+        break
+    return max(count, 1)
+
+
+def env_int(name, default):
+    """Return the integer environment variable ``name`` or ``default``."""
+    return int(os.environ.get(name) or default)
+
+
+kind = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if kind not in WORKER_CLASSES:
+    raise ValueError(
+        f'GUNICORN_WORKER_CLASS must be one of {", ".join(WORKER_CLASSES)}, not {kind!r}.'
+    )
+cpus = cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = WORKER_CLASSES[kind]
+wsgi_app = 'core.asgi:application' if kind == 'uvicorn' else 'core.wsgi:application'
+workers = env_int('GUNICORN_WORKERS', cpus + 1 if kind == 'uvicorn' else 2 * cpus + 1)
+threads = env_int('GUNICORN_THREADS', 2 if kind == 'gthread' else 1)
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+keepalive = env_int('GUNICORN_KEEPALIVE', 75)
+timeout = env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Import the app once in the master so the workers fork from it
+# copy-on-write instead of each importing it.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Worker heartbeats go to tmpfs; a disk-backed /tmp can stall them.
+if Path('/dev/shm').is_dir():
+    worker_tmp_dir = '/dev/shm'
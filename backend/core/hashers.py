@@ -0,0 +1,34 @@
+"""
+Password hashers with costs tunable from the environment.
+
+Each hasher keeps the algorithm name of its Django parent, so existing
+hashes stay valid. When the configured cost or the preferred hasher
+changes, Django rehashes the password on the user's next login.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with ``PASSWORD_PBKDF2_ITERATIONS`` iterations."""
+
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt with ``PASSWORD_SCRYPT_WORK_FACTOR`` (N) and block size r=8."""
+
+    work_factor = settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with configurable time cost, memory (KiB) and lanes."""
+
+    time_cost = settings.PASSWORD_ARGON2_TIME_COST
+    memory_cost = settings.PASSWORD_ARGON2_MEMORY_COST
+    parallelism = settings.PASSWORD_ARGON2_PARALLELISM
@@ -0,0 +1,166 @@
+"""
+Idempotency-Key support for write endpoints.
+
+This module provides a view mixin that stores the response of create
+and update requests carrying an ``Idempotency-Key`` header and answers
+retries of the same request from the stored response.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.models import IdempotencyRecord
+
+# Status of a claimed key whose request is still running. A claim this
+# old belongs to a worker that died mid-request and is given up.
+PENDING = 0
+PENDING_TIMEOUT = timedelta(minutes=10)
+
+
+def expired_records():
+    """Return the queryset of records older than ``IDEMPOTENCY_TTL``."""
+    cutoff = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_TTL)
+    return IdempotencyRecord.objects.filter(created_at__lt=cutoff)
+
+
+def live_records():
+    """Return a filter matching unexpired records and running claims."""
+    now = timezone.now()
+    return Q(created_at__gte=now - timedelta(seconds=settings.IDEMPOTENCY_TTL)) & (
+        ~Q(status_code=PENDING) | Q(created_at__gte=now - PENDING_TIMEOUT)
+    )
+
+
+def purge_expired(batch_size=1000):
+    """
+    Delete expired records in batches of ``batch_size``.
+
+    Each batch runs in its own short transaction so expiry never holds
+    the write lock for long.
+
+    Returns:
+        int: Number of deleted records.
+    """
+    total = 0
+    while True:
+        ids = list(expired_records().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        with transaction.atomic():
+            deleted, _ = IdempotencyRecord.objects.filter(pk__in=ids).delete()
+        total += deleted
+
+
+def request_fingerprint(request):
+    """Hash the method, path and parsed payload of ``request``."""
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    raw = f'{request.method}\n{request.path}\n{payload}'
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class IdempotencyMixin:
+    """
+    Mixin making ``create`` and ``update`` idempotent per client key.
+
+    The key is claimed with a pending record before the handler runs,
+    so a concurrent duplicate fails on the unique key and answers 409
+    instead of writing twice. Retries with the same key and payload
+    replay the stored response; reusing a key for a different payload
+    answers 422. Server errors and exceptions release the key.
+    """
+
+    def create(self, request, *args, **kwargs):
+        """Create the object unless this request was already answered."""
+        return self.idempotent(super().create, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        """Update the object unless this request was already answered."""
+        return self.idempotent(super().update, request, *args, **kwargs)
+
+    def idempotent(self, handler, request, *args, **kwargs):
+        """
+        Run ``handler`` at most once per ``Idempotency-Key``.
+
+        Args:
+            handler: The view method performing the write.
+            request: The HTTP request.
+
+        Returns:
+            Response: The handler's response or the stored replay.
+        """
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return handler(request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError(
+                {'Idempotency-Key': 'Must be at most 255 characters.'}
+            )
+
+        user_id = getattr(request.user, 'pk', None)
+        key_hash = hashlib.sha256(f'{user_id}:{key}'.encode()).hexdigest()
+        request_hash = request_fingerprint(request)
+
+        record = self.stored_record(key_hash)
+        if record is not None:
+            return self.replay(record, request_hash)
+
+        try:
+            with transaction.atomic():
+                # Drop an expired record or abandoned claim holding this key.
+                IdempotencyRecord.objects.filter(key_hash=key_hash).exclude(
+                    live_records()
+                ).delete()
+                record = IdempotencyRecord.objects.create(
+                    key_hash=key_hash, request_hash=request_hash, status_code=PENDING,
+                )
+        except IntegrityError:
+            record = self.stored_record(key_hash)
+            if record is None:
+                raise
+            return self.replay(record, request_hash)
+
+        try:
+            with transaction.atomic():
+                response = handler(request, *args, **kwargs)
+                if response.status_code < 500:
+                    record.status_code = response.status_code
+                    record.response_body = response.data
+                    record.etag = response.get('ETag', '')
+                    record.save(update_fields=['status_code', 'response_body', 'etag'])
+        except BaseException:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+        return response
+
+    def stored_record(self, key_hash):
+        """Return the live record for ``key_hash`` or ``None``."""
+        return IdempotencyRecord.objects.filter(live_records(), key_hash=key_hash).first()
+
+    def replay(self, record, request_hash):
+        """Answer a retry from ``record`` or reject a reused or busy key."""
+        if record.request_hash != request_hash:
+            return Response(
+                {'detail': 'Idempotency-Key was already used for a different request.'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if record.status_code == PENDING:
+            return Response(
+                {'detail': 'A request with this Idempotency-Key is still running.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        response = Response(record.response_body, status=record.status_code)
+        response['Idempotent-Replayed'] = 'true'
+        if record.etag:
+            response['ETag'] = record.etag
+        return response
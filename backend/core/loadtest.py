@@ -0,0 +1,140 @@
+"""
+HTTP load generation against a running deployment.
+
+This module sends a poll-heavy request mix (task list, activity feed,
+deadline filters, contact list, optionally a share of task updates)
+from several processes over keep-alive connections for a fixed time and
+collects latencies and statuses. ``manage.py load_test`` runs it against
+a deployment, ``manage.py bench_gunicorn`` against local gunicorn
+servers in different configurations.
+"""
+
+import http.client
+import json
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+
+from tasks_app.models import Task
+
+# Poll-heavy traffic: (weight, path) of the reads an open board sends.
+READS = [
+    (4, '/api/v1/task/'),
+    (3, '/api/v1/activity/'),
+    (1, '/api/v1/task/due/overdue/'),
+    (1, '/api/v1/task/due/next/'),
+    (1, '/api/v1/contact/'),
+]
+
+
+def percentile(samples, fraction):
+    """Return the ``fraction`` percentile of sorted ``samples``."""
+    if not samples:
+        return 0.0
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def run_client(url, host, tokens, task_ids, write_ratio, warmup, duration, seed):
+    """
+    Send requests over one connection until ``duration`` has passed.
+
+    Returns:
+        tuple: ``(latencies in ms, Counter of statuses)`` of the
+            requests finished after the warm-up.
+    """
+    rng = random.Random(seed)
+    target = urlsplit(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+    weights, paths = zip(*READS)
+    started = time.perf_counter()
+    measured_from, deadline = started + warmup, started + warmup + duration
+    latencies, statuses = [], Counter()
+    while True:
+        sent = time.perf_counter()
+        if sent >= deadline:
+            break
+        headers = {
+            'Host': host, 'Accept-Encoding': 'gzip',
+            'Authorization': f'Token {rng.choice(tokens)}',
+        }
+        if task_ids and rng.random() < write_ratio:
+            method, path = 'PATCH', f'/api/v1/task/{rng.choice(task_ids)}/'
+            body = json.dumps({'description': f'load test {rng.random()}'})
+            headers['Content-Type'] = 'application/json'
+        else:
+            method, path, body = 'GET', rng.choices(paths, weights)[0], None
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            status = 'error'
+        if sent >= measured_from:
+            latencies.append((time.perf_counter() - sent) * 1000)
+            statuses[status] += 1
+    connection.close()
+    return latencies, statuses
+
+
+def run_process(arguments):
+    """Run ``concurrency`` clients in threads of one process."""
+    concurrency, client_arguments, seed = arguments
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [
+            executor.submit(run_client, *client_arguments, seed * 1000 + index)
+            for index in range(concurrency)
+        ]
+        results = [future.result() for future in futures]
+    latencies = [latency for result in results for latency in result[0]]
+    return latencies, sum((result[1] for result in results), Counter())
+
+
+def load_users(count):
+    """
+    Create the load users if needed and return their tokens.
+
+    Tokens are created directly in the database, so the run is not
+    limited by the login throttles.
+    """
+    return [
+        Token.objects.get_or_create(
+            user=User.objects.get_or_create(username=f'loadtest-{index}')[0]
+        )[0].key
+        for index in range(count)
+    ]
+
+
+def run_load(url, host, tokens, duration, warmup=5, processes=2, concurrency=16,
+             write_ratio=0.0):
+    """
+    Send the request mix to ``url`` and collect the results.
+
+    Args:
+        url: Base URL, e.g. ``http://traefik``.
+        host: Host header to send.
+        tokens: API tokens the clients pick from per request.
+        duration: Seconds measured.
+        warmup: Seconds sent before measuring.
+        processes: Client processes.
+        concurrency: Connections per process.
+        write_ratio: Share of requests updating a task.
+
+    Returns:
+        tuple: Sorted latencies in ms and a Counter of statuses.
+    """
+    task_ids = list(Task.objects.visible_to(None).values_list('pk', flat=True)[:1000])
+    client_arguments = (url, host, tokens, task_ids, write_ratio, warmup, duration)
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(run_process, [
+            (concurrency, client_arguments, index) for index in range(processes)
+        ])
+    latencies = sorted(latency for result in results for latency in result[0])
+    return latencies, sum((result[1] for result in results), Counter())
@@ -0,0 +1,43 @@
+"""
+Management command taking an online snapshot of the SQLite database.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backup import BackupError, list_snapshots, snapshot, verify
+
+
+class Command(BaseCommand):
+    """Snapshot, list or verify compressed database snapshots."""
+
+    help = 'Write a compressed, checksummed snapshot of the live SQLite database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--dir', default=None, help='Default: BACKUP_DIR.')
+        parser.add_argument('--pages', type=int, default=256, help='Pages per step.')
+        parser.add_argument('--sleep', type=float, default=0.01, help='Seconds between steps.')
+        parser.add_argument('--keep', type=int, default=None, help='Default: BACKUP_KEEP.')
+        parser.add_argument('--list', action='store_true', help='List snapshots and exit.')
+        parser.add_argument('--verify', metavar='SNAPSHOT', help='Verify a snapshot and exit.')
+
+    def handle(self, *args, **options):
+        try:
+            if options['list']:
+                for path in list_snapshots(options['dir']):
+                    self.stdout.write(f'{path}  {path.stat().st_size:,} B')
+                return
+            if options['verify']:
+                verify(options['verify'])
+                self.stdout.write(self.style.SUCCESS('Checksum OK.'))
+                return
+            result = snapshot(
+                options['database'], options['dir'], options['pages'],
+                options['sleep'], options['keep'],
+            )
+        except BackupError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {result["path"]} ({result["pages"]} pages, '
+            f'{result["bytes"]:,} B compressed, sha256 {result["sha256"][:12]}).'
+        ))
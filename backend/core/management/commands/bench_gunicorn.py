@@ -0,0 +1,122 @@
+"""
+Benchmark matrix of gunicorn configurations under poll-heavy traffic.
+
+Starts a local gunicorn with ``core.gunicorn_conf`` for every worker
+class and worker/thread count of the matrix, sends it the request mix of
+``core.loadtest`` from more keep-alive connections than the server has
+workers, as a team of boards polling the API does, and prints the
+throughput and latency percentiles of each configuration. Worker classes
+whose package is not installed are skipped.
+"""
+
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.gunicorn_conf import cpu_count
+from core.loadtest import load_users, percentile, run_load
+
+
+def matrix(cpus):
+    """Return ``(worker class, workers, threads)`` configurations to compare."""
+    return [
+        ('sync', 2 * cpus + 1, 1),
+        ('gthread', 2 * cpus + 1, 2),
+        ('gthread', cpus + 1, 4),
+        ('gthread', cpus + 1, 8),
+        ('uvicorn', cpus + 1, 1),
+    ]
+
+
+def wait_until_listening(port, server, timeout=60):
+    """Wait for ``server`` to accept connections on ``port``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise CommandError(f'gunicorn exited with status {server.returncode}.')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'gunicorn did not listen on port {port} within {timeout} s.')
+
+
+class Command(BaseCommand):
+    """Compare gunicorn worker classes and counts on one machine."""
+
+    help = 'Benchmark gunicorn configurations with a poll-heavy request mix.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=20)
+        parser.add_argument('--warmup', type=float, default=3)
+        parser.add_argument(
+            '--connections', type=int, default=64,
+            help='Concurrent keep-alive connections, split over the processes.'
+        )
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--users', type=int, default=8)
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.05,
+            help='Share of requests updating a task instead of reading.'
+        )
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        cpus = cpu_count()
+        tokens = load_users(options['users'])
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{cpus} CPU(s), {options["connections"]} connections, '
+            f'{options["write_ratio"]:.0%} writes, {options["duration"]:.0f} s per configuration'
+        ))
+        self.stdout.write(
+            'class     workers threads     req/s    p50 ms    p95 ms    p99 ms  errors'
+        )
+        for kind, workers, threads in matrix(cpus):
+            if kind == 'uvicorn' and importlib.util.find_spec('uvicorn') is None:
+                self.stdout.write(f'{kind:<9} skipped, uvicorn is not installed')
+                continue
+            latencies, statuses = self.measure(kind, workers, threads, tokens, options)
+            errors = sum(count for status, count in statuses.items() if status != 200)
+            self.stdout.write(
+                f'{kind:<9} {workers:>7} {threads:>7} '
+                f'{len(latencies) / options["duration"]:>9.1f} '
+                f'{percentile(latencies, 0.5):>9.1f} {percentile(latencies, 0.95):>9.1f} '
+                f'{percentile(latencies, 0.99):>9.1f} {errors:>7}'
+            )
+
+    def measure(self, kind, workers, threads, tokens, options):
+        """Run the load against one gunicorn configuration."""
+        env = {
+            **os.environ,
+            'GUNICORN_WORKER_CLASS': kind,
+            'GUNICORN_WORKERS': str(workers),
+            'GUNICORN_THREADS': str(threads),
+            'GUNICORN_BIND': f'127.0.0.1:{options["port"]}',
+            # The load users would run into the per-user budgets otherwise.
+            'DJANGO_THROTTLE_READ': '1000000/min',
+            'DJANGO_THROTTLE_WRITE': '1000000/min',
+        }
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'python:core.gunicorn_conf'],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_listening(options['port'], server)
+            return run_load(
+                f'http://127.0.0.1:{options["port"]}', 'localhost', tokens,
+                options['duration'], warmup=options['warmup'],
+                processes=options['processes'],
+                concurrency=options['connections'] // options['processes'],
+                write_ratio=options['write_ratio'],
+            )
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
@@ -0,0 +1,118 @@
+"""
+Benchmark of the API throttling overhead.
+
+Sends the same GET to the task list view with and without the default
+read/write throttles, reporting the median time per request, then
+measures raw counter store hits from several processes sharing one
+store file, as gunicorn workers do. Runs inside a transaction that is
+rolled back and on a temporary store, so neither the database nor the
+live counters are touched.
+"""
+
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.counters import CounterStore
+from core.throttling import ReadRateThrottle, WriteRateThrottle
+from tasks_app.api.views import TasksList
+from tasks_app.models import Task
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data."""
+
+
+class UnlimitedReadThrottle(ReadRateThrottle):
+    """Read throttle whose budget the benchmark never exhausts."""
+
+    rate = '1000000000/min'
+
+
+def hammer(path, count, shared):
+    """Record ``count`` hits in the store at ``path``; return seconds."""
+    store = CounterStore(path)
+    key = 'bench_shared' if shared else f'bench_{multiprocessing.current_process().pid}'
+    started = time.perf_counter()
+    for _ in range(count):
+        store.hit(key, 60)
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    """Measure per-request cost of the shared-store throttles."""
+
+    help = 'Benchmark the API throttling overhead.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--hits', type=int, default=20000)
+        parser.add_argument('--processes', type=int, default=4)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'counters.sqlite3'
+            with override_settings(RATE_LIMIT_STORE_PATH=path):
+                try:
+                    with transaction.atomic():
+                        self.run_requests(options['requests'])
+                        raise Rollback
+                except Rollback:
+                    self.stdout.write('Benchmark data rolled back.')
+            self.run_hits(str(path), options['hits'], options['processes'])
+
+    def run_requests(self, count):
+        user = User.objects.create_user('bench-throttling')
+        Task.objects.bulk_create(
+            Task(title=f'Benchmark {index}', priority=2, dueDate='2025-06-01')
+            for index in range(20)
+        )
+        factory = APIRequestFactory()
+        views = {
+            'unthrottled': TasksList.as_view(throttle_classes=[]),
+            'throttled': TasksList.as_view(
+                throttle_classes=[UnlimitedReadThrottle, WriteRateThrottle]
+            ),
+        }
+
+        def get(view):
+            request = factory.get('/api/v1/task/')
+            force_authenticate(request, user)
+            started = time.perf_counter()
+            view(request)
+            return (time.perf_counter() - started) * 1000
+
+        results = {}
+        for name in ('unthrottled', 'throttled') * 2:
+            samples = sorted(get(views[name]) for _ in range(count))
+            results.setdefault(name, []).append(samples[len(samples) // 2])
+
+        off, on = min(results['unthrottled']), min(results['throttled'])
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{count} task list GETs per run, median ms per request'
+        ))
+        self.stdout.write(f'unthrottled   {off:>8.3f} ms')
+        self.stdout.write(f'throttled     {on:>8.3f} ms  (+{on - off:.3f} ms)')
+
+    def run_hits(self, path, count, processes):
+        CounterStore(path)  # create the schema before the workers race for it
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{count} store hits per process, {processes} processes'
+        ))
+        for shared in (False, True):
+            with multiprocessing.Pool(processes) as pool:
+                started = time.perf_counter()
+                seconds = pool.starmap(hammer, [(path, count, shared)] * processes)
+                wall = time.perf_counter() - started
+            label = 'one shared key' if shared else 'key per process'
+            self.stdout.write(
+                f'{label:<16} {max(seconds) / count * 1e6:>7.1f} us per hit, '
+                f'{processes * count / wall:>9.0f} hits/s total'
+            )
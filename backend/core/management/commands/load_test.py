@@ -0,0 +1,66 @@
+"""
+Management command putting HTTP load on a running deployment.
+
+Runs the poll-heavy request mix of ``core.loadtest`` for a fixed time,
+then reports throughput, latency percentiles and the responses by
+status. ``scale-test.sh`` runs it against 1 to 4 backend replicas
+behind Traefik.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.loadtest import load_users, percentile, run_load
+
+
+class Command(BaseCommand):
+    """Measure throughput and latency of a deployment under load."""
+
+    help = 'Send a poll-heavy request mix to a running deployment.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://traefik')
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host header, matching the DOMAIN the routers listen on.'
+        )
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument('--warmup', type=float, default=5)
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Connections per process.'
+        )
+        parser.add_argument('--users', type=int, default=8)
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.0,
+            help='Share of requests updating a task instead of reading.'
+        )
+        parser.add_argument('--label', default='')
+
+    def handle(self, *args, **options):
+        latencies, statuses = run_load(
+            options['url'], options['host'], load_users(options['users']),
+            options['duration'], warmup=options['warmup'],
+            processes=options['processes'], concurrency=options['concurrency'],
+            write_ratio=options['write_ratio'],
+        )
+        rate = len(latencies) / options['duration']
+        label = options['label'] or options['url']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{label}: {options["processes"] * options["concurrency"]} connections, '
+            f'{options["duration"]:.0f} s'
+        ))
+        self.stdout.write(
+            f'{len(latencies)} requests, {rate:.1f} req/s, '
+            f'p50 {percentile(latencies, 0.5):.1f} ms, '
+            f'p95 {percentile(latencies, 0.95):.1f} ms, '
+            f'p99 {percentile(latencies, 0.99):.1f} ms'
+        )
+        self.stdout.write('statuses: ' + ', '.join(
+            f'{status} x{count}' for status, count in sorted(statuses.items(), key=str)
+        ))
+        ok = sum(count for status, count in statuses.items() if status == 200)
+        self.stdout.write(
+            f'RESULT {label} {rate:.1f} req/s {ok / options["duration"]:.1f} ok/s '
+            f'p95 {percentile(latencies, 0.95):.1f} ms'
+        )
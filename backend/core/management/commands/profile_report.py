@@ -0,0 +1,124 @@
+"""
+Management command summarizing captured request profiles.
+
+Lists the slowest captured requests, aggregates them per endpoint (by
+time and, for captures with a recorded peak, by memory) and optionally
+prints the cProfile statistics and SQL of a single capture.
+"""
+
+import io
+import pstats
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import load_captures, profile_dir
+
+
+class Command(BaseCommand):
+    """Report the top offenders among the profiled requests."""
+
+    help = 'Summarize request profiles written by ProfilingMiddleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Number of slowest captures and endpoints to list.'
+        )
+        parser.add_argument(
+            '--show', metavar='CAPTURE',
+            help='Print pstats and SQL for a single capture.'
+        )
+        parser.add_argument(
+            '--sort', default='cumulative',
+            help='pstats sort key used with --show.'
+        )
+
+    def handle(self, *args, **options):
+        if options['show']:
+            self.show_capture(options['show'], options['sort'], options['top'])
+            return
+
+        captures = load_captures()
+        if not captures:
+            self.stdout.write(f'No captures found in {profile_dir()}.')
+            return
+
+        top = options['top']
+        self.stdout.write(self.style.MIGRATE_HEADING('Slowest requests'))
+        captures.sort(key=lambda c: c['duration_ms'], reverse=True)
+        for capture in captures[:top]:
+            peak = capture.get('peak_kb')
+            memory = f'{peak:>9.0f} KiB  ' if peak is not None else ''
+            self.stdout.write(
+                '{duration_ms:>10.1f} ms  {query_count:>4} queries '
+                '{query_ms:>9.1f} ms SQL  {memory}{status}  {method} {path}'
+                .format(**capture, memory=memory)
+            )
+            self.stdout.write(f'    {capture["stem"]}')
+
+        per_endpoint = defaultdict(list)
+        for capture in captures:
+            key = (capture['method'], capture['endpoint'])
+            per_endpoint[key].append(capture)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Endpoints by total time'))
+        ranked = sorted(
+            per_endpoint.items(),
+            key=lambda item: sum(c['duration_ms'] for c in item[1]),
+            reverse=True,
+        )
+        for (method, endpoint), items in ranked[:top]:
+            durations = [c['duration_ms'] for c in items]
+            queries = [c['query_count'] for c in items]
+            self.stdout.write(
+                f'{len(items):>5}x  avg {sum(durations) / len(items):>9.1f} ms  '
+                f'max {max(durations):>9.1f} ms  '
+                f'avg {sum(queries) / len(items):>6.1f} queries  '
+                f'{method} {endpoint}'
+            )
+
+        measured = {
+            key: [c['peak_kb'] for c in items if c.get('peak_kb') is not None]
+            for key, items in per_endpoint.items()
+        }
+        measured = {key: peaks for key, peaks in measured.items() if peaks}
+        if not measured:
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING('Endpoints by peak memory'))
+        ranked = sorted(measured.items(), key=lambda item: max(item[1]), reverse=True)
+        for (method, endpoint), peaks in ranked[:top]:
+            self.stdout.write(
+                f'{len(peaks):>5}x  avg {sum(peaks) / len(peaks):>9.0f} KiB  '
+                f'max {max(peaks):>9.0f} KiB  {method} {endpoint}'
+            )
+
+    def show_capture(self, stem, sort, top):
+        """
+        Print the profile statistics and SQL of a single capture.
+
+        Args:
+            stem: File name of the capture without extension.
+            sort: pstats sort key.
+            top: Number of functions and statements to print.
+        """
+        captures = {c['stem']: c for c in load_captures()}
+        if stem not in captures:
+            raise CommandError(f'Capture "{stem}" not found.')
+        capture = captures[stem]
+
+        self.stdout.write(
+            '{method} {path} -> {status} in {duration_ms:.1f} ms'
+            .format(**capture)
+        )
+        if capture.get('peak_kb') is not None:
+            self.stdout.write(f'Peak memory {capture["peak_kb"]:.0f} KiB')
+        buffer = io.StringIO()
+        stats = pstats.Stats(str(profile_dir() / f'{stem}.prof'), stream=buffer)
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+        self.stdout.write(buffer.getvalue())
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Slowest SQL'))
+        queries = sorted(capture['queries'], key=lambda q: q['ms'], reverse=True)
+        for query in queries[:top]:
+            self.stdout.write(f'{query["ms"]:>9.3f} ms  [{query["db"]}] {query["sql"]}')
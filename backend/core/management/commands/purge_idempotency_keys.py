@@ -0,0 +1,22 @@
+"""
+Management command expiring stored idempotency records.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    """Delete idempotency records older than IDEMPOTENCY_TTL in batches."""
+
+    help = 'Delete expired Idempotency-Key records in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired idempotency records.'
+        ))
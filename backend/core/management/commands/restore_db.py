@@ -0,0 +1,35 @@
+"""
+Management command restoring the SQLite database from a snapshot.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backup import BackupError, restore
+
+
+class Command(BaseCommand):
+    """Overwrite the database with a verified snapshot."""
+
+    help = 'Restore the SQLite database from a backup_db snapshot.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('snapshot', help='Path of the .sqlite3.gz snapshot.')
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--noinput', '--no-input', action='store_false', dest='interactive',
+            help='Do not ask for confirmation.'
+        )
+
+    def handle(self, *args, **options):
+        if options['interactive']:
+            answer = input(
+                f'This overwrites the "{options["database"]}" database with '
+                f'{options["snapshot"]}. Type "yes" to continue: '
+            )
+            if answer != 'yes':
+                raise CommandError('Restore cancelled.')
+        try:
+            restore(options['snapshot'], options['database'])
+        except BackupError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS('Database restored.'))
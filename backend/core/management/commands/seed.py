@@ -0,0 +1,54 @@
+"""
+Management command filling the database with synthetic data.
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core.seed import seed
+
+
+class Command(BaseCommand):
+    """Add deterministic synthetic users, contacts and tasks."""
+
+    help = 'Add synthetic users, contacts and tasks for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2_000)
+        parser.add_argument('--contacts', type=int, default=200_000)
+        parser.add_argument('--tasks', type=int, default=2_000_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--today', type=date.fromisoformat, default=None,
+            help='Spread due dates around this date (YYYY-MM-DD) instead of today.'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Worker processes generating and writing chunks.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=50_000)
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--password', default='pw-seed-1234',
+            help='Password of every seeded user.'
+        )
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in ('users', 'contacts', 'tasks')}
+        started = time.perf_counter()
+        totals = {}
+        for table, rows in seed(
+            counts, seed=options['seed'], today=options['today'],
+            processes=options['processes'], chunk_size=options['chunk_size'],
+            using=options['database'], password=options['password'],
+        ):
+            totals[table] = totals.get(table, 0) + rows
+            self.stdout.write(f'{table}: {totals[table]} rows so far...')
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {rows} rows in {elapsed:.1f} s '
+            f'({rows / elapsed:,.0f} rows/s, indexes rebuilt).'
+        ))
@@ -0,0 +1,90 @@
+"""
+Management command preparing the database before the app server starts.
+
+Runs in one process what the entrypoint used to spread over several:
+waits for the database, migrates only when migrations are pending, tops
+up the guest pool and provisions the superuser from the
+``DJANGO_SUPERUSER_*`` variables (a failure there is reported, not
+fatal), holding the startup lock so replicas
+starting together take turns. Prints the time of each step and
+warns when the total, counted from ``--since`` (the entrypoint's start
+time) if given, exceeds ``STARTUP_BUDGET_MS``.
+"""
+
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import (
+    ensure_superuser, pending_migrations, startup_lock, wait_for_database,
+)
+from user_auth_app.guests import fill_pool
+
+
+class Command(BaseCommand):
+    """Migrate if needed and provision accounts, with step timings."""
+
+    help = 'Prepare the database for the app server (fast container start).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', type=float, default=None, metavar='EPOCH',
+            help='Unix time the container started; counted into the budget.'
+        )
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Fail instead of warning when STARTUP_BUDGET_MS is exceeded.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.time()
+        self.step('database', wait_for_database)
+        with ExitStack() as stack:
+            self.step('lock', lambda: stack.enter_context(startup_lock()))
+            self.step('migrations', self.migrate)
+            self.step('guest pool', lambda: f'{len(fill_pool())} provisioned')
+            self.step('superuser', self.superuser)
+
+        total = (time.time() - (options['since'] or started)) * 1000
+        budget = settings.STARTUP_BUDGET_MS
+        message = f'Startup tasks took {total:.0f} ms (budget {budget} ms).'
+        if budget and total > budget:
+            if options['strict']:
+                raise CommandError(message)
+            self.stderr.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
+
+    def step(self, name, func):
+        """Run one startup step and print how long it took."""
+        started = time.perf_counter()
+        detail = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'  {name:<12} {elapsed:>7.1f} ms  {detail or ""}')
+
+    def migrate(self):
+        """Apply pending migrations; a current schema costs one query."""
+        pending = pending_migrations()
+        if not pending:
+            return 'up to date'
+        call_command('migrate', interactive=False, verbosity=0)
+        return f'applied {len(pending)}'
+
+    def superuser(self):
+        """Create the superuser from the DJANGO_SUPERUSER_* variables."""
+        username = os.environ.get('DJANGO_SUPERUSER_USERNAME')
+        email = os.environ.get('DJANGO_SUPERUSER_EMAIL')
+        password = os.environ.get('DJANGO_SUPERUSER_PASSWORD')
+        if not (username and email and password):
+            return 'skipped (DJANGO_SUPERUSER_* not set)'
+        try:
+            created = ensure_superuser(username, email, password)
+        except Exception as e:
+            # As before: a bad superuser must not keep the application down.
+            self.stderr.write(f'Error creating superuser: {e}')
+            return 'failed'
+        return 'created' if created else 'exists'
@@ -0,0 +1,35 @@
+"""
+Model definitions shared by the API applications.
+
+This module contains the IdempotencyRecord model storing responses of
+write requests sent with an ``Idempotency-Key`` header.
+"""
+
+from django.db import models
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Model storing the outcome of an idempotent write request.
+
+    Attributes:
+        key_hash: SHA-256 of the user id and the client's idempotency key.
+        request_hash: SHA-256 of method, path and request payload, used
+            to detect a key being reused for a different request.
+        status_code: HTTP status of the stored response, or 0 while
+            the request is still running.
+        response_body: Serialized data of the stored response.
+        etag: ETag header of the stored response, if any.
+        created_at: Creation time, used for TTL-based expiry.
+    """
+
+    key_hash = models.CharField(max_length=64, unique=True)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(null=True)
+    etag = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        """Return a string representation of the record."""
+        return f"{self.key_hash[:12]} {self.status_code}"
@@ -0,0 +1,44 @@
+"""
+Custom parsers for the REST API.
+
+This module provides a MessagePack parser so clients can send request
+bodies as ``application/msgpack`` instead of JSON.
+"""
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+class MessagePackParser(BaseParser):
+    """Parser decoding ``application/msgpack`` request bodies."""
+
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Decode the request body.
+
+        Args:
+            stream: The request body stream.
+            media_type: The request's content type.
+            parser_context: Context passed by the view.
+
+        Returns:
+            The decoded data.
+
+        Raises:
+            ParseError: If the body is not valid MessagePack.
+        """
+        try:
+            return msgpack.unpackb(
+                stream.read(), raw=False, strict_map_key=False
+            )
+        except (ValueError, TypeError, msgpack.ExtraData, msgpack.FormatError,
+                msgpack.StackError) as exc:
+            # TypeError: a map keyed by an unhashable list or map.
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -0,0 +1,216 @@
+"""
+Opt-in request profiling for the backend.
+
+This module provides a middleware that profiles a sampled fraction of
+requests, or every request slower than a latency threshold, and writes
+a cProfile dump together with the executed SQL to a bounded directory.
+Optionally each capture records the request's peak memory, measured
+with tracemalloc, and requests peaking above a memory threshold are
+captured as well.
+"""
+
+import cProfile
+import json
+import random
+import re
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+def profile_dir():
+    """Return the directory captures are written to, creating it."""
+    path = settings.PROFILING_DIR
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_captures():
+    """
+    Load the metadata of every capture in the profiling directory.
+
+    Returns:
+        list: Capture metadata dicts, each with a ``stem`` key naming
+            the ``.json``/``.prof`` file pair.
+    """
+    captures = []
+    for meta_file in profile_dir().glob('*.json'):
+        try:
+            meta = json.loads(meta_file.read_text())
+        except (OSError, ValueError):
+            continue
+        meta['stem'] = meta_file.stem
+        captures.append(meta)
+    return captures
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper recording SQL statements and their timings.
+
+    Works without ``DEBUG`` by hooking ``connection.execute_wrapper``.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'db': self.alias,
+                'sql': sql,
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+                'many': many,
+            })
+
+
+def memory_baseline():
+    """Reset the tracemalloc peak and return the memory traced now."""
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def memory_peak_kb(baseline):
+    """Return the traced peak above ``baseline`` in KiB."""
+    return round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware capturing cProfile dumps and SQL timings for requests.
+
+    A request is profiled when it falls into the configured sample
+    (``PROFILING_SAMPLE_RATE``) or when a latency threshold
+    (``PROFILING_SLOW_MS``) is set, in which case every request runs
+    under the profiler and only the slow ones are kept. The directory
+    is rotated so it never holds more than ``PROFILING_MAX_CAPTURES``.
+
+    With ``PROFILING_MEMORY`` allocations are traced and every capture
+    records the request's peak memory; ``PROFILING_PEAK_KB`` captures
+    every request peaking above it. The peak includes the sending of a
+    synchronously streamed body (WSGI); for an asynchronous stream it
+    covers the view only and stops when the view returns. tracemalloc
+    sees the whole process, so peaks are only attributable to one
+    request with one thread per worker.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_ms = settings.PROFILING_SLOW_MS
+        self.max_captures = settings.PROFILING_MAX_CAPTURES
+        self.memory = settings.PROFILING_MEMORY
+        self.peak_kb = settings.PROFILING_PEAK_KB if self.memory else 0
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __call__(self, request):
+        sampled = random.random() < self.sample_rate
+        if not sampled and not self.slow_ms and not self.peak_kb:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        recorders = [QueryRecorder(conn.alias) for conn in connections.all()]
+        with ExitStack() as stack:
+            for conn, recorder in zip(connections.all(), recorders):
+                stack.enter_context(conn.execute_wrapper(recorder))
+            baseline = memory_baseline() if self.memory else None
+            start = time.perf_counter()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already active on this thread.
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+
+        queries = [q for recorder in recorders for q in recorder.queries]
+        capture = (request, response, profiler, queries, duration_ms, sampled)
+        if baseline is not None and response.streaming and not response.is_async:
+            # The body is produced while it is sent; keep measuring.
+            response.streaming_content = self.trace_stream(
+                response.streaming_content, baseline, capture
+            )
+            return response
+        peak_kb = memory_peak_kb(baseline) if baseline is not None else None
+        self.finish(*capture, peak_kb)
+        return response
+
+    def trace_stream(self, chunks, baseline, capture):
+        """Yield ``chunks``, then finish the capture with the stream's peak."""
+        yield from chunks
+        self.finish(*capture, memory_peak_kb(baseline))
+
+    def finish(self, request, response, profiler, queries, duration_ms,
+               sampled, peak_kb):
+        """Write a capture when the request was sampled, slow or large."""
+        if (
+            sampled or (self.slow_ms and duration_ms >= self.slow_ms)
+            or (self.peak_kb and peak_kb >= self.peak_kb)
+        ):
+            self.write_capture(
+                request, response, profiler, queries, duration_ms, sampled,
+                peak_kb,
+            )
+
+    def write_capture(self, request, response, profiler, queries,
+                      duration_ms, sampled, peak_kb=None):
+        """
+        Write the profile and request metadata, then rotate the directory.
+
+        Args:
+            request: The profiled HTTP request.
+            response: The response returned for the request.
+            profiler: The disabled ``cProfile.Profile`` instance.
+            queries: SQL statements recorded during the request.
+            duration_ms: Wall-clock duration of the request.
+            sampled: Whether the request was picked by sampling.
+            peak_kb: Peak traced memory of the request in KiB, or
+                ``None`` without ``PROFILING_MEMORY``.
+        """
+        directory = profile_dir()
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.route if match and match.route else request.path
+        now = datetime.now(timezone.utc)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-')
+        stem = '{}_{:08.1f}ms_{}_{}_{}'.format(
+            now.strftime('%Y%m%dT%H%M%S%f'), duration_ms,
+            request.method, slug[:60] or 'root', random.randrange(1 << 16)
+        )
+        profiler.dump_stats(str(directory / f'{stem}.prof'))
+        meta = {
+            'timestamp': now.isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'sampled': sampled,
+            'peak_kb': peak_kb,
+            'query_count': len(queries),
+            'query_ms': round(sum(q['ms'] for q in queries), 3),
+            'queries': queries,
+        }
+        (directory / f'{stem}.json').write_text(json.dumps(meta))
+        self.rotate(directory)
+
+    def rotate(self, directory):
+        """Delete the oldest captures beyond ``PROFILING_MAX_CAPTURES``."""
+        metas = sorted(directory.glob('*.json'))
+        for meta_file in metas[:max(len(metas) - self.max_captures, 0)]:
+            meta_file.unlink(missing_ok=True)
+            meta_file.with_suffix('.prof').unlink(missing_ok=True)
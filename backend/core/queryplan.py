@@ -0,0 +1,193 @@
+"""
+Query plan checks for hot API paths.
+
+This module captures the SQL an API request issues and runs each
+``SELECT`` through the database's planner (``EXPLAIN QUERY PLAN`` on
+SQLite, ``EXPLAIN (FORMAT JSON)`` on PostgreSQL) to find tables read in
+full, by a sequential scan or a walk over a whole index without a search
+condition, and rows sorted after reading instead of read in index
+order. ``QueryPlanTestMixin`` turns that into test assertions, together
+with a budget on the number of queries, so a dropped index or an N+1
+query on a hot endpoint fails the test suite instead of showing up in
+production.
+"""
+
+import itertools
+import json
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+# Django's subquery aliases (U0, V1, T3, ...) after a quoted table name.
+ALIAS_RE = re.compile(r'"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)"?\b')
+
+# A SQLite plan step reading a whole table or index; searches are SEARCH.
+SQLITE_SCAN_RE = re.compile(r'^SCAN (\w+)(?: USING |$)')
+
+# A SQLite plan step sorting rows the index did not deliver in order.
+SQLITE_SORT_RE = re.compile(r'^USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY')
+
+PLANNED_VENDORS = ('sqlite', 'postgresql')
+
+# Tables small by design that visibility subqueries may read whole; the
+# guest pool holds GUEST_POOL_SIZE accounts plus the claimed ones.
+SMALL_TABLES = ('user_auth_app_guestaccount',)
+
+# sqlite3 caches prepared statements by their text, and a cached EXPLAIN
+# keeps reporting its old plan after an index is dropped or created; a
+# unique comment makes every EXPLAIN a fresh statement.
+explain_counter = itertools.count()
+
+
+def is_select(sql):
+    """Return whether ``sql`` is a read the planner can explain."""
+    return sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+
+def explain(sql, using=DEFAULT_DB_ALIAS):
+    """
+    Return the plan of ``sql`` as text lines.
+
+    Args:
+        sql: A complete statement, as captured with its parameters.
+        using: The database alias.
+
+    Returns:
+        list: SQLite plan details, or PostgreSQL plan nodes as
+            ``"<Node Type> <Relation Name> [<Index Cond>]"``.
+
+    Raises:
+        NotImplementedError: For databases other than SQLite and
+            PostgreSQL.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}\n-- {next(explain_counter)}')
+            return [row[-1] for row in cursor.fetchall()]
+    if connection.vendor == 'postgresql':
+        return [
+            ' '.join(filter(None, (
+                node['Node Type'], node.get('Relation Name'),
+                node.get('Index Cond') and f'[{node["Index Cond"]}]',
+            )))
+            for node in postgresql_plan(sql, using)
+        ]
+    raise NotImplementedError(f'No query plans for {connection.vendor}.')
+
+
+def postgresql_plan(sql, using=DEFAULT_DB_ALIAS):
+    """
+    Return every node of the PostgreSQL plan of ``sql``, outermost first.
+
+    Sequential scans are disabled for the call, so the planner picks
+    the indexes it would use on large tables even for the few rows of
+    a test database.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute('SET enable_seqscan = off')
+        try:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.execute('RESET enable_seqscan')
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return list(plan_nodes(plan[0]['Plan']))
+
+
+def plan_nodes(node):
+    """Yield a PostgreSQL plan node and all nodes below it."""
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def full_scans(sql, using=DEFAULT_DB_ALIAS):
+    """
+    Return the tables ``sql`` reads in full.
+
+    That is a sequential scan, or a scan of one of the table's indexes
+    without a search condition; index searches do not count, and
+    neither do scans of subquery results or table functions.
+    """
+    connection = connections[using]
+    tables = set(connection.introspection.table_names())
+    if connection.vendor == 'postgresql':
+        return {
+            node['Relation Name'] for node in postgresql_plan(sql, using)
+            if node.get('Relation Name') in tables and 'Index Cond' not in node
+            and node['Node Type'] in ('Seq Scan', 'Index Scan', 'Index Only Scan')
+        }
+    aliases = {alias: table for table, alias in ALIAS_RE.findall(sql)}
+    scanned = set()
+    for line in explain(sql, using):
+        match = SQLITE_SCAN_RE.match(line)
+        name = match and aliases.get(match.group(1), match.group(1))
+        if name in tables:
+            scanned.add(name)
+    return scanned
+
+
+def sorts(sql, using=DEFAULT_DB_ALIAS):
+    """Return whether the plan of ``sql`` sorts rows for its ORDER BY."""
+    if connections[using].vendor == 'postgresql':
+        return any(
+            node['Node Type'] in ('Sort', 'Incremental Sort')
+            for node in postgresql_plan(sql, using)
+        )
+    return any(SQLITE_SORT_RE.match(line) for line in explain(sql, using))
+
+
+class QueryPlanTestMixin:
+    """
+    Assertions on the queries behind one API request, for API test cases.
+
+    Use with ``APITestCase``; requests go through ``self.client``.
+    """
+
+    def assertHotPath(self, method, url, queries, scans=(), ordered=False,
+                      using=DEFAULT_DB_ALIAS, **kwargs):
+        """
+        Request ``url`` and check its queries.
+
+        Args:
+            method: Client method name, e.g. ``'get'``.
+            url: The URL to request.
+            queries: Most queries the request may issue.
+            scans: Tables the endpoint is expected to read in full, e.g.
+                the task table for the unpaginated task list.
+            ordered: Whether every query must read its rows in index
+                order instead of sorting them, as a paginated feed must.
+            using: The database alias.
+            **kwargs: Passed on to the client method.
+
+        Returns:
+            Response: The response, which must not be an error.
+        """
+        connection = connections[using]
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, f'{method.upper()} {url}')
+        executed = [query['sql'] for query in captured.captured_queries]
+        self.assertLessEqual(
+            len(executed), queries,
+            f'{method.upper()} {url} issued {len(executed)} queries, budget {queries}:\n'
+            + '\n'.join(executed),
+        )
+        if connection.vendor not in PLANNED_VENDORS:
+            return response
+        for sql in filter(is_select, executed):
+            unexpected = full_scans(sql, using) - set(scans) - set(SMALL_TABLES)
+            if unexpected:
+                self.fail(
+                    f'{method.upper()} {url} scans {", ".join(sorted(unexpected))} '
+                    f'in full:\n{sql}\n' + '\n'.join(explain(sql, using))
+                )
+            if ordered and sorts(sql, using):
+                self.fail(
+                    f'{method.upper()} {url} sorts its rows:\n{sql}\n'
+                    + '\n'.join(explain(sql, using))
+                )
+        return response
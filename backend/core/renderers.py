@@ -0,0 +1,104 @@
+"""
+Custom renderers for the REST API.
+
+This module provides a compact JSON renderer that never emits
+indentation and uses orjson for encoding when it is installed, and a
+MessagePack renderer for clients negotiating ``application/msgpack``.
+"""
+
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    JSON renderer producing whitespace-free output.
+
+    Ignores the ``indent`` media type parameter so clients cannot opt
+    into pretty-printed payloads, and encodes with orjson when available,
+    falling back to the standard library with compact separators.
+
+    The orjson path produces the same bytes as DRF's JSONRenderer: dates
+    and times go through DRF's JSONEncoder like every type orjson does
+    not know, and U+2028/U+2029 are escaped. It is only taken with
+    ``UNICODE_JSON`` (the default); with ``ensure_ascii`` the standard
+    library encodes. One difference remains: orjson writes NaN and
+    infinite floats as ``null`` where DRF's ``STRICT_JSON`` raises
+    ``ValueError``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render ``data`` into compact UTF-8 encoded JSON.
+
+        Args:
+            data: The serialized data to render.
+            accepted_media_type: The negotiated media type.
+            renderer_context: Context passed by the view.
+
+        Returns:
+            bytes: The encoded JSON document.
+        """
+        if data is None:
+            return b''
+        if orjson is not None and not self.ensure_ascii:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        else:
+            ret = json.dumps(
+                data,
+                cls=self.encoder_class,
+                ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict,
+                separators=(',', ':'),
+            ).encode()
+        # Keep the output a strict JavaScript subset, as DRF does.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer encoding responses as MessagePack.
+
+    Selected by content negotiation for ``Accept: application/msgpack``
+    or ``?format=msgpack``. Values MessagePack cannot represent natively
+    are converted the same way DRF's JSONEncoder converts them.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render ``data`` into MessagePack bytes.
+
+        Args:
+            data: The serialized data to render.
+            accepted_media_type: The negotiated media type.
+            renderer_context: Context passed by the view.
+
+        Returns:
+            bytes: The packed document.
+        """
+        if data is None:
+            return b''
+        return msgpack.packb(
+            data, default=JSONEncoder().default, use_bin_type=True
+        )
@@ -0,0 +1,399 @@
+"""
+Synthetic data for local load and scale testing.
+
+This module generates users, contacts and tasks (with their assignment
+rows) in fixed-size chunks. Every chunk draws from its own random
+generator, seeded with the run's seed, the table and the chunk number,
+so a seed always produces the same rows however the chunks are spread
+over processes. Rows are plain tuples picked from pools of values that
+are adapted for the database once, and each chunk is written with one
+prepared ``executemany`` in its own transaction; ``bulk_create``
+prepares every field of every object on its own and is about ten times
+slower. The seeded tables' secondary indexes are dropped for the load
+and rebuilt once at the end.
+"""
+
+import functools
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from contacts_app.models import Contact
+from tasks_app.models import PRIORITIES, STATUS_DONE, Task, TaskAssignment
+
+FIRST_NAMES = (
+    'Ada', 'Alan', 'Anna', 'Ben', 'Clara', 'David', 'Elif', 'Emma', 'Felix',
+    'Grace', 'Hanna', 'Ivan', 'Jonas', 'Julia', 'Karl', 'Lea', 'Linus',
+    'Maria', 'Max', 'Mia', 'Noah', 'Olga', 'Paul', 'Rosa', 'Sofia', 'Tom',
+)
+LAST_NAMES = (
+    'Becker', 'Braun', 'Fischer', 'Hoffmann', 'Hopper', 'Klein', 'Koch',
+    'Lange', 'Lovelace', 'Meyer', 'Müller', 'Neumann', 'Richter', 'Schmidt',
+    'Schneider', 'Schulz', 'Wagner', 'Weber', 'Wolf', 'Zimmermann',
+)
+WORDS = (
+    'review', 'update', 'design', 'deploy', 'fix', 'write', 'test', 'plan',
+    'login', 'board', 'contacts', 'summary', 'backend', 'frontend', 'docs',
+    'release', 'api', 'layout', 'mobile', 'search', 'cache', 'report',
+)
+DOMAINS = ('example.com', 'example.org', 'example.net', 'mail.example')
+
+# Task status weights: to do, in progress, awaiting feedback, done.
+STATUSES = (1, 2, 3, STATUS_DONE)
+STATUS_WEIGHTS = (30, 15, 15, 40)
+
+# Number of contacts per task and their weights.
+ASSIGNEES = (0, 1, 2, 3)
+ASSIGNEE_WEIGHTS = (20, 40, 30, 10)
+
+# Share of contacts repeating an earlier contact's email, for dedup.
+DUPLICATE_RATE = 0.02
+
+# Due dates are spread over this many days before and after ``today``.
+DUE_SPREAD = 365
+
+# SQLite settings of the loading connections; see ``tune``.
+SQLITE_LOAD_PRAGMAS = {'synchronous': 'OFF', 'foreign_keys': 'OFF', 'cache_size': -262144}
+
+
+class Plan:
+    """
+    The id ranges and shared values of one seed run.
+
+    Ids are assigned up front, after the highest existing id of each
+    table, so tasks can reference contacts and users written by other
+    processes.
+
+    Attributes:
+        seed: The random seed.
+        today: Due dates are spread around this date.
+        chunk_size: Rows written per chunk and transaction.
+        using: The database alias.
+        ranges: Table name -> ``range`` of the ids to create.
+        password: Password hash shared by all users.
+    """
+
+    def __init__(self, counts, seed, today, chunk_size, using, password):
+        self.seed = seed
+        self.today = today
+        self.chunk_size = chunk_size
+        self.using = using
+        # A fixed salt keeps the users reproducible too.
+        self.password = make_password(password, salt=f'seed-{seed:08}')
+        self.ranges = {}
+        for name, model in (('users', User), ('contacts', Contact), ('tasks', Task)):
+            last = model._base_manager.using(using).order_by('-pk').values_list(
+                'pk', flat=True
+            ).first() or 0
+            self.ranges[name] = range(last + 1, last + 1 + counts.get(name, 0))
+
+    def chunks(self, table):
+        """Return the ``(index, ids)`` chunks of ``table``."""
+        ids = self.ranges[table]
+        return [
+            (index, ids[start:start + self.chunk_size])
+            for index, start in enumerate(range(0, len(ids), self.chunk_size))
+        ]
+
+
+@functools.lru_cache(maxsize=4)
+def pools(seed, today, using):
+    """
+    Build the value pools rows are picked from, adapted for ``using``.
+
+    Returns:
+        dict: Pool name -> tuple of values.
+    """
+    rng = random.Random(f'{seed}:pools')
+    connection = connections[using]
+    ops = connection.ops
+    json_field = Task._meta.get_field('subtasks')
+    days = [today + timedelta(days=offset) for offset in range(-DUE_SPREAD, DUE_SPREAD + 1)]
+    return {
+        'titles': tuple(
+            f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {rng.choice(WORDS)}'
+            for _ in range(1024)
+        ),
+        'descriptions': tuple(
+            ' '.join(rng.choices(WORDS, k=rng.choice((0, 0, 5, 12, 30, 60)))).capitalize()
+            for _ in range(256)
+        ),
+        'subtasks': tuple(
+            json_field.get_db_prep_save([
+                {'title': f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)}',
+                 'done': rng.random() < 0.5}
+                for _ in range(rng.choice((0, 0, 1, 2, 3, 5)))
+            ], connection)
+            for _ in range(256)
+        ),
+        'dates': tuple(ops.adapt_datefield_value(day) for day in days),
+        'datetimes': tuple(
+            ops.adapt_datetimefield_value(datetime.combine(
+                day, time(rng.randrange(8, 19), rng.randrange(60)), dt_timezone.utc,
+            ))
+            for day in days
+        ),
+    }
+
+
+def id_list_adapter(connection):
+    """Return a function adapting a JSON list of ids for ``connection``."""
+    if connection.vendor == 'sqlite':
+        # Stored as text, formatted as json.dumps would; the field sets
+        # up an encoder per call and costs more than the insert.
+        return lambda ids: '[' + ', '.join(map(str, ids)) + ']'
+    field = Task._meta.get_field('assignedTo')
+    return lambda ids: field.get_db_prep_save(ids, connection)
+
+
+def insert(using, model, columns, rows):
+    """Insert ``rows`` (tuples of ``columns``) with one prepared statement."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in columns]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+    return len(rows)
+
+
+def user_rows(plan, rng, ids):
+    """Insert the users ``ids``; all share the plan's password."""
+    values = pools(plan.seed, plan.today, plan.using)
+    rows = []
+    for pk, first, last, joined in zip(
+        ids,
+        rng.choices(FIRST_NAMES, k=len(ids)),
+        rng.choices(LAST_NAMES, k=len(ids)),
+        rng.choices(values['datetimes'][:DUE_SPREAD], k=len(ids)),
+    ):
+        email = f'{first}.{last}.{pk}@example.com'.lower()
+        rows.append((
+            pk, email, email, first, last, plan.password, False, False, True, joined,
+        ))
+    return insert(plan.using, User, (
+        'id', 'username', 'email', 'first_name', 'last_name', 'password',
+        'is_superuser', 'is_staff', 'is_active', 'date_joined',
+    ), rows)
+
+
+def contact_rows(plan, rng, ids):
+    """Insert the contacts ``ids``, a few repeating an earlier email."""
+    users = plan.ranges['users'] or [None]
+    rows = []
+    for pk, first, last, domain, owner in zip(
+        ids,
+        rng.choices(FIRST_NAMES, k=len(ids)),
+        rng.choices(LAST_NAMES, k=len(ids)),
+        rng.choices(DOMAINS, k=len(ids)),
+        rng.choices(users, k=len(ids)),
+    ):
+        if rows and rng.random() < DUPLICATE_RATE:
+            email = f' {rng.choice(rows)[3].upper()} '
+        else:
+            email = f'{first}.{last}{pk}@{domain}'.lower()
+        phone = f'+49 1{rng.randrange(50, 80)} {rng.randrange(10 ** 7):07d}'
+        rows.append((pk, first, last, email, phone, owner, 1))
+    return insert(plan.using, Contact, (
+        'id', 'firstName', 'lastName', 'email', 'phoneNumber', 'uid', 'version',
+    ), rows)
+
+
+def task_rows(plan, rng, ids):
+    """Insert the tasks ``ids`` and, if enabled, their assignment rows."""
+    values = pools(plan.seed, plan.today, plan.using)
+    adapt_ids = id_list_adapter(connections[plan.using])
+    contacts = plan.ranges['contacts']
+    users = plan.ranges['users'] or [None]
+    days = range(len(values['dates']))
+    counts = rng.choices(ASSIGNEES, ASSIGNEE_WEIGHTS, k=len(ids)) if contacts else [0] * len(ids)
+    picks = iter(rng.choices(contacts, k=sum(counts)))
+    unassigned = adapt_ids([])
+    rows, assignments = [], []
+    for pk, title, description, subtasks, priority, day, status, owner, count in zip(
+        ids,
+        rng.choices(values['titles'], k=len(ids)),
+        rng.choices(values['descriptions'], k=len(ids)),
+        rng.choices(values['subtasks'], k=len(ids)),
+        rng.choices(PRIORITIES, k=len(ids)),
+        rng.choices(days, k=len(ids)),
+        rng.choices(STATUSES, STATUS_WEIGHTS, k=len(ids)),
+        rng.choices(users, k=len(ids)),
+        counts,
+    ):
+        assigned = unassigned
+        if count:
+            contact_ids = sorted(set(islice(picks, count)))
+            assigned = adapt_ids(contact_ids)
+            assignments.extend((pk, contact, status, priority, owner) for contact in contact_ids)
+        rows.append((
+            pk, title, description, subtasks, priority, pk % 2 + 1,
+            values['dates'][day], assigned, status, 1,
+            values['datetimes'][day] if status == STATUS_DONE else None, owner,
+        ))
+    written = insert(plan.using, Task, (
+        'id', 'title', 'description', 'subtasks', 'priority', 'category', 'dueDate',
+        'assignedTo', 'status', 'version', 'completedAt', 'owner',
+    ), rows)
+    if settings.TASK_ASSIGNMENT_INDEX and assignments:
+        written += insert(plan.using, TaskAssignment, (
+            'task', 'contact_id', 'status', 'priority', 'owner',
+        ), assignments)
+    return written
+
+
+# Row writers in dependency order.
+TABLES = {'users': user_rows, 'contacts': contact_rows, 'tasks': task_rows}
+
+
+def tune(using):
+    """
+    Relax durability and checks on the loading connection.
+
+    The data is disposable and only references ids planned up front, so
+    SQLite skips syncing and foreign key checks and gets a large page
+    cache; PostgreSQL commits without waiting for the WAL flush.
+
+    Returns:
+        list: Statements restoring the previous settings.
+    """
+    connection = connections[using]
+    restore = []
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name, value in SQLITE_LOAD_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {name}')
+                restore.append(f'PRAGMA {name} = {cursor.fetchone()[0]}')
+                cursor.execute(f'PRAGMA {name} = {value}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SET synchronous_commit TO OFF')
+            restore.append('RESET synchronous_commit')
+    return restore
+
+
+def write_chunk(plan, table, index, ids):
+    """
+    Generate and insert chunk ``index`` of ``table`` in one transaction.
+
+    Returns:
+        tuple: ``(table, rows written)``.
+    """
+    rng = random.Random(f'{plan.seed}:{table}:{index}')
+    with transaction.atomic(using=plan.using):
+        return table, TABLES[table](plan, rng, ids)
+
+
+def start_worker(using):
+    """Set up Django and a tuned connection in a pool process."""
+    django.setup()
+    tune(using)
+
+
+def secondary_indexes(using, model):
+    """
+    Return the ``(name, CREATE statement)`` of the non-unique indexes.
+
+    Only SQLite and PostgreSQL can report their index definitions; other
+    databases keep their indexes during the load.
+    """
+    connection = connections[using]
+    queries = {
+        'sqlite': (
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = %s AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%%'"
+        ),
+        'postgresql': (
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s "
+            "AND indexdef NOT LIKE 'CREATE UNIQUE%%'"
+        ),
+    }
+    if connection.vendor not in queries:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(queries[connection.vendor], [model._meta.db_table])
+        return cursor.fetchall()
+
+
+def seed(counts, seed=0, today=None, processes=1, chunk_size=50000,
+         using=DEFAULT_DB_ALIAS, password='pw-seed-1234'):
+    """
+    Add synthetic users, contacts and tasks to the database.
+
+    Tables are filled in that order, so every reference points at a
+    written row; the chunks of one table run in ``processes`` worker
+    processes. On SQLite the workers take turns writing and generate
+    their next chunk meanwhile. Indexes are rebuilt and the tables
+    analyzed even when the run is interrupted.
+
+    Args:
+        counts: Dict with the number of ``users``, ``contacts`` and
+            ``tasks`` to create.
+        seed: Seed of the generated values.
+        today: Due dates are spread a year around this date; defaults
+            to the current date.
+        processes: Worker processes; 1 writes in this process.
+        chunk_size: Rows per chunk and transaction.
+        using: The database alias.
+        password: Password of every seeded user.
+
+    Yields:
+        tuple: ``(table, rows)`` per written chunk; task chunks count
+            their assignment rows too.
+    """
+    today = today or datetime.now(dt_timezone.utc).date()
+    plan = Plan(counts, seed, today, chunk_size, using, password)
+    models = [User, Contact, Task, TaskAssignment]
+    dropped = [index for model in models for index in secondary_indexes(using, model)]
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    executor, restore = None, []
+    try:
+        with connection.cursor() as cursor:
+            for name, _ in dropped:
+                cursor.execute(f'DROP INDEX {quote(name)}')
+        if processes > 1:
+            # Children must not inherit open database connections.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                processes, initializer=start_worker, initargs=(using,)
+            )
+        else:
+            restore = tune(using)
+        for table in TABLES:
+            if executor is None:
+                for index, ids in plan.chunks(table):
+                    yield write_chunk(plan, table, index, ids)
+                continue
+            futures = [
+                executor.submit(write_chunk, plan, table, index, ids)
+                for index, ids in plan.chunks(table)
+            ]
+            for future in futures:
+                yield future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        with connection.cursor() as cursor:
+            for _, statement in dropped:
+                cursor.execute(statement)
+            for statement in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(statement)
+            if connection.vendor == 'sqlite':
+                # Sample the indexes instead of reading them in full.
+                cursor.execute('PRAGMA analysis_limit = 1000')
+            for model in models:
+                cursor.execute(f'ANALYZE {quote(model._meta.db_table)}')
+            for statement in restore:
+                cursor.execute(statement)
@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,12 +44,18 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
+    'core',
     'user_auth_app',
     'contacts_app',
     'tasks_app',
+    'activity_app',
+    'jobs_app',
 ]
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +75,11 @@ CSRF_TRUSTED_ORIGINS = [origin.strip() for origin in CSRF_TRUSTED_ORIGINS_ENV.sp
 CORS_ALLOWED_ORIGINS_ENV = os.environ.get('DJANGO_CORS_ALLOWED_ORIGINS', 'http://127.0.0.1:4200,http://localhost:4200')
 CORS_ALLOWED_ORIGINS = [origin.strip() for origin in CORS_ALLOWED_ORIGINS_ENV.split(',') if origin.strip()]
 
+# Conditional updates send If-Match and read the version from ETag,
+# retried writes send Idempotency-Key
+CORS_ALLOW_HEADERS = (*default_headers, 'if-match', 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['ETag', 'Idempotent-Replayed']
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -104,6 +118,18 @@ if DB_ENGINE == 'django.db.backends.sqlite3':
         'default': {
             'ENGINE': DB_ENGINE,
             'NAME': BASE_DIR / 'data' / db_name,
+            # Every atomic() block starts with BEGIN IMMEDIATE and takes the
+            # single write lock up front, waiting up to `timeout` seconds for
+            # it. A deferred transaction that reads first and then writes
+            # fails with "database is locked" instead of waiting. Requests
+            # that only read run outside atomic() and never take the lock;
+            # WAL lets them run alongside a writer. Measurements are in
+            # DOCKER_DEPLOYMENT.md.
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            },
         }
     }
     # Create data directory if it doesn't exist
@@ -120,6 +146,40 @@ else:
         }
     }
 
+# Persistent connections
+# Each gunicorn worker thread keeps its own connection for DB_CONN_MAX_AGE
+# seconds, checked before reuse, so a server with PostgreSQL must allow
+# replicas x GUNICORN_WORKERS x GUNICORN_THREADS connections plus the job
+# worker's. Django advises against persistent connections under ASGI, so
+# the uvicorn worker class closes them after each request by default.
+ASGI_WORKERS = os.environ.get('GUNICORN_WORKER_CLASS') == 'uvicorn'
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE') or (0 if ASGI_WORKERS else 60))
+DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+DATABASES['default']['CONN_HEALTH_CHECKS'] = DB_CONN_MAX_AGE > 0
+
+# Read replicas (optional)
+# DB_REPLICAS is a comma-separated list of SQLite file names in data/ or,
+# for other engines, replica hosts (host or host:port) sharing the primary's
+# credentials. Safe requests to REPLICA_READ_PATHS read models of
+# REPLICA_APP_LABELS from a replica unless the client wrote within the last
+# REPLICA_PIN_SECONDS. Replicas mirror the primary database in tests.
+DB_REPLICAS = [name.strip() for name in os.environ.get('DB_REPLICAS', '').split(',') if name.strip()]
+REPLICA_DATABASES = []
+for index, replica in enumerate(DB_REPLICAS, start=1):
+    alias = f'replica{index}'
+    if DB_ENGINE == 'django.db.backends.sqlite3':
+        replica_settings = {'NAME': BASE_DIR / 'data' / os.path.basename(replica)}
+    else:
+        host, _, port = replica.partition(':')
+        replica_settings = {'HOST': host, 'PORT': port or DATABASES['default']['PORT']}
+    DATABASES[alias] = {**DATABASES['default'], **replica_settings, 'TEST': {'MIRROR': 'default'}}
+    REPLICA_DATABASES.append(alias)
+
+REPLICA_READ_PATHS = ['/api/v1/task/', '/api/v1/contact/', '/api/v1/auth/users/', '/api/v1/activity/', '/api/v1/bootstrap/']
+REPLICA_APP_LABELS = ['tasks_app', 'contacts_app', 'activity_app', 'auth']
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', '5'))
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter'] if REPLICA_DATABASES else []
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -140,6 +200,24 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# The preferred profile hashes new passwords; the others only verify
+# existing hashes, which are upgraded transparently on the next login.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'core.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'core.hashers.TunedScryptPasswordHasher',
+    'argon2': 'core.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('DJANGO_PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('DJANGO_PASSWORD_PBKDF2_ITERATIONS', '1000000'))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('DJANGO_PASSWORD_SCRYPT_WORK_FACTOR', str(2 ** 14)))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('DJANGO_PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('DJANGO_PASSWORD_ARGON2_MEMORY_COST', '19456'))
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('DJANGO_PASSWORD_ARGON2_PARALLELISM', '1'))
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -163,11 +241,154 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Tests keep the counters, startup lock, snapshots and profiles out of data/.
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.CompactJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ]
-}
\ No newline at end of file
+    ],
+    # Every endpoint gets a per-user read and write budget; the auth
+    # endpoints replace them with their per-IP login/registration/guest
+    # budgets. An empty rate disables that budget.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.ReadRateThrottle',
+        'core.throttling.WriteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'read': os.environ.get('DJANGO_THROTTLE_READ', '600/min') or None,
+        'write': os.environ.get('DJANGO_THROTTLE_WRITE', '120/min') or None,
+        'login': os.environ.get('DJANGO_THROTTLE_LOGIN', '20/min'),
+        'registration': os.environ.get('DJANGO_THROTTLE_REGISTRATION', '5/min'),
+        'guest': os.environ.get('DJANGO_THROTTLE_GUEST', '10/min'),
+    },
+    # Number of reverse proxies (Traefik) in front of the backend, used to
+    # pick the client address from X-Forwarded-For
+    'NUM_PROXIES': int(os.environ['DJANGO_NUM_PROXIES']) if os.environ.get('DJANGO_NUM_PROXIES') else None,
+}
+
+# MessagePack support is optional and enabled when msgpack is installed
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].insert(1, 'core.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('core.parsers.MessagePackParser')
+
+# Idempotency keys
+# Responses to writes sent with an Idempotency-Key header are kept for
+# IDEMPOTENCY_TTL seconds; expire them with `manage.py purge_idempotency_keys`.
+IDEMPOTENCY_TTL = int(os.environ.get('DJANGO_IDEMPOTENCY_TTL', str(24 * 60 * 60)))
+
+# Rate limiting
+# Counters are shared by all workers through a small SQLite file. An account
+# is locked for one client IP address for LOGIN_FAILURE_WINDOW seconds after
+# LOGIN_FAILURE_LIMIT failed logins from it within that window. After
+# LOGIN_ACCOUNT_FAILURE_LIMIT failed logins from any addresses in the window,
+# clients that never logged in to the account get one attempt per
+# LOGIN_ACCOUNT_BACKOFF seconds between them; the account is never locked.
+RATE_LIMIT_STORE_PATH = BASE_DIR / 'data' / 'counters.sqlite3'
+LOGIN_FAILURE_LIMIT = int(os.environ.get('DJANGO_LOGIN_FAILURE_LIMIT', '5'))
+LOGIN_FAILURE_WINDOW = int(os.environ.get('DJANGO_LOGIN_FAILURE_WINDOW', '900'))
+LOGIN_ACCOUNT_FAILURE_LIMIT = int(os.environ.get('DJANGO_LOGIN_ACCOUNT_FAILURE_LIMIT', '50'))
+LOGIN_ACCOUNT_BACKOFF = int(os.environ.get('DJANGO_LOGIN_ACCOUNT_BACKOFF', '10'))
+
+# Guest accounts
+# Visitors claim a pre-provisioned guest account from a pool of
+# GUEST_POOL_SIZE accounts (`manage.py fill_guest_pool`); accounts expire
+# GUEST_TTL seconds after being claimed (`manage.py reclaim_guests`).
+GUEST_POOL_SIZE = int(os.environ.get('DJANGO_GUEST_POOL_SIZE', '20'))
+GUEST_TTL = int(os.environ.get('DJANGO_GUEST_TTL', str(24 * 60 * 60)))
+
+# Task archive
+# `manage.py archive_tasks` moves tasks done for more than
+# TASK_ARCHIVE_AFTER_DAYS days out of the live table.
+TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get('DJANGO_TASK_ARCHIVE_AFTER_DAYS', '30'))
+
+# Task workload
+# With TASK_ASSIGNMENT_INDEX the per-contact workload is read from an
+# assignment table refreshed on every task write; without it, it is
+# computed from the assignedTo JSON on each request. Run
+# `manage.py rebuild_task_assignments` after switching it back on.
+TASK_ASSIGNMENT_INDEX = os.environ.get('DJANGO_TASK_ASSIGNMENT_INDEX', 'True') == 'True'
+
+# Activity log
+# Task and contact writes append an entry with the written fields; values
+# are cut to ACTIVITY_MAX_VALUE_LENGTH characters. `manage.py
+# prune_activity` deletes entries older than ACTIVITY_RETENTION_DAYS.
+ACTIVITY_LOG_ENABLED = os.environ.get('DJANGO_ACTIVITY_LOG', 'True') == 'True'
+ACTIVITY_MAX_VALUE_LENGTH = int(os.environ.get('DJANGO_ACTIVITY_MAX_VALUE_LENGTH', '200'))
+ACTIVITY_RETENTION_DAYS = int(os.environ.get('DJANGO_ACTIVITY_RETENTION_DAYS', '90'))
+
+# Background jobs
+# `manage.py run_jobs` runs queued jobs JOB_CONCURRENCY at a time, polling
+# every JOB_POLL_INTERVAL seconds. Failed jobs are retried up to
+# JOB_MAX_ATTEMPTS times after JOB_RETRY_DELAY seconds, doubling each time.
+# Workers renew the lease of a running job every JOB_TIMEOUT / 4 seconds; a
+# job whose lease was not renewed for JOB_TIMEOUT seconds counts as abandoned.
+# Finished jobs are kept for JOB_RETENTION_DAYS.
+JOB_CONCURRENCY = int(os.environ.get('DJANGO_JOB_CONCURRENCY', '2'))
+JOB_POLL_INTERVAL = float(os.environ.get('DJANGO_JOB_POLL_INTERVAL', '1'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('DJANGO_JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_DELAY = int(os.environ.get('DJANGO_JOB_RETRY_DELAY', '30'))
+JOB_TIMEOUT = int(os.environ.get('DJANGO_JOB_TIMEOUT', '300'))
+JOB_RETENTION_DAYS = int(os.environ.get('DJANGO_JOB_RETENTION_DAYS', '7'))
+
+# Database snapshots
+# `manage.py backup_db` writes gzip-compressed, checksummed snapshots of the
+# SQLite database to BACKUP_DIR and keeps the newest BACKUP_KEEP. With
+# BACKUP_INTERVAL seconds > 0 the job worker takes one on that schedule.
+BACKUP_DIR = Path(os.environ.get('DJANGO_BACKUP_DIR', BASE_DIR / 'data' / 'backups'))
+BACKUP_KEEP = int(os.environ.get('DJANGO_BACKUP_KEEP', '7'))
+BACKUP_INTERVAL = int(os.environ.get('DJANGO_BACKUP_INTERVAL', '0'))
+
+# Periodic jobs queued by the worker: job name -> interval in seconds.
+JOB_SCHEDULE = {'backup_db': BACKUP_INTERVAL} if BACKUP_INTERVAL > 0 else {}
+
+# Container startup
+# `manage.py startup` (run by entrypoint.sh) warns when its migrate, guest
+# pool and superuser steps take longer than this many milliseconds. Those
+# steps hold STARTUP_LOCK_PATH (a PostgreSQL advisory lock on PostgreSQL),
+# so backend replicas starting together run them one after the other.
+STARTUP_BUDGET_MS = int(os.environ.get('DJANGO_STARTUP_BUDGET_MS', '1500'))
+STARTUP_LOCK_PATH = BASE_DIR / 'data' / 'startup.lock'
+
+# Response compression
+# API responses of at least COMPRESSION_MIN_SIZE bytes are compressed with
+# brotli (if installed) or gzip, depending on the client's Accept-Encoding.
+COMPRESSION_MIN_SIZE = int(os.environ.get('DJANGO_COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('DJANGO_COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('DJANGO_COMPRESSION_BROTLI_QUALITY', '4'))
+COMPRESSION_CONTENT_TYPES = ['application/json', 'application/msgpack']
+
+# List streaming
+# With LIST_STREAMING the unpaginated task, contact and user lists stream
+# their JSON, LIST_STREAMING_CHUNK_SIZE rows at a time, so a worker's peak
+# memory no longer grows with the number of rows. Sync (WSGI) workers only:
+# Django's ASGI handler buffers such a stream, so ASGI requests are buffered.
+LIST_STREAMING = os.environ.get('DJANGO_LIST_STREAMING', 'False') == 'True'
+LIST_STREAMING_CHUNK_SIZE = int(os.environ.get('DJANGO_LIST_STREAMING_CHUNK_SIZE', '2000'))
+
+# Request profiling (opt-in)
+# Profiles a sampled fraction of requests and/or every request slower than
+# PROFILING_SLOW_MS (0 disables the threshold). Captures are rotated in
+# data/profiles/; inspect them with `python manage.py profile_report`.
+PROFILING_ENABLED = os.environ.get('DJANGO_PROFILING', 'False') == 'True'
+PROFILING_SAMPLE_RATE = float(os.environ.get('DJANGO_PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SLOW_MS = float(os.environ.get('DJANGO_PROFILING_SLOW_MS', '0'))
+PROFILING_MAX_CAPTURES = int(os.environ.get('DJANGO_PROFILING_MAX_CAPTURES', '200'))
+# PROFILING_MEMORY traces allocations with tracemalloc and records the peak
+# memory of every capture; every request whose peak exceeds PROFILING_PEAK_KB
+# is captured too (0 disables the threshold).
+PROFILING_MEMORY = os.environ.get('DJANGO_PROFILING_MEMORY', 'False') == 'True'
+PROFILING_PEAK_KB = float(os.environ.get('DJANGO_PROFILING_PEAK_KB', '0'))
+PROFILING_DIR = BASE_DIR / 'data' / 'profiles'
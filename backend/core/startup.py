@@ -0,0 +1,95 @@
+"""
+Container startup tasks.
+
+This module holds the steps the entrypoint used to run as separate
+processes (migrate, guest pool, superuser) so the ``startup`` command
+can run them in one interpreter and skip the ones with nothing to do.
+With several backend replicas the steps are serialized by a lock, so
+only the first replica migrates.
+"""
+
+import fcntl
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+def wait_for_database(alias=DEFAULT_DB_ALIAS, timeout=30.0, interval=0.25):
+    """
+    Wait until the database ``alias`` accepts connections.
+
+    Replaces a fixed sleep: a reachable database costs one connect.
+
+    Raises:
+        OperationalError: If the database is still unreachable after
+            ``timeout`` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connections[alias].ensure_connection()
+            return
+        except OperationalError:
+            if time.monotonic() >= deadline:
+                raise
+            connections[alias].close()
+            time.sleep(interval)
+
+
+# Key of the PostgreSQL advisory lock taken by ``startup_lock``.
+STARTUP_LOCK_KEY = 0x6A6F696E
+
+
+@contextmanager
+def startup_lock(alias=DEFAULT_DB_ALIAS):
+    """
+    Hold the lock serializing the startup steps of all replicas.
+
+    PostgreSQL takes a session advisory lock; other databases lock
+    ``STARTUP_LOCK_PATH``, which replicas share through the data volume.
+    """
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s)', [STARTUP_LOCK_KEY])
+            try:
+                yield
+            finally:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [STARTUP_LOCK_KEY])
+        return
+    with open(settings.STARTUP_LOCK_PATH, 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def pending_migrations(alias=DEFAULT_DB_ALIAS):
+    """
+    Return the migrations not yet applied to the database ``alias``.
+
+    Reads only the ``django_migrations`` table, so checking a current
+    schema is far cheaper than a no-op ``migrate`` run.
+    """
+    executor = MigrationExecutor(connections[alias])
+    targets = executor.loader.graph.leaf_nodes()
+    return [migration for migration, _ in executor.migration_plan(targets)]
+
+
+def ensure_superuser(username, email, password):
+    """
+    Create the superuser ``username`` unless it already exists.
+
+    Returns:
+        bool: Whether the user was created.
+    """
+    User = get_user_model()
+    if User.objects.filter(username=username).exists():
+        return False
+    User.objects.create_superuser(username=username, email=email, password=password)
+    return True
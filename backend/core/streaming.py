@@ -0,0 +1,76 @@
+"""
+Streaming responses for large list endpoints.
+
+This module provides a list view mixin answering JSON list requests with
+a ``StreamingHttpResponse`` when ``LIST_STREAMING`` is enabled. Rows are
+read through a chunked database cursor, serialized one at a time and
+encoded a chunk at a time, so the peak memory of a request depends on
+the chunk size instead of the number of rows. The body is the same JSON
+array the buffered response carries.
+
+Requests served through ASGI (the uvicorn worker class) are not
+streamed: Django's ASGI handler consumes a synchronous iterator in full
+before sending it, so streaming would only add overhead there while the
+whole body still sits in memory.
+"""
+
+from itertools import islice
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+
+def stream_json(rows, serializer, renderer, chunk_size):
+    """
+    Yield a JSON array of ``rows`` as encoded chunks.
+
+    Args:
+        rows: Iterable of model instances.
+        serializer: Serializer whose ``to_representation`` turns one
+            instance into a dict.
+        renderer: JSON renderer encoding a list of dicts.
+        chunk_size: Rows encoded per chunk.
+
+    Yields:
+        bytes: Consecutive parts of the JSON document.
+    """
+    items = map(serializer.to_representation, rows)
+    opening = b'['
+    while batch := list(islice(items, chunk_size)):
+        yield opening + renderer.render(batch)[1:-1]
+        opening = b','
+    yield b']' if opening == b',' else b'[]'
+
+
+class StreamingListMixin:
+    """
+    Mixin for list views streaming their JSON response.
+
+    Only unpaginated views rendering JSON under WSGI stream; MessagePack,
+    the browsable API and ASGI requests keep the buffered response.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """Stream the list when ``LIST_STREAMING`` is enabled."""
+        renderer = request.accepted_renderer
+        if not (
+            settings.LIST_STREAMING and self.paginator is None
+            and isinstance(renderer, JSONRenderer)
+            and not isinstance(request._request, ASGIRequest)
+        ):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Route now: the replica picked for the request is only known
+        # while the view runs, not while the body is being sent.
+        rows = queryset.using(queryset.db).iterator(
+            chunk_size=settings.LIST_STREAMING_CHUNK_SIZE
+        )
+        return StreamingHttpResponse(
+            stream_json(
+                rows, self.get_serializer(), renderer,
+                settings.LIST_STREAMING_CHUNK_SIZE,
+            ),
+            content_type=renderer.media_type,
+        )
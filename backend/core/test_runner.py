@@ -0,0 +1,35 @@
+"""
+Test runner keeping the test suite out of the ``data`` directory.
+
+The rate-limit counters, startup lock, snapshots and profiles default to
+files under ``BASE_DIR / 'data'``, which a developer's server shares.
+The runner points all of them at a temporary directory for the whole
+run, so no test reads or leaves state there.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner with the data file settings in a temporary directory."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.data_dir = Path(tempfile.mkdtemp(prefix='test-data-'))
+        self.data_settings = override_settings(
+            RATE_LIMIT_STORE_PATH=self.data_dir / 'counters.sqlite3',
+            STARTUP_LOCK_PATH=self.data_dir / 'startup.lock',
+            BACKUP_DIR=self.data_dir / 'backups',
+            PROFILING_DIR=self.data_dir / 'profiles',
+        )
+        self.data_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.data_settings.disable()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,656 @@
+"""
+Tests for the project-wide middleware and helpers of the core package.
+"""
+
+import fcntl
+import gzip
+import importlib
+import json
+import os
+import random
+import runpy
+import shutil
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
+import uuid
+from contextlib import ExitStack
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from time import perf_counter
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework.throttling import SimpleRateThrottle
+
+from contacts_app.models import Contact
+from core import gunicorn_conf, renderers
+from core.backup import BackupError, copy_database, restore, snapshot, verify
+from core.compression import CompressionMiddleware, accepted_encodings, brotli
+from core.db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware, current_read_alias
+from core.profiling import ProfilingMiddleware, load_captures
+from core.renderers import CompactJSONRenderer
+from core.seed import secondary_indexes, seed
+from core.startup import startup_lock
+from tasks_app.models import Task, TaskAssignment
+
+
+def profiled_users():
+    """Return the users created by the tests, not the migrated guest."""
+    return User.objects.filter(username__startswith='profiled-').order_by('id')
+
+
+def count_users(request):
+    """View running one query, standing in for an API endpoint."""
+    return HttpResponse(str(profiled_users().count()))
+
+
+def stream_users(request):
+    """Streaming view running its query while the body is sent."""
+    return StreamingHttpResponse(
+        f'{user.username}\n'.encode() for user in profiled_users()
+    )
+
+
+def use_fresh_counters(test):
+    """Point the rate counters at an empty store for the rest of ``test``."""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    store = test.settings(RATE_LIMIT_STORE_PATH=Path(directory) / 'counters.sqlite3')
+    store.enable()
+    test.addCleanup(store.disable)
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """The profiler stays out of the way unless enabled and keeps bodies intact."""
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.factory = RequestFactory()
+        User.objects.create_user('profiled-alice')
+        User.objects.create_user('profiled-bob')
+
+    def profile(self, view, **overrides):
+        options = {
+            'PROFILING_ENABLED': True, 'PROFILING_SAMPLE_RATE': 1,
+            'PROFILING_DIR': self.directory, **overrides,
+        }
+        with self.settings(**options):
+            response = ProfilingMiddleware(view)(self.factory.get('/api/v1/users/'))
+            body = (
+                b''.join(response.streaming_content) if response.streaming
+                else response.content
+            )
+            return response, body, load_captures()
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(count_users)
+
+    def test_unsampled_requests_are_not_captured(self):
+        response, body, captures = self.profile(count_users, PROFILING_SAMPLE_RATE=0)
+        self.assertEqual(body, b'2')
+        self.assertEqual(captures, [])
+
+    def test_sampled_request_records_timings_and_queries(self):
+        response, body, [capture] = self.profile(count_users)
+        self.assertEqual(body, b'2')
+        self.assertEqual(capture['status'], 200)
+        self.assertEqual(capture['path'], '/api/v1/users/')
+        self.assertEqual(capture['query_count'], 1)
+        self.assertIn('COUNT(*)', capture['queries'][0]['sql'])
+        self.assertGreaterEqual(capture['duration_ms'], capture['query_ms'])
+        self.assertIsNone(capture['peak_kb'])
+        self.assertTrue((self.directory / f'{capture["stem"]}.prof').exists())
+        stored = json.loads((self.directory / f'{capture["stem"]}.json').read_text())
+        self.assertEqual(stored['query_count'], 1)
+
+    def test_slow_threshold_keeps_only_slow_requests(self):
+        *_, captures = self.profile(
+            count_users, PROFILING_SAMPLE_RATE=0, PROFILING_SLOW_MS=60_000
+        )
+        self.assertEqual(captures, [])
+        *_, captures = self.profile(
+            count_users, PROFILING_SAMPLE_RATE=0, PROFILING_SLOW_MS=0.001
+        )
+        self.assertEqual(len(captures), 1)
+
+    def test_captures_are_rotated(self):
+        for _ in range(3):
+            *_, captures = self.profile(count_users, PROFILING_MAX_CAPTURES=2)
+        self.assertEqual(len(captures), 2)
+
+    def test_streaming_response_is_passed_through(self):
+        response, body, captures = self.profile(stream_users)
+        self.assertTrue(response.streaming)
+        self.assertEqual(body, b'profiled-alice\nprofiled-bob\n')
+        self.assertEqual(len(captures), 1)
+
+    def test_streaming_response_with_memory_tracing(self):
+        try:
+            response, body, [capture] = self.profile(stream_users, PROFILING_MEMORY=True)
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(body, b'profiled-alice\nprofiled-bob\n')
+        self.assertIsNotNone(capture['peak_kb'])
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Responses are compressed as negotiated, and only when it pays off."""
+
+    BODY = json.dumps([{'id': index, 'title': 'Task'} for index in range(50)]).encode()
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def compress(self, response, accept='gzip, deflate, br'):
+        request = self.factory.get('/api/v1/task/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, body=BODY, **kwargs):
+        return HttpResponse(body, content_type='application/json', **kwargs)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings('gzip, br;q=0.5, identity'), {'gzip', 'br', 'identity'}
+        )
+        self.assertEqual(accepted_encodings('br;q=0, GZIP'), {'gzip'})
+        self.assertEqual(accepted_encodings('gzip;q=., br;q=1.2.3, deflate'), {'deflate'})
+        self.assertEqual(accepted_encodings(None), set())
+
+    def test_gzip(self):
+        response = self.compress(self.json_response(), accept='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+
+    @skipIf(brotli is None, 'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        response = self.compress(self.json_response())
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.BODY)
+
+    def test_identity_leaves_body_but_varies(self):
+        for accept in ('identity', '', 'gzip;q=0'):
+            response = self.compress(self.json_response(), accept=accept)
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            self.assertEqual(response.content, self.BODY)
+
+    def test_small_and_foreign_responses_are_left_alone(self):
+        small = self.compress(self.json_response(b'[1,2,3]'))
+        html = self.compress(HttpResponse(self.BODY, content_type='text/html'))
+        for response in (small, html):
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertFalse(response.has_header('Vary'))
+
+    def test_already_encoded_response_is_left_alone(self):
+        response = self.json_response()
+        response['Content-Encoding'] = 'deflate'
+        response = self.compress(response)
+        self.assertEqual(response['Content-Encoding'], 'deflate')
+        self.assertEqual(response.content, self.BODY)
+
+    def test_incompressible_body_is_sent_as_is(self):
+        body = random.Random(0).randbytes(300)
+        response = self.compress(self.json_response(body), accept='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, body)
+
+    def test_sync_stream_is_compressed_chunk_by_chunk(self):
+        chunks = [self.BODY[index:index + 100] for index in range(0, len(self.BODY), 100)]
+        response = self.compress(
+            StreamingHttpResponse(iter(chunks), content_type='application/json'),
+            accept='gzip',
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.BODY)
+
+    def test_async_stream_is_left_alone(self):
+        async def chunks():
+            yield self.BODY
+
+        response = self.compress(
+            StreamingHttpResponse(chunks(), content_type='application/json')
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_strong_etag_is_weakened(self):
+        response = self.json_response()
+        response['ETag'] = '"v3"'
+        self.assertEqual(self.compress(response, accept='gzip')['ETag'], 'W/"v3"')
+        response = self.json_response()
+        response['ETag'] = 'W/"v3"'
+        self.assertEqual(self.compress(response, accept='gzip')['ETag'], 'W/"v3"')
+        uncompressed = self.json_response()
+        uncompressed['ETag'] = '"v3"'
+        self.assertEqual(self.compress(uncompressed, accept='identity')['ETag'], '"v3"')
+
+
+class CompactJSONRendererTests(SimpleTestCase):
+    """The compact renderer writes the bytes DRF's JSONRenderer writes."""
+
+    DATA = {
+        'created': datetime(2025, 6, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        'naive': datetime(2025, 6, 1, 12, 30),
+        'due': date(2025, 6, 1),
+        'at': time(9, 15, 30, 250000),
+        'took': timedelta(minutes=2),
+        'price': Decimal('1.50'),
+        'uid': uuid.UUID(int=7),
+        'text': 'Ünïcode \u2028 line \u2029 separators',
+        1: [None, True, 2.5, {'nested': []}],
+    }
+
+    def assert_matches_drf(self):
+        self.assertEqual(
+            CompactJSONRenderer().render(self.DATA), JSONRenderer().render(self.DATA)
+        )
+
+    @skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_orjson_matches_drf(self):
+        self.assert_matches_drf()
+
+    def test_standard_library_matches_drf(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assert_matches_drf()
+
+    def test_ensure_ascii_matches_drf(self):
+        with mock.patch.object(JSONRenderer, 'ensure_ascii', True):
+            self.assert_matches_drf()
+            self.assertTrue(CompactJSONRenderer().render(self.DATA).isascii())
+
+    def test_indent_is_ignored(self):
+        rendered = CompactJSONRenderer().render(
+            {'a': [1, 2]}, 'application/json; indent=4', {'indent': 4}
+        )
+        self.assertEqual(rendered, b'{"a":[1,2]}')
+
+    @skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_orjson_writes_nan_as_null(self):
+        # The documented difference: DRF's STRICT_JSON raises instead.
+        self.assertEqual(CompactJSONRenderer().render([float('nan')]), b'[null]')
+        with mock.patch.object(renderers, 'orjson', None):
+            with self.assertRaises(ValueError):
+                CompactJSONRenderer().render([float('nan')])
+
+
+class GunicornConfigTests(SimpleTestCase):
+    """Gunicorn is sized from the container's CPUs, not the host's."""
+
+    def cgroup(self, files, affinity=8):
+        """Patch the affinity mask and the cgroup files read by cpu_count."""
+        def read_text(path):
+            try:
+                return files[str(path)]
+            except KeyError:
+                raise FileNotFoundError(path) from None
+
+        stack = ExitStack()
+        stack.enter_context(
+            mock.patch('os.sched_getaffinity', return_value=set(range(affinity)))
+        )
+        stack.enter_context(mock.patch.object(Path, 'read_text', read_text))
+        return stack
+
+    def load(self, files=None, affinity=8, **env):
+        """Re-import the config module with ``env`` and return it."""
+        self.addCleanup(importlib.reload, gunicorn_conf)
+        names = ('GUNICORN_WORKER_CLASS', 'GUNICORN_WORKERS', 'GUNICORN_THREADS')
+        with mock.patch.dict('os.environ', env), self.cgroup(files or {}, affinity):
+            for name in set(names) - set(env):
+                os.environ.pop(name, None)
+            return importlib.reload(gunicorn_conf)
+
+    def test_cpu_count_follows_cgroup_quota_and_affinity(self):
+        cases = [
+            ({}, 8, 8),
+            ({'/sys/fs/cgroup/cpu.max': '150000 100000\n'}, 8, 2),
+            ({'/sys/fs/cgroup/cpu.max': 'max 100000\n'}, 8, 8),
+            ({'/sys/fs/cgroup/cpu.max': '400000 100000\n'}, 2, 2),
+            ({'/sys/fs/cgroup/cpu.max': '10000 100000\n'}, 8, 1),
+            ({
+                '/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '300000\n',
+                '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n',
+            }, 8, 3),
+            ({
+                '/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '-1\n',
+                '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n',
+            }, 4, 4),
+        ]
+        for files, affinity, expected in cases:
+            with self.subTest(files=files, affinity=affinity), self.cgroup(files, affinity):
+                self.assertEqual(gunicorn_conf.cpu_count(), expected)
+
+    def test_gthread_defaults(self):
+        config = self.load({'/sys/fs/cgroup/cpu.max': '200000 100000'})
+        self.assertEqual(config.worker_class, 'gthread')
+        self.assertEqual(config.wsgi_app, 'core.wsgi:application')
+        self.assertEqual((config.workers, config.threads), (5, 2))
+
+    def test_uvicorn_and_sync_defaults(self):
+        config = self.load(
+            {'/sys/fs/cgroup/cpu.max': '200000 100000'}, GUNICORN_WORKER_CLASS='uvicorn'
+        )
+        self.assertEqual(config.worker_class, 'uvicorn.workers.UvicornWorker')
+        self.assertEqual(config.wsgi_app, 'core.asgi:application')
+        self.assertEqual((config.workers, config.threads), (3, 1))
+        config = self.load(affinity=1, GUNICORN_WORKER_CLASS='sync')
+        self.assertEqual((config.workers, config.threads), (3, 1))
+
+    def test_environment_overrides_defaults(self):
+        config = self.load(GUNICORN_WORKERS='7', GUNICORN_THREADS='4')
+        self.assertEqual((config.workers, config.threads), (7, 4))
+        with self.assertRaises(ValueError):
+            self.load(GUNICORN_WORKER_CLASS='eventlet')
+
+    def test_uvicorn_closes_database_connections(self):
+        path = str(Path(gunicorn_conf.__file__).with_name('settings.py'))
+
+        def conn_max_age(**env):
+            with mock.patch.dict('os.environ', env):
+                for name in {'GUNICORN_WORKER_CLASS', 'DB_CONN_MAX_AGE'} - set(env):
+                    os.environ.pop(name, None)
+                return runpy.run_path(path)['DATABASES']['default']['CONN_MAX_AGE']
+
+        self.assertEqual(conn_max_age(), 60)
+        self.assertEqual(conn_max_age(GUNICORN_WORKER_CLASS='gthread'), 60)
+        self.assertEqual(conn_max_age(GUNICORN_WORKER_CLASS='uvicorn'), 0)
+        self.assertEqual(
+            conn_max_age(GUNICORN_WORKER_CLASS='uvicorn', DB_CONN_MAX_AGE='30'), 30
+        )
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRoutingTests(SimpleTestCase):
+    """Reads go to a replica until the client writes, then stay on the primary."""
+
+    def setUp(self):
+        use_fresh_counters(self)
+        self.factory = RequestFactory(HTTP_AUTHORIZATION='Token replica-test')
+        self.seen = []
+        self.middleware = ReplicaRoutingMiddleware(self.record)
+
+    def record(self, request):
+        self.seen.append(current_read_alias())
+        return None
+
+    def test_reads_use_replica_and_writes_pin_primary(self):
+        self.middleware(self.factory.get('/api/v1/task/'))
+        self.middleware(self.factory.post('/api/v1/task/'))
+        self.middleware(self.factory.get('/api/v1/task/'))
+        self.assertEqual(self.seen, ['replica1', None, None])
+
+    def test_other_paths_read_primary(self):
+        self.middleware(RequestFactory().get('/api/v1/auth/login/'))
+        self.assertEqual(self.seen, [None])
+
+    def test_router_only_routes_replicated_apps(self):
+        router = PrimaryReplicaRouter()
+        self.middleware.get_response = lambda request: (
+            router.db_for_read(Task), router.db_for_read(Token),
+            router.db_for_write(Task), router.db_for_read(Task),
+        )
+        result = self.middleware(RequestFactory().get('/api/v1/task/'))
+        self.assertEqual(result, ('replica1', 'default', 'default', 'default'))
+
+
+class ThrottlingTests(APITestCase):
+    """Reads and writes have separate budgets per user and endpoint."""
+
+    def setUp(self):
+        use_fresh_counters(self)
+        self.user = User.objects.create_user('throttled', password='pw-12345678')
+        self.other = User.objects.create_user('bystander', password='pw-12345678')
+        rates = mock.patch.dict(
+            SimpleRateThrottle.THROTTLE_RATES, {'read': '3/min', 'write': '1/min'}
+        )
+        rates.start()
+        self.addCleanup(rates.stop)
+
+    def test_budgets_are_per_user_endpoint_and_method(self):
+        self.client.force_authenticate(self.user)
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/v1/task/').status_code, 200)
+        response = self.client.get('/api/v1/task/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+
+        self.assertEqual(self.client.get('/api/v1/contact/').status_code, 200)
+        task = {'title': 'New', 'priority': 2, 'dueDate': '2025-06-01'}
+        self.assertEqual(self.client.post('/api/v1/task/', task, format='json').status_code, 201)
+        self.assertEqual(self.client.post('/api/v1/task/', task, format='json').status_code, 429)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get('/api/v1/task/').status_code, 200)
+
+
+class BootstrapTests(APITestCase):
+    """The bootstrap endpoint returns every section with a fixed query count."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+
+    def test_sections_in_fixed_queries_and_conditional_requests(self):
+        for index in range(3):
+            Task.objects.create(title=f'Task {index}', priority=1, dueDate='2025-06-01')
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/v1/bootstrap/')
+        body = response.json()
+        self.assertEqual(len(body['tasks']['items']), 3)
+        self.assertEqual(body['contacts']['items'], [])
+        self.assertIn(self.user.pk, [u['id'] for u in body['users']['items']])
+
+        Task.objects.create(title='More', priority=1, dueDate='2025-06-01')
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/v1/bootstrap/')
+
+        versions = ','.join(
+            f'{name}:{response.json()[name]["version"]}' for name in ('tasks', 'contacts')
+        )
+        partial = self.client.get(f'/api/v1/bootstrap/?versions={versions}').json()
+        self.assertTrue(partial['tasks']['unchanged'])
+        self.assertNotIn('items', partial['tasks'])
+        self.assertIn('items', partial['users'])
+        self.assertNotEqual(partial['tasks']['version'], body['tasks']['version'])
+
+        cached = self.client.get('/api/v1/bootstrap/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+    @override_settings(COMPRESSION_MIN_SIZE=1)
+    def test_compressed_response_etag_is_matched_weakly(self):
+        Task.objects.create(title='Task', priority=1, dueDate='2025-06-01')
+        response = self.client.get('/api/v1/bootstrap/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        weak = response['ETag']
+        self.assertTrue(weak.startswith('W/"'))
+        for header in (weak, weak[2:], f'"other", {weak}', '*'):
+            cached = self.client.get(
+                '/api/v1/bootstrap/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=header
+            )
+            self.assertEqual(cached.status_code, 304, header)
+        stale = self.client.get('/api/v1/bootstrap/', HTTP_IF_NONE_MATCH='"other", W/"x"')
+        self.assertEqual(stale.status_code, 200)
+
+
+class SeedTests(TransactionTestCase):
+    """Seeding is reproducible and leaves the schema as it was."""
+
+    COUNTS = {'users': 5, 'contacts': 40, 'tasks': 120}
+
+    def run_seed(self):
+        list(seed(self.COUNTS, seed=3, today=date(2025, 6, 1), chunk_size=50))
+        return (
+            list(Task.objects.order_by('id').values_list(
+                'id', 'title', 'subtasks', 'dueDate', 'assignedTo', 'status', 'owner'
+            )),
+            list(Contact.objects.order_by('id').values_list('id', 'email', 'uid')),
+        )
+
+    def test_same_seed_same_rows(self):
+        indexes = secondary_indexes('default', Task)
+        first = self.run_seed()
+        self.assertEqual(len(first[0]), 120)
+        self.assertEqual(
+            TaskAssignment.objects.count(),
+            sum(len(assigned) for *_, assigned, _, _ in first[0]),
+        )
+        self.assertEqual(secondary_indexes('default', Task), indexes)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA foreign_keys')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        Task.objects.all().delete()
+        Contact.objects.all().delete()
+        User.objects.filter(email__endswith='@example.com').delete()
+        self.assertEqual(self.run_seed(), first)
+
+
+
+
+class BackupTests(SimpleTestCase):
+    """Snapshots are consistent under write load and restore round-trips."""
+
+    def setUp(self):
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        self.dir = Path(scratch.name)
+        self.db = self.dir / 'live.sqlite3'
+        conn = sqlite3.connect(self.db)
+        conn.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, body TEXT)')
+        conn.executemany(
+            'INSERT INTO item (body) VALUES (?)', (('x' * 200,) for _ in range(20000))
+        )
+        conn.commit()
+        conn.close()
+        patcher = mock.patch('core.backup.database_path', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def count(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute('SELECT count(*) FROM item').fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_copy_is_consistent_and_does_not_block_writers(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.close()
+        stop, latencies = threading.Event(), []
+
+        def write():
+            writer = sqlite3.connect(self.db, timeout=5)
+            while not stop.is_set():
+                started = perf_counter()
+                writer.execute('INSERT INTO item (body) VALUES (?)', ('y' * 200,))
+                writer.commit()
+                latencies.append(perf_counter() - started)
+            writer.close()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            copy = self.dir / 'copy.sqlite3'
+            before = self.count(self.db)
+            copy_database(self.db, copy, pages=16, sleep=0.001)
+            after = self.count(self.db)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertGreater(len(latencies), 0)
+        self.assertLess(max(latencies), 1.0)
+        self.assertTrue(before <= self.count(copy) <= after)
+        conn = sqlite3.connect(copy)
+        self.assertEqual(conn.execute('PRAGMA integrity_check').fetchall(), [('ok',)])
+        conn.close()
+
+    def test_snapshot_is_verified_and_restored(self):
+        result = snapshot(directory=self.dir / 'backups', sleep=0, keep=1)
+        verify(result['path'])
+        conn = sqlite3.connect(self.db)
+        conn.execute('DELETE FROM item')
+        conn.commit()
+        conn.close()
+        restore(result['path'])
+        self.assertEqual(self.count(self.db), 20000)
+
+        snapshot(directory=self.dir / 'backups', sleep=0, keep=1)
+        self.assertEqual(len(list((self.dir / 'backups').glob('*.gz'))), 1)
+
+    def test_corrupt_snapshot_is_refused(self):
+        result = snapshot(directory=self.dir / 'backups', sleep=0)
+        with open(result['path'], 'ab') as handle:
+            handle.write(b'junk')
+        with self.assertRaises(BackupError):
+            restore(result['path'])
+        self.assertEqual(self.count(self.db), 20000)
+
+
+
+class StartupTests(APITestCase):
+    """The startup command skips a current schema and provisions in-process."""
+
+    @override_settings(GUEST_POOL_SIZE=1)
+    def test_startup_skips_migrate_and_creates_superuser_once(self):
+        env = {
+            'DJANGO_SUPERUSER_USERNAME': 'root', 'DJANGO_SUPERUSER_EMAIL': 'r@example.com',
+            'DJANGO_SUPERUSER_PASSWORD': 'pw-12345678',
+        }
+        out = StringIO()
+        with mock.patch.dict('os.environ', env):
+            call_command('startup', stdout=out)
+            call_command('startup', stdout=out)
+        output = out.getvalue()
+        self.assertIn('up to date', output)
+        self.assertIn('created', output)
+        self.assertIn('exists', output)
+        self.assertTrue(User.objects.get(username='root').is_superuser)
+
+    @override_settings(GUEST_POOL_SIZE=0)
+    def test_superuser_failure_does_not_stop_startup(self):
+        env = {
+            'DJANGO_SUPERUSER_USERNAME': 'root', 'DJANGO_SUPERUSER_EMAIL': 'r@example.com',
+            'DJANGO_SUPERUSER_PASSWORD': 'pw-12345678',
+        }
+        out, err = StringIO(), StringIO()
+        with mock.patch.dict('os.environ', env), mock.patch(
+            'core.management.commands.startup.ensure_superuser',
+            side_effect=ValueError('bad email'),
+        ):
+            call_command('startup', stdout=out, stderr=err)
+        self.assertIn('Error creating superuser: bad email', err.getvalue())
+        self.assertIn('failed', out.getvalue())
+        self.assertIn('Startup tasks took', out.getvalue() + err.getvalue())
+
+    def test_startup_lock_excludes_other_replicas(self):
+        def try_lock():
+            with open(settings.STARTUP_LOCK_PATH, 'a') as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        with startup_lock():
+            with self.assertRaises(BlockingIOError):
+                try_lock()
+        try_lock()
@@ -0,0 +1,89 @@
+"""
+Throttle classes backed by the shared counter store.
+
+This module provides a DRF throttle that keeps its sliding-window
+counters in the store from ``core.counters`` instead of per-request
+timestamp lists in the cache, so every worker enforces the same budget
+at constant cost per request, and the default per-user read and write
+budgets applied to every endpoint.
+"""
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.counters import get_store
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Rate throttle using a sliding-window counter.
+
+    Subclasses set ``scope`` and implement ``get_cache_key`` exactly as
+    for DRF's ``SimpleRateThrottle``. Rejected requests are counted too,
+    so a client hammering the API stays throttled until it backs off.
+    """
+
+    def allow_request(self, request, view):
+        """
+        Count the request and check it against the scope's rate.
+
+        Args:
+            request: The HTTP request.
+            view: The view being accessed.
+
+        Returns:
+            bool: True if the request is within the budget.
+        """
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.count = get_store().hit(self.key, self.duration)
+        return self.count <= self.num_requests
+
+    def wait(self):
+        """Return the average spacing between allowed requests."""
+        return self.duration / self.num_requests
+
+
+class EndpointRateThrottle(SlidingWindowThrottle):
+    """
+    Per-client budget for one kind of request to each endpoint.
+
+    Authenticated requests are counted per user and anonymous ones per
+    client IP address, with a separate counter for every view, so a
+    client polling one endpoint in a loop does not use up its budget for
+    the others. Subclasses set ``scope`` and the request ``methods``
+    they count; other requests pass without touching the store.
+    """
+
+    methods = ()
+
+    def get_cache_key(self, request, view):
+        """Return the counter key for the client and view, if counted."""
+        if request.method not in self.methods:
+            return None
+        if request.user and request.user.is_authenticated:
+            ident = f'user{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': f'{ident}_{type(view).__name__}',
+        }
+
+
+class ReadRateThrottle(EndpointRateThrottle):
+    """Limits reads (lists and details) per client and endpoint."""
+
+    scope = 'read'
+    methods = ('GET', 'HEAD')
+
+
+class WriteRateThrottle(EndpointRateThrottle):
+    """Limits writes per client and endpoint."""
+
+    scope = 'write'
+    methods = ('POST', 'PUT', 'PATCH', 'DELETE')
@@ -17,10 +17,15 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.bootstrap import BootstrapView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/contact/', include('contacts_app.api.urls')),
     path('api/v1/task/', include('tasks_app.api.urls')),
     path('api/v1/auth/', include('user_auth_app.api.urls')),
+    path('api/v1/activity/', include('activity_app.api.urls')),
+    path('api/v1/jobs/', include('jobs_app.api.urls')),
+    path('api/v1/bootstrap/', BootstrapView.as_view(), name='bootstrap'),
     path('api-auth', include('rest_framework.urls')),
 ]
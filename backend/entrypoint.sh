@@ -2,6 +2,18 @@
 set -e
 
 echo "Starting entrypoint script..."
+START=$(date +%s.%N)
+
+if [ "${DJANGO_FAST_START:-True}" = "True" ]; then
+    # Fast start: one process waits for the database, migrates only when
+    # migrations are pending, fills the guest pool and provisions the
+    # superuser from DJANGO_SUPERUSER_*, timing each step against
+    # DJANGO_STARTUP_BUDGET_MS.
+    echo "Preparing database..."
+    python manage.py startup --since "$START"
+    echo "Starting application..."
+    exec "$@"
+fi
 
 # Wait a bit for any database to be ready (useful for PostgreSQL/MySQL in the future)
 sleep 2
@@ -10,6 +22,10 @@ sleep 2
 echo "Running database migrations..."
 python manage.py migrate --noinput
 
+# Pre-provision the pool of guest accounts handed out to demo visitors
+echo "Filling guest account pool..."
+python manage.py fill_guest_pool
+
 # Create superuser if environment variables are provided
 if [ -n "$DJANGO_SUPERUSER_USERNAME" ] && [ -n "$DJANGO_SUPERUSER_PASSWORD" ] && [ -n "$DJANGO_SUPERUSER_EMAIL" ]; then
     echo "Checking if superuser needs to be created..."
@@ -0,0 +1,50 @@
+"""
+Serializers for the jobs application.
+
+This module defines serializers for job status responses and for
+requests queuing a job.
+"""
+
+from rest_framework import serializers
+from jobs_app.models import Job
+from jobs_app.queue import registered
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the Job model.
+
+    Exposes the status, progress and outcome of a job.
+    """
+
+    class Meta:
+        """Meta class defining model and fields for serialization."""
+
+        model = Job
+        fields = [
+            'id', 'name', 'args', 'status', 'attempts', 'max_attempts',
+            'run_after', 'progress', 'result', 'error', 'created_by',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+
+class JobRequestSerializer(serializers.Serializer):
+    """
+    Serializer validating a request to queue a registered job.
+
+    Fields:
+        name: A registered job name.
+        args: Keyword arguments for the job.
+    """
+
+    name = serializers.CharField()
+    args = serializers.DictField(required=False, default=dict)
+
+    def validate_name(self, value):
+        """Check that the job is registered."""
+        if value not in registered():
+            raise serializers.ValidationError(
+                f'Unknown job. Choose one of: {", ".join(registered())}.'
+            )
+        return value
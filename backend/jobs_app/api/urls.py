@@ -0,0 +1,13 @@
+"""
+URL configuration for the jobs API.
+
+This module defines the URL patterns for job-related API endpoints.
+"""
+
+from django.urls import path
+from .views import JobDetail, JobsList
+
+urlpatterns = [
+    path('', JobsList.as_view(), name='job-list'),
+    path('<int:pk>/', JobDetail.as_view(), name='job-detail'),
+]
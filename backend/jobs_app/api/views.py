@@ -0,0 +1,64 @@
+"""
+API views for the jobs application.
+
+This module provides endpoints for queuing maintenance jobs and for
+polling the status of any job.
+"""
+
+from rest_framework import generics
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from jobs_app.models import Job
+from jobs_app.queue import accepted
+from .serializers import JobRequestSerializer, JobSerializer
+
+
+class JobPagination(CursorPagination):
+    """Cursor pagination over jobs, newest first."""
+
+    page_size = 50
+    ordering = ('-id',)
+
+
+class JobsList(generics.ListCreateAPIView):
+    """
+    API view to list jobs or queue a maintenance job (staff only).
+
+    GET: Returns a page of jobs, newest first.
+    POST: Queues the registered job ``name`` with ``args`` and answers
+    202 Accepted with the job id; poll the URL in ``Location``.
+    """
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    pagination_class = JobPagination
+    permission_classes = [IsAdminUser]
+
+    def create(self, request, *args, **kwargs):
+        """Validate the request and queue the job."""
+        serializer = JobRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return accepted(
+            request, serializer.validated_data['name'],
+            **serializer.validated_data['args']
+        )
+
+
+class JobDetail(generics.RetrieveAPIView):
+    """
+    API view returning the status of a job.
+
+    GET: Returns the job's status, progress and result. Users see the
+    jobs they queued, staff see all jobs.
+    """
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Return the jobs the requesting user may see."""
+        jobs = super().get_queryset()
+        if self.request.user.is_staff:
+            return jobs
+        return jobs.filter(created_by=self.request.user)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class JobsAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs_app'
+
+    def ready(self):
+        """Register the built-in maintenance jobs."""
+        from jobs_app import builtin  # noqa: F401
@@ -0,0 +1,91 @@
+"""
+Built-in maintenance jobs.
+
+This module registers the batched maintenance routines of the other
+applications as jobs, so they can be queued from the API or a
+scheduler and run by the worker instead of a request worker. Each job
+reports its running total as progress.
+"""
+
+from activity_app.log import prune
+from contacts_app.dedup import merge_all, owner_groups
+from core.backup import snapshot
+from core.idempotency import purge_expired
+from jobs_app.queue import job, report
+from tasks_app.archive import archive_done
+from tasks_app.workload import rebuild_assignments
+from user_auth_app.deletion import delete_marked
+from user_auth_app.guests import fill_pool, reclaim_expired
+
+
+def drain(running, batches):
+    """Consume a batch generator, reporting the running total."""
+    total = 0
+    for count in batches:
+        total += count
+        report(running, done=total)
+    return {'done': total}
+
+
+@job('archive_tasks')
+def archive_tasks(running, days=None, batch_size=500):
+    """Move long-done tasks into the archive."""
+    return drain(running, archive_done(days, batch_size))
+
+
+@job('prune_activity')
+def prune_activity(running, days=None, batch_size=1000):
+    """Delete activity entries past their retention."""
+    return drain(running, prune(days, batch_size))
+
+
+@job('rebuild_task_assignments')
+def rebuild_task_assignments(running, batch_size=2000):
+    """Rebuild the per-contact task assignment index."""
+    return drain(running, rebuild_assignments(batch_size))
+
+
+@job('reclaim_guests')
+def reclaim_guests(running, batch_size=200, refill=True):
+    """Delete expired guests and top the guest pool up again."""
+    result = drain(running, reclaim_expired(batch_size))
+    if refill:
+        result['provisioned'] = len(fill_pool())
+    return result
+
+
+@job('delete_users')
+def delete_users(running, batch_size=500):
+    """Delete the users marked for deletion and their data in batches."""
+    totals = {}
+    for label, count in delete_marked(batch_size):
+        totals[label] = totals.get(label, 0) + count
+        report(running, **totals)
+    return totals
+
+
+@job('dedup_contacts')
+def dedup_contacts(running, batch_size=1000):
+    """Merge contacts sharing a normalized email or phone, per owner group."""
+    merged = tasks = 0
+    for contacts in owner_groups():
+        for result in merge_all(contacts, batch_size=batch_size):
+            merged += result['merged']
+            tasks += result['tasks']
+            report(running, merged=merged, tasks=tasks)
+    return {'merged': merged, 'tasks': tasks}
+
+
+@job('purge_idempotency_keys')
+def purge_idempotency_keys(running, batch_size=1000):
+    """Delete expired idempotency records."""
+    return {'done': purge_expired(batch_size)}
+
+
+@job('backup_db')
+def backup_db(running, database='default', pages=256, sleep=0.01):
+    """Write a compressed, checksummed snapshot of the SQLite database."""
+    return snapshot(
+        database, pages=pages, sleep=sleep,
+        progress=lambda remaining, total: report(running, remaining=remaining, total=total),
+    )
@@ -0,0 +1,128 @@
+"""
+Management command running queued background jobs.
+
+Polls the job table and runs up to ``--concurrency`` jobs at a time in a
+thread or process pool, queuing the periodic jobs of ``JOB_SCHEDULE``
+when they are due. SIGINT/SIGTERM stop claiming new jobs and wait
+for the running ones to finish.
+"""
+
+import signal
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+)
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs_app.queue import (
+    claim, recover_stale, registered, run, schedule, worker_name,
+)
+
+# Seconds between sweeps for abandoned and periodic jobs.
+SWEEP_INTERVAL = 60
+
+
+def execute(job_id):
+    """Run one job in a pool worker and release its connections."""
+    try:
+        return job_id, run(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """Run background jobs until stopped."""
+
+    help = 'Run queued background jobs with a thread or process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help='Jobs run at the same time (default: JOB_CONCURRENCY).'
+        )
+        parser.add_argument(
+            '--pool', choices=['thread', 'process'], default='thread',
+            help='Run jobs in threads (I/O bound) or processes (CPU bound).'
+        )
+        parser.add_argument(
+            '--only', action='append', default=None, metavar='NAME',
+            help='Only run jobs with this name; may be repeated.'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once no job is due instead of polling forever.'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['only'] or []) - set(registered())
+        if unknown:
+            raise CommandError(f'Unknown jobs: {", ".join(sorted(unknown))}')
+        concurrency = options['concurrency'] or settings.JOB_CONCURRENCY
+        worker = worker_name()
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        if options['pool'] == 'process':
+            # Children must not inherit open database connections.
+            connections.close_all()
+            executor = ProcessPoolExecutor(concurrency, initializer=django.setup)
+        else:
+            executor = ThreadPoolExecutor(concurrency, thread_name_prefix='job')
+        self.stdout.write(
+            f'Worker {worker} running {concurrency} {options["pool"]} slots.'
+        )
+
+        active, swept = set(), 0.0
+        with executor:
+            while not self.stopping:
+                if time.monotonic() - swept > SWEEP_INTERVAL:
+                    recovered = recover_stale()
+                    if recovered:
+                        self.stdout.write(f'Recovered {recovered} abandoned jobs.')
+                    for periodic in schedule():
+                        self.stdout.write(f'Scheduled {periodic}.')
+                    swept = time.monotonic()
+
+                while len(active) < concurrency and not self.stopping:
+                    job = claim(worker, options['only'])
+                    if job is None:
+                        break
+                    self.stdout.write(f'Started {job} (attempt {job.attempts}).')
+                    active.add(executor.submit(execute, job.pk))
+
+                if not active:
+                    if options['burst']:
+                        break
+                    time.sleep(settings.JOB_POLL_INTERVAL)
+                    continue
+                done, active = wait(
+                    active, timeout=settings.JOB_POLL_INTERVAL,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self.report(future)
+
+            for future in active:
+                self.report(future)
+
+    def report(self, future):
+        """Print the outcome of a finished job."""
+        try:
+            job_id, status = future.result()
+        except Exception as exc:
+            self.stderr.write(f'Job crashed the pool worker: {exc!r}')
+            return
+        if status is None:
+            self.stdout.write(f'Job #{job_id} lost its lease; outcome discarded.')
+            return
+        self.stdout.write(f'Job #{job_id} {status}.')
+
+    def stop(self, signum, frame):
+        """Stop claiming jobs; running jobs are allowed to finish."""
+        self.stdout.write('Stopping after the running jobs finish...')
+        self.stopping = True
@@ -0,0 +1,81 @@
+"""
+Job model definitions for the jobs application.
+
+This module contains the Job model, one row per unit of background work
+queued for the ``run_jobs`` worker.
+"""
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Model representing a queued, running or finished background job.
+
+    Attributes:
+        name: Registered name of the job function.
+        args: JSON object of keyword arguments for the function.
+        status: ``queued``, ``running``, ``succeeded`` or ``failed``.
+        attempts: Number of times the job was started.
+        max_attempts: Attempts allowed before the job is failed.
+        run_after: Earliest time the job may start, pushed back
+            between retries.
+        progress: JSON object the job reports while running.
+        result: JSON value returned by the job function.
+        error: Traceback of the last failed attempt.
+        worker: Identifier of the worker running the job.
+        heartbeat_at: When the running job's worker last renewed its
+            lease; a job whose lease is older than ``JOB_TIMEOUT`` is
+            abandoned.
+        created_by: The User who queued the job, if any.
+        created_at: When the job was queued.
+        started_at: When the current or last attempt started.
+        finished_at: When the job succeeded or finally failed.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'Queued'), (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    args = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=9, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    progress = models.JSONField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Workers poll for the next due job.
+            models.Index(
+                fields=['run_after'], name='job_queued_idx',
+                condition=models.Q(status='queued'),
+            ),
+            models.Index(
+                fields=['heartbeat_at'], name='job_running_idx',
+                condition=models.Q(status='running'),
+            ),
+        ]
+
+    def __str__(self):
+        """Return a string representation of the job."""
+        return f"{self.name} #{self.pk} {self.status}"
@@ -0,0 +1,289 @@
+"""
+Database-backed job queue.
+
+This module keeps the registry of job functions, queues jobs as Job
+rows, and claims and runs them for the ``run_jobs`` worker. Claiming is
+a conditional ``UPDATE ... WHERE status = 'queued'``, so any number of
+workers can poll the same table without handing a job out twice. A
+running job holds a lease its worker renews; only jobs whose lease ran
+out are handed out again.
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from jobs_app.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def job(name):
+    """
+    Register the decorated function as the job ``name``.
+
+    Job functions receive the running Job first and the job's ``args``
+    as keyword arguments, and return a JSON-serializable result.
+    """
+    def register(func):
+        _registry[name] = func
+        return func
+    return register
+
+
+def registered():
+    """Return the names of all registered jobs."""
+    return sorted(_registry)
+
+
+def enqueue(name, user=None, max_attempts=None, run_after=None, **args):
+    """
+    Queue the job ``name`` with keyword arguments ``args``.
+
+    Args:
+        name: A registered job name.
+        user: The User queuing the job, if any.
+        max_attempts: Attempts before giving up, defaults to
+            ``JOB_MAX_ATTEMPTS``.
+        run_after: Earliest start time, defaults to now.
+
+    Returns:
+        Job: The queued job.
+
+    Raises:
+        KeyError: If no job of that name is registered.
+    """
+    if name not in _registry:
+        raise KeyError(f'Unknown job {name!r}.')
+    return Job.objects.create(
+        name=name, args=args,
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def schedule(now=None):
+    """
+    Queue the periodic jobs of ``JOB_SCHEDULE`` that are due.
+
+    A job is due when none of its runs is pending and the last one
+    finished at least its interval ago. Called by every worker sweep;
+    a duplicate from racing workers is harmless, the job just runs
+    twice.
+
+    Returns:
+        list: The queued jobs.
+    """
+    now = now or timezone.now()
+    queued = []
+    for name, interval in settings.JOB_SCHEDULE.items():
+        runs = Job.objects.filter(name=name)
+        if runs.filter(status__in=[Job.QUEUED, Job.RUNNING]).exists():
+            continue
+        last = runs.filter(finished_at__isnull=False).order_by('-finished_at').first()
+        if last is None or last.finished_at <= now - timedelta(seconds=interval):
+            queued.append(enqueue(name))
+    return queued
+
+
+def accepted(request, name, **args):
+    """
+    Queue a job for a request and answer ``202 Accepted``.
+
+    The response body carries the job id and status and the
+    ``Location`` header points at the job status endpoint.
+    """
+    queued = enqueue(name, user=request.user, **args)
+    url = reverse('job-detail', kwargs={'pk': queued.pk})
+    response = Response(
+        {'id': queued.pk, 'name': name, 'status': queued.status, 'url': url},
+        status=status.HTTP_202_ACCEPTED,
+    )
+    response['Location'] = url
+    return response
+
+
+def report(job, **progress):
+    """Store ``progress`` on a running job for the status endpoint."""
+    job.progress = progress
+    Job.objects.filter(pk=job.pk).update(progress=progress)
+
+
+def worker_name():
+    """Return an identifier of this worker process."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, names=None):
+    """
+    Claim the next due job for ``worker``.
+
+    Args:
+        worker: Identifier stored on the claimed job.
+        names: Only claim jobs with one of these names, if given.
+
+    Returns:
+        Job or None: The claimed job, or ``None`` if none is due.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+    if names:
+        due = due.filter(name__in=names)
+    for pk in due.order_by('run_after').values_list('pk', flat=True)[:5]:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def held(job):
+    """Return ``job`` as a queryset, empty once this attempt lost its lease."""
+    return Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, worker=job.worker, attempts=job.attempts,
+    )
+
+
+def renew_lease(job):
+    """Extend the lease of ``job`` while this worker still holds it."""
+    return held(job).update(heartbeat_at=timezone.now())
+
+
+@contextmanager
+def heartbeat(job):
+    """
+    Renew the lease of ``job`` from a background thread during the block.
+
+    The lease is renewed every quarter of ``JOB_TIMEOUT``, so a job
+    running for hours is never mistaken for an abandoned one, while the
+    job of a worker that died stops being renewed and is recovered. A
+    failed renewal is logged and retried on the next beat, so a lease
+    survives up to three failed renewals in a row; once the lease is
+    lost to another worker the thread stops renewing it.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.JOB_TIMEOUT / 4):
+                try:
+                    renewed = renew_lease(job)
+                except Exception:
+                    logger.exception('Could not renew the lease of %s, retrying.', job)
+                    # Retry on a fresh connection.
+                    connections.close_all()
+                    continue
+                if not renewed:
+                    logger.warning('%s lost its lease to another worker.', job)
+                    return
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f'job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run(job_id):
+    """
+    Run the claimed job ``job_id`` and record its outcome.
+
+    The job's lease is renewed while it runs. Failures are retried with
+    exponential backoff starting at ``JOB_RETRY_DELAY`` seconds until
+    ``max_attempts`` is reached. The outcome is only recorded while
+    this attempt still holds the job's lease.
+
+    Returns:
+        str: The job's status after this attempt, or ``None`` if its
+        lease was lost and the job was recovered meanwhile.
+    """
+    job = Job.objects.get(pk=job_id)
+    func = _registry.get(job.name)
+    try:
+        if func is None:
+            raise KeyError(f'Unknown job {job.name!r}.')
+        with heartbeat(job):
+            result = func(job, **job.args)
+    except Exception:
+        return fail(job, traceback.format_exc())
+    changed = held(job).update(
+        status=Job.SUCCEEDED, result=result, error='',
+        finished_at=timezone.now(),
+    )
+    return Job.SUCCEEDED if changed else None
+
+
+def fail(job, error, rows=None):
+    """
+    Requeue ``job`` with backoff, or fail it after its last attempt.
+
+    Args:
+        job: The running job.
+        error: Traceback or reason stored on the job.
+        rows: Queryset the job must still be in, defaults to the
+            job while this attempt holds its lease.
+
+    Returns:
+        str: The job's new status, or ``None`` if it left ``rows``.
+    """
+    now = timezone.now()
+    rows = held(job) if rows is None else rows.filter(pk=job.pk)
+    if job.attempts < job.max_attempts:
+        delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        changed = rows.update(
+            status=Job.QUEUED, error=error, worker='',
+            run_after=now + timedelta(seconds=delay),
+        )
+        return Job.QUEUED if changed else None
+    changed = rows.update(status=Job.FAILED, error=error, finished_at=now)
+    return Job.FAILED if changed else None
+
+
+def recover_stale(now=None):
+    """
+    Retry or fail jobs whose worker died mid-run.
+
+    Running jobs whose lease was not renewed for ``JOB_TIMEOUT`` seconds
+    are treated as abandoned; a job still renewed by its worker is left
+    alone however long it runs. Finished jobs older than
+    ``JOB_RETENTION_DAYS`` are deleted at the same time.
+
+    Returns:
+        int: Number of abandoned jobs recovered.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.JOB_TIMEOUT)
+    stale = Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=Job.RUNNING,
+    )
+    recovered = 0
+    for abandoned in stale:
+        # Conditional on the lease, in case it was renewed meanwhile.
+        if fail(abandoned, f'Abandoned by worker {abandoned.worker}.', rows=stale):
+            recovered += 1
+    Job.objects.filter(
+        finished_at__lt=now - timedelta(days=settings.JOB_RETENTION_DAYS)
+    ).delete()
+    return recovered
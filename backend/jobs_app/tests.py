@@ -0,0 +1,171 @@
+"""
+Tests for the jobs application API.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connections
+from django.db.models import F
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from jobs_app.models import Job
+from jobs_app.queue import (
+    claim, enqueue, job, recover_stale, renew_lease, report, run, schedule,
+)
+
+
+@job('test_echo')
+def echo(running, value=None):
+    report(running, step=1)
+    return {'value': value}
+
+
+@job('test_slow')
+def slow(running, seconds=0):
+    time.sleep(seconds)
+    return {'slept': seconds}
+
+
+@job('test_broken')
+def broken(running):
+    raise RuntimeError('boom')
+
+
+@job('test_taken_over')
+def taken_over(running, seconds=0):
+    # As if the lease ran out and another worker claimed the job again.
+    Job.objects.filter(pk=running.pk).update(worker='other-worker', attempts=F('attempts') + 1)
+    time.sleep(seconds)
+    return {'done': True}
+
+
+class JobQueueTests(APITestCase):
+    """Jobs are queued with 202, claimed once, run and retried."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='pw-12345678', is_staff=True)
+        self.client.force_authenticate(self.admin)
+
+    def test_queue_returns_202_and_job_can_be_polled(self):
+        response = self.client.post(
+            '/api/v1/jobs/', {'name': 'test_echo', 'args': {'value': 3}}, format='json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Location'], f'/api/v1/jobs/{response.json()["id"]}/')
+        queued = claim('test-worker')
+        self.assertIsNone(claim('test-worker'))
+        self.assertEqual(run(queued.pk), Job.SUCCEEDED)
+        status = self.client.get(response['Location']).json()
+        self.assertEqual(status['status'], 'succeeded')
+        self.assertEqual(status['result'], {'value': 3})
+        self.assertEqual(status['progress'], {'step': 1})
+
+    def test_unknown_job_and_non_staff_are_rejected(self):
+        response = self.client.post('/api/v1/jobs/', {'name': 'nope'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        user = User.objects.create_user('member', password='pw-12345678')
+        self.client.force_authenticate(user)
+        response = self.client.post('/api/v1/jobs/', {'name': 'test_echo'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        other = enqueue('test_echo', user=self.admin)
+        self.assertEqual(self.client.get(f'/api/v1/jobs/{other.pk}/').status_code, 404)
+
+    @override_settings(JOB_RETRY_DELAY=0)
+    def test_failures_are_retried_then_failed(self):
+        queued = enqueue('test_broken', max_attempts=2)
+        self.assertEqual(run(claim('test-worker').pk), Job.QUEUED)
+        self.assertEqual(run(claim('test-worker').pk), Job.FAILED)
+        queued.refresh_from_db()
+        self.assertEqual(queued.attempts, 2)
+        self.assertIn('RuntimeError: boom', queued.error)
+
+    @override_settings(JOB_SCHEDULE={'test_echo': 3600})
+    def test_periodic_jobs_are_queued_when_due(self):
+        first = schedule()
+        self.assertEqual([queued.name for queued in first], ['test_echo'])
+        self.assertEqual(schedule(), [])
+        run(claim('test-worker').pk)
+        self.assertEqual(schedule(), [])
+        later = timezone.now() + timedelta(hours=2)
+        self.assertEqual(len(schedule(now=later)), 1)
+
+
+@override_settings(JOB_TIMEOUT=1, JOB_RETRY_DELAY=0)
+class JobLeaseTests(TransactionTestCase):
+    """Only jobs whose lease ran out are recovered, however long jobs run."""
+
+    def run_in_worker(self, job_id):
+        def execute():
+            try:
+                run(job_id)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=execute)
+        thread.start()
+        self.addCleanup(thread.join)
+        return thread
+
+    def test_long_job_keeps_its_renewed_lease(self):
+        queued = enqueue('test_slow', seconds=2.5)
+        claimed = claim('test-worker')
+        worker = self.run_in_worker(claimed.pk)
+        time.sleep(1.5)
+        # Started longer than JOB_TIMEOUT ago, but the lease is fresh.
+        self.assertEqual(recover_stale(), 0)
+        running = Job.objects.get(pk=queued.pk)
+        self.assertEqual(running.status, Job.RUNNING)
+        self.assertGreater(running.heartbeat_at, claimed.heartbeat_at)
+        self.assertIsNone(claim('other-worker'))
+        worker.join()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Job.SUCCEEDED, 1))
+
+    def test_failed_renewal_is_logged_and_retried(self):
+        queued = enqueue('test_slow', seconds=1)
+        claimed = claim('test-worker')
+        calls = []
+
+        def flaky(running):
+            calls.append(running)
+            if len(calls) == 1:
+                raise DatabaseError('database is locked')
+            return renew_lease(running)
+
+        with mock.patch('jobs_app.queue.renew_lease', side_effect=flaky), \
+                self.assertLogs('jobs_app.queue', 'ERROR') as logs:
+            self.assertEqual(run(claimed.pk), Job.SUCCEEDED)
+        self.assertIn('database is locked', logs.output[0])
+        self.assertGreater(len(calls), 1)
+        queued.refresh_from_db()
+        self.assertGreater(queued.heartbeat_at, claimed.heartbeat_at)
+
+    def test_outcome_of_a_lost_lease_is_discarded(self):
+        queued = enqueue('test_taken_over', seconds=0.5)
+        with self.assertLogs('jobs_app.queue', 'WARNING') as logs:
+            self.assertIsNone(run(claim('test-worker').pk))
+        self.assertIn('lost its lease', logs.output[0])
+        queued.refresh_from_db()
+        self.assertEqual(
+            (queued.status, queued.worker, queued.attempts),
+            (Job.RUNNING, 'other-worker', 2),
+        )
+        self.assertIsNone(queued.result)
+
+    def test_expired_lease_is_recovered(self):
+        queued = enqueue('test_echo')
+        claim('dead-worker')
+        Job.objects.filter(pk=queued.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=5)
+        )
+        self.assertEqual(recover_stale(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.QUEUED)
+        self.assertIn('dead-worker', queued.error)
+        self.assertEqual(claim('test-worker').pk, queued.pk)
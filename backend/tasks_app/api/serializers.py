@@ -6,7 +6,7 @@ to and from JSON representations.
 """
 
 from rest_framework import serializers
-from tasks_app.models import Task
+from tasks_app.models import ArchivedTask, Task
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -22,3 +22,32 @@ class TaskSerializer(serializers.ModelSerializer):
 
         model = Task
         fields = '__all__'
+        read_only_fields = ['version', 'owner', 'completedAt']
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for archived tasks.
+
+    Archived tasks cannot be edited; they have to be restored first.
+    """
+
+    class Meta:
+        """Meta class defining model and fields for serialization."""
+
+        model = ArchivedTask
+        fields = [field.name for field in ArchivedTask._meta.fields]
+        read_only_fields = fields
+
+
+class SubtaskSerializer(serializers.Serializer):
+    """
+    Serializer for one subtask edit.
+
+    ``position`` places a new subtask or moves an existing one; it is
+    not stored on the subtask itself.
+    """
+
+    title = serializers.CharField(max_length=200)
+    done = serializers.BooleanField(default=False)
+    position = serializers.IntegerField(min_value=0, required=False)
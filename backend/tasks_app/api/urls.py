@@ -5,9 +5,29 @@ This module defines the URL patterns for task-related API endpoints.
 """
 
 from django.urls import path
-from .views import TasksList, TaskDetail
+from .views import (
+    ArchivedTaskDetail, ArchivedTaskRestore, ArchivedTasksList,
+    NextDeadlinesView, OverdueTasksList, SubtaskDetail, SubtaskList,
+    SubtaskToggle, TaskDetail, TasksList, UpcomingTasksList, WorkloadView,
+)
 
 urlpatterns = [
     path('', TasksList.as_view(), name='tasks-list'),
     path('<int:pk>/', TaskDetail.as_view(), name='task-detail'),
+    path('<int:pk>/subtasks/', SubtaskList.as_view(), name='subtask-list'),
+    path('<int:pk>/subtasks/<int:index>/', SubtaskDetail.as_view(), name='subtask-detail'),
+    path(
+        '<int:pk>/subtasks/<int:index>/toggle/', SubtaskToggle.as_view(),
+        name='subtask-toggle'
+    ),
+    path('due/overdue/', OverdueTasksList.as_view(), name='tasks-overdue'),
+    path('due/upcoming/', UpcomingTasksList.as_view(), name='tasks-upcoming'),
+    path('due/next/', NextDeadlinesView.as_view(), name='tasks-next-deadlines'),
+    path('workload/', WorkloadView.as_view(), name='tasks-workload'),
+    path('archive/', ArchivedTasksList.as_view(), name='archived-tasks-list'),
+    path('archive/<int:pk>/', ArchivedTaskDetail.as_view(), name='archived-task-detail'),
+    path(
+        'archive/<int:pk>/restore/', ArchivedTaskRestore.as_view(),
+        name='archived-task-restore'
+    ),
 ]
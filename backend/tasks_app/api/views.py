@@ -2,34 +2,369 @@
 API views for the tasks application.
 
 This module provides API endpoints for listing, creating, retrieving,
-updating, and deleting tasks.
+updating, and deleting tasks, for deadline queries over open tasks, for
+per-contact workload, for editing single subtasks, and for browsing
+and restoring archived tasks.
 """
 
-from rest_framework import generics
-from tasks_app.models import Task
-from .serializers import TaskSerializer
+from datetime import timedelta
 
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from activity_app.log import ActivityLogMixin, record
+from activity_app.models import ActivityEntry
+from core.concurrency import VersionedUpdateMixin, parse_if_match, version_etag
+from core.idempotency import IdempotencyMixin
+from core.streaming import StreamingListMixin
+from tasks_app import subtasks
+from tasks_app.archive import restore
+from tasks_app.models import STATUS_DONE, ArchivedTask, Task, completed_at_for
+from tasks_app.workload import (
+    ASSIGNMENT_FIELDS, refresh_assignments, replace_assignments, workload,
+)
+from .serializers import ArchivedTaskSerializer, SubtaskSerializer, TaskSerializer
 
-class TasksList(generics.ListCreateAPIView):
+
+class TasksList(
+    StreamingListMixin, IdempotencyMixin, ActivityLogMixin, generics.ListCreateAPIView
+):
     """
     API view to list all tasks or create a new task.
 
-    GET: Returns a list of all tasks.
-    POST: Creates a new task.
+    GET: Returns a list of all tasks visible to the user.
+    POST: Creates a new task owned by the user.
+
+    Writes sent with an Idempotency-Key header are executed once and
+    retries are answered from the stored response. Creations are
+    recorded in the activity log. The list is streamed with
+    ``LIST_STREAMING``.
     """
 
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    activity_target = ActivityEntry.TASK
+
+    def get_queryset(self):
+        """Return the tasks visible to the requesting user."""
+        return super().get_queryset().visible_to(self.request.user)
+
+    def perform_create(self, serializer):
+        """Record the requesting user as the task's owner."""
+        user = self.request.user
+        done = serializer.validated_data.get('status') == STATUS_DONE
+        # Part of the transaction ActivityLogMixin.create opens.
+        with transaction.atomic(savepoint=False):
+            serializer.save(
+                owner=user if user.is_authenticated else None,
+                completedAt=timezone.now() if done else None,
+            )
+            replace_assignments([serializer.data])
 
 
-class TaskDetail(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetail(
+    IdempotencyMixin, ActivityLogMixin, VersionedUpdateMixin,
+    generics.RetrieveUpdateDestroyAPIView
+):
     """
     API view to retrieve, update, or delete a specific task.
 
     GET: Returns details of a specific task by ID.
     PUT/PATCH: Updates a specific task by ID.
     DELETE: Deletes a specific task by ID.
+
+    Updates and deletes are conditional on the version sent in the
+    If-Match header and answer 412 when the task changed meanwhile.
+    Both are recorded in the activity log.
     """
 
     queryset = Task.objects.all()
-    serializer_class = TaskSerializer
\ No newline at end of file
+    serializer_class = TaskSerializer
+    activity_target = ActivityEntry.TASK
+
+    def get_queryset(self):
+        """Return the tasks visible to the requesting user."""
+        return super().get_queryset().visible_to(self.request.user)
+
+    def updated(self, request, response):
+        """Bring the assignment index in line with the written fields."""
+        changed = ASSIGNMENT_FIELDS.intersection(request.data)
+        if 'assignedTo' in changed:
+            replace_assignments([response.data])
+        elif changed:
+            refresh_assignments(response.data)
+
+    def update_values(self, validated_data):
+        """Stamp or clear the completion time when the status changes."""
+        values = super().update_values(validated_data)
+        if 'status' in values:
+            values['completedAt'] = completed_at_for(values['status'])
+        return values
+
+
+class SubtaskEditMixin(IdempotencyMixin):
+    """
+    Shared behaviour of the subtask endpoints.
+
+    Every edit is one conditional write of the task's ``subtasks``
+    column (see ``tasks_app.subtasks``), honours ``If-Match`` and
+    ``Idempotency-Key`` like the task detail view and is recorded in
+    the activity log with the new subtask list. Responses are the
+    compact delta with the task's new version as ``ETag``, whatever the
+    number of subtasks; the write itself still rewrites the whole list.
+    A task whose stored subtasks are not a list of objects answers 409.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def apply(self, request, pk, operation, *args, success=status.HTTP_200_OK, **kwargs):
+        """Run ``operation`` on task ``pk`` and answer with its delta."""
+        def handler(request):
+            expected = parse_if_match(request.headers.get('If-Match'))
+            tasks = Task.objects.visible_to(request.user)
+            with transaction.atomic():
+                try:
+                    edited = subtasks.edit(
+                        tasks, pk, operation, *args, expected=expected, **kwargs
+                    )
+                except IndexError as exc:
+                    raise Http404(str(exc))
+                if edited is None:
+                    raise Http404
+                delta, items = edited
+                if settings.ACTIVITY_LOG_ENABLED:
+                    record(
+                        ActivityEntry.TASK, pk, ActivityEntry.UPDATE,
+                        {'subtasks': items}, request.user,
+                    )
+            response = Response(delta, status=success)
+            response['ETag'] = f'"{delta["version"]}"'
+            return response
+        return self.idempotent(handler, request)
+
+
+class SubtaskList(SubtaskEditMixin, APIView):
+    """
+    API view adding a subtask to a task.
+
+    POST: Inserts ``{"title", "done"}`` at ``position`` (default: the
+    end) and returns the delta with 201.
+    """
+
+    def post(self, request, pk):
+        """Add a subtask to task ``pk``."""
+        serializer = SubtaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.apply(
+            request, pk, subtasks.add, success=status.HTTP_201_CREATED,
+            **serializer.validated_data
+        )
+
+
+class SubtaskDetail(SubtaskEditMixin, APIView):
+    """
+    API view editing the subtask at one position of a task.
+
+    PATCH: Renames it (``title``), checks or unchecks it (``done``)
+    and/or moves it to ``position``, in one write.
+    DELETE: Removes it.
+    """
+
+    def patch(self, request, pk, index):
+        """Update and/or move subtask ``index`` of task ``pk``."""
+        serializer = SubtaskSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        fields = dict(serializer.validated_data)
+        position = fields.pop('position', None)
+        if not fields and position is None:
+            raise ValidationError({'detail': 'Send title, done or position.'})
+
+        def change(items):
+            delta = subtasks.update(items, index, **fields)
+            if position is not None:
+                delta['to'] = subtasks.move(items, index, position)['to']
+            return delta
+        return self.apply(request, pk, change)
+
+    def delete(self, request, pk, index):
+        """Delete subtask ``index`` of task ``pk``."""
+        return self.apply(request, pk, subtasks.delete, index)
+
+
+class SubtaskToggle(SubtaskEditMixin, APIView):
+    """
+    API view flipping a subtask's checkbox.
+
+    POST: Toggles ``done`` of the subtask at ``index``. Send an
+    ``Idempotency-Key`` so a retried toggle is not applied twice.
+    """
+
+    def post(self, request, pk, index):
+        """Toggle subtask ``index`` of task ``pk``."""
+        return self.apply(request, pk, subtasks.toggle, index)
+
+
+def int_param(request, name, default, maximum):
+    """
+    Read a positive integer query parameter capped at ``maximum``.
+
+    Raises:
+        ValidationError: If the value is not a positive integer.
+    """
+    raw = request.query_params.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise ValidationError({name: 'Must be a positive integer.'})
+    return min(value, maximum)
+
+
+class DeadlineListMixin:
+    """
+    Shared behaviour of the deadline lists.
+
+    Results are capped by the ``limit`` query parameter (default 50, at
+    most 200) so every request is a bounded scan of the open-task
+    deadline index.
+    """
+
+    serializer_class = TaskSerializer
+    default_limit = 50
+    max_limit = 200
+
+    def get_queryset(self):
+        """Return the deadline query for the requesting user, limited."""
+        tasks = Task.objects.visible_to(self.request.user)
+        limit = int_param(self.request, 'limit', self.default_limit, self.max_limit)
+        return self.deadline_queryset(tasks, timezone.localdate())[:limit]
+
+
+class OverdueTasksList(DeadlineListMixin, generics.ListAPIView):
+    """
+    API view listing overdue tasks.
+
+    GET: Returns open tasks whose due date has passed, oldest first.
+    """
+
+    def deadline_queryset(self, tasks, today):
+        """Return the open tasks due before ``today``."""
+        return tasks.overdue(today)
+
+
+class UpcomingTasksList(DeadlineListMixin, generics.ListAPIView):
+    """
+    API view listing tasks due soon.
+
+    GET: Returns open tasks due from today within the next ``days`` days
+    (default 7, at most 365), soonest first.
+    """
+
+    def deadline_queryset(self, tasks, today):
+        """Return the open tasks due within the requested window."""
+        days = int_param(self.request, 'days', 7, 365)
+        return tasks.due_between(today, today + timedelta(days=days))
+
+
+class NextDeadlinesView(APIView):
+    """
+    API view returning the next deadline per priority.
+
+    GET: Returns an object mapping each priority to the open task with
+    the earliest due date, or ``null`` if there is none.
+    """
+
+    def get(self, request):
+        """Return the earliest open task of every priority."""
+        deadlines = Task.objects.visible_to(request.user).next_deadlines()
+        return Response({
+            str(priority): TaskSerializer(task).data if task else None
+            for priority, task in deadlines.items()
+        })
+
+
+class WorkloadView(APIView):
+    """
+    API view returning the task workload of every assigned contact.
+
+    GET: Returns one entry per contact with its open and total task
+    counts, counts by status and open counts by priority, busiest
+    contact first.
+    """
+
+    def get(self, request):
+        """Aggregate the visible tasks per assigned contact."""
+        return Response(workload(request.user))
+
+
+class ArchivePagination(CursorPagination):
+    """Cursor pagination over archived tasks, most recently archived first."""
+
+    page_size = 50
+    ordering = ('-archivedAt', '-id')
+
+
+class ArchivedTasksList(generics.ListAPIView):
+    """
+    API view to list archived tasks.
+
+    GET: Returns a page of the archived tasks visible to the user, newest
+    archive first. Follow the ``next`` link for older tasks.
+    """
+
+    queryset = ArchivedTask.objects.all()
+    serializer_class = ArchivedTaskSerializer
+    pagination_class = ArchivePagination
+
+    def get_queryset(self):
+        """Return the archived tasks visible to the requesting user."""
+        return super().get_queryset().visible_to(self.request.user)
+
+
+class ArchivedTaskDetail(generics.RetrieveAPIView):
+    """
+    API view to retrieve a specific archived task.
+
+    GET: Returns details of an archived task by ID.
+    """
+
+    queryset = ArchivedTask.objects.all()
+    serializer_class = ArchivedTaskSerializer
+
+    def get_queryset(self):
+        """Return the archived tasks visible to the requesting user."""
+        return super().get_queryset().visible_to(self.request.user)
+
+
+class ArchivedTaskRestore(APIView):
+    """
+    API view to move an archived task back onto the board.
+
+    POST: Restores the task under its old ID and returns it as a live
+    task.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """Restore archived task ``pk`` or answer 404."""
+        archived = ArchivedTask.objects.visible_to(request.user)
+        with transaction.atomic():
+            task = restore(archived, pk)
+            if task is None:
+                raise Http404
+            data = TaskSerializer(task).data
+            replace_assignments([data])
+        response = Response(data, status=status.HTTP_200_OK)
+        response['ETag'] = version_etag(task)
+        return response
@@ -0,0 +1,88 @@
+"""
+Archival of done tasks.
+
+This module moves tasks that have been done for a while from the live
+task table into the ArchivedTask table, and moves single tasks back on
+request. Both directions copy the row and delete the original in one
+transaction, so a task is always in exactly one of the two tables.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from tasks_app.models import STATUS_DONE, ArchivedTask, Task
+
+TASK_COLUMNS = [field.attname for field in Task._meta.concrete_fields]
+
+
+def archive_done(days=None, batch_size=500, now=None):
+    """
+    Move tasks done for more than ``days`` days into the archive.
+
+    Each batch selects the oldest completed tasks through the partial
+    index on done tasks, copies them with one bulk insert and deletes
+    them with one set based delete in a short transaction, so live
+    requests are never blocked for long.
+
+    Args:
+        days: Minimum days since completion, defaults to
+            ``TASK_ARCHIVE_AFTER_DAYS``.
+        batch_size: Number of tasks moved per transaction.
+        now: Reference time, defaults to the current time.
+
+    Yields:
+        int: Number of tasks archived by each batch.
+    """
+    now = now or timezone.now()
+    if days is None:
+        days = settings.TASK_ARCHIVE_AFTER_DAYS
+    cutoff = now - timedelta(days=days)
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Task.objects.select_for_update()
+                .filter(status=STATUS_DONE, completedAt__lt=cutoff)
+                .order_by('completedAt')
+                .values(*TASK_COLUMNS)[:batch_size]
+            )
+            if rows:
+                ArchivedTask.objects.bulk_create(
+                    ArchivedTask(**row, archivedAt=now) for row in rows
+                )
+                Task.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        if not rows:
+            return
+        yield len(rows)
+
+
+def restore(archived_tasks, pk):
+    """
+    Move one archived task back into the live table.
+
+    The task keeps its id and status, its version is incremented and its
+    completion time is reset so it is not archived again right away.
+
+    Args:
+        archived_tasks: ArchivedTask queryset the task must belong to,
+            typically already restricted to what the user may see.
+        pk: The id of the task.
+
+    Returns:
+        Task or None: The restored task, or ``None`` if no such task is
+            archived.
+    """
+    with transaction.atomic():
+        row = (
+            archived_tasks.select_for_update().filter(pk=pk)
+            .values(*TASK_COLUMNS).first()
+        )
+        if row is None:
+            return None
+        ArchivedTask.objects.filter(pk=pk).delete()
+        row['version'] += 1
+        if row['status'] == STATUS_DONE:
+            row['completedAt'] = timezone.now()
+        return Task.objects.create(**row)
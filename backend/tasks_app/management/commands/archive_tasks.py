@@ -0,0 +1,27 @@
+"""
+Management command moving long-done tasks into the archive.
+"""
+
+from django.core.management.base import BaseCommand
+
+from tasks_app.archive import archive_done
+
+
+class Command(BaseCommand):
+    """Archive done tasks in batches."""
+
+    help = 'Move tasks done for more than N days into the task archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Days since completion (default: TASK_ARCHIVE_AFTER_DAYS).'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = 0
+        for moved in archive_done(options['days'], options['batch_size']):
+            total += moved
+            self.stdout.write(f'Archived {total} tasks so far...')
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} done tasks.'))
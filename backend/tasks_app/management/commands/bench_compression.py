@@ -0,0 +1,113 @@
+"""
+Benchmark of JSON rendering and response compression for task lists.
+
+Renders an in-memory list of tasks with each available renderer and
+compresses the result with gzip and brotli at several levels, reporting
+bytes on the wire and the CPU time spent per variant.
+"""
+
+import gzip
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.compression import brotli
+from core.renderers import CompactJSONRenderer
+from tasks_app.api.serializers import TaskSerializer
+from tasks_app.models import Task
+
+WORDS = (
+    'board sprint review deploy backend frontend contact refactor api '
+    'customer design feedback release planning database cache meeting '
+    'invoice report hotfix testing migration onboarding roadmap budget'
+).split()
+
+
+def build_tasks(count, seed):
+    """Build ``count`` unsaved tasks with realistic payload sizes."""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    tasks = []
+    for pk in range(1, count + 1):
+        tasks.append(Task(
+            id=pk,
+            title=' '.join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+            description=' '.join(rng.choices(WORDS, k=rng.randint(10, 80))),
+            subtasks=[
+                {'title': ' '.join(rng.choices(WORDS, k=3)), 'done': rng.random() < 0.5}
+                for _ in range(rng.randint(0, 6))
+            ],
+            priority=rng.randint(1, 3),
+            category=rng.randint(1, 2),
+            dueDate=start + timedelta(days=rng.randint(0, 365)),
+            assignedTo=[rng.randint(1, 500) for _ in range(rng.randint(0, 4))],
+            status=rng.randint(1, 4),
+        ))
+    return tasks
+
+
+def timed(func, repeat):
+    """Return the result of ``func`` and its best CPU time in ms."""
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = func()
+        elapsed = (time.process_time() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+class Command(BaseCommand):
+    """Compare renderer and compression cost on a large task list."""
+
+    help = 'Benchmark JSON rendering and gzip/brotli compression of tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        data = TaskSerializer(
+            build_tasks(options['tasks'], options['seed']), many=True
+        ).data
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Rendering {options["tasks"]} tasks'
+        ))
+        renderers = [
+            ('DRF JSONRenderer (indent=4)',
+             lambda: JSONRenderer().render(data, 'application/json; indent=4')),
+            ('DRF JSONRenderer', lambda: JSONRenderer().render(data)),
+            ('CompactJSONRenderer', lambda: CompactJSONRenderer().render(data)),
+        ]
+        payload = None
+        for label, render in renderers:
+            payload, cpu_ms = timed(render, repeat)
+            self.stdout.write(f'{label:<32} {len(payload):>12,} B {cpu_ms:>10.1f} ms')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Compressing compact payload'))
+        variants = [
+            (f'gzip level {level}',
+             lambda level=level: gzip.compress(payload, compresslevel=level, mtime=0))
+            for level in (1, 6, 9)
+        ]
+        if brotli is not None:
+            variants += [
+                (f'brotli quality {quality}',
+                 lambda quality=quality: brotli.compress(payload, quality=quality))
+                for quality in (1, 4, 6)
+            ]
+        else:
+            self.stdout.write('brotli not installed, skipping brotli variants.')
+        for label, compress in variants:
+            compressed, cpu_ms = timed(compress, repeat)
+            ratio = len(payload) / len(compressed)
+            self.stdout.write(
+                f'{label:<32} {len(compressed):>12,} B {cpu_ms:>10.1f} ms '
+                f'{ratio:>6.1f}x'
+            )
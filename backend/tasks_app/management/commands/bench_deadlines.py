@@ -0,0 +1,106 @@
+"""
+Benchmark of the deadline queries on a large task table.
+
+Inserts synthetic tasks inside a transaction, times the overdue,
+upcoming and next-deadline queries with the partial open-task indexes
+and again after dropping them, prints the query plans, and rolls
+everything back so the database is left untouched.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from tasks_app.models import STATUS_DONE, Task
+
+OPEN_INDEXES = ('task_open_due_idx', 'task_open_priority_due_idx')
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data."""
+
+
+class Command(BaseCommand):
+    """Time the deadline queries with and without the open-task indexes."""
+
+    help = 'Benchmark overdue/upcoming/next-deadline queries on N tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--done-ratio', type=float, default=0.8)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Benchmark data rolled back.')
+
+    def run(self, options):
+        self.insert(options['tasks'], options['done_ratio'], options['seed'])
+        today = date(2025, 7, 1)
+        queries = [
+            ('overdue', lambda: list(Task.objects.overdue(today)[:50])),
+            ('upcoming 7d', lambda: list(
+                Task.objects.due_between(today, today + timedelta(days=7))[:50]
+            )),
+            ('next per priority', lambda: Task.objects.next_deadlines()),
+        ]
+        self.stdout.write(self.style.MIGRATE_HEADING('Query plans'))
+        self.stdout.write(Task.objects.overdue(today)[:50].explain())
+        self.stdout.write(
+            Task.objects.open().filter(priority=3).order_by('dueDate', 'id')[:1].explain()
+        )
+
+        indexed = self.measure(queries, options['repeat'])
+        with connection.cursor() as cursor:
+            for name in OPEN_INDEXES:
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+        unindexed = self.measure(queries, options['repeat'])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            'Query, with open-task indexes, without (median ms)'
+        ))
+        for label, _ in queries:
+            self.stdout.write(
+                f'{label:<18} {indexed[label]:>10.3f} ms {unindexed[label]:>10.3f} ms'
+            )
+
+    def insert(self, count, done_ratio, seed):
+        """Bulk insert ``count`` small tasks spread over two years."""
+        rng = random.Random(seed)
+        start = date(2024, 7, 1)
+        started = time.perf_counter()
+        batch = []
+        for index in range(count):
+            batch.append(Task(
+                title=f'Task {index}',
+                priority=rng.randint(1, 3),
+                category=rng.randint(1, 2),
+                dueDate=start + timedelta(days=rng.randint(0, 730)),
+                status=STATUS_DONE if rng.random() < done_ratio else rng.randint(1, 3),
+            ))
+            if len(batch) == 5000:
+                Task.objects.bulk_create(batch)
+                batch = []
+        Task.objects.bulk_create(batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Inserted {count:,} tasks in {elapsed:.1f} s.')
+
+    def measure(self, queries, repeat):
+        """Return the median wall time in ms of each query."""
+        results = {}
+        for label, query in queries:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                query()
+                samples.append((time.perf_counter() - started) * 1000)
+            results[label] = sorted(samples)[len(samples) // 2]
+        return results
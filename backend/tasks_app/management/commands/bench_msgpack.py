@@ -0,0 +1,55 @@
+"""
+Benchmark of JSON versus MessagePack payloads for task lists.
+
+Encodes and decodes the same serialized task list with the JSON and
+MessagePack renderers and parsers, reporting payload size (raw and
+gzip-compressed) and the CPU time of each direction.
+"""
+
+import gzip
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+
+from core.parsers import MessagePackParser
+from core.renderers import CompactJSONRenderer, MessagePackRenderer, msgpack
+from tasks_app.api.serializers import TaskSerializer
+from tasks_app.management.commands.bench_compression import build_tasks, timed
+
+
+class Command(BaseCommand):
+    """Compare JSON and MessagePack size and speed on a task list."""
+
+    help = 'Benchmark JSON vs MessagePack encoding of tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if msgpack is None:
+            raise CommandError('msgpack is not installed.')
+        repeat = options['repeat']
+        data = TaskSerializer(
+            build_tasks(options['tasks'], options['seed']), many=True
+        ).data
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{options["tasks"]} tasks: size, gzip size, encode, decode'
+        ))
+        formats = [
+            ('json', CompactJSONRenderer(), JSONParser()),
+            ('msgpack', MessagePackRenderer(), MessagePackParser()),
+        ]
+        for label, renderer, parser in formats:
+            payload, encode_ms = timed(lambda: renderer.render(data), repeat)
+            _, decode_ms = timed(
+                lambda: parser.parse(io.BytesIO(payload)), repeat
+            )
+            gzipped = len(gzip.compress(payload, mtime=0))
+            self.stdout.write(
+                f'{label:<8} {len(payload):>12,} B {gzipped:>12,} B '
+                f'{encode_ms:>9.1f} ms {decode_ms:>9.1f} ms'
+            )
@@ -0,0 +1,102 @@
+"""
+Benchmark of the buffered and streamed task list.
+
+Seeds synthetic tasks inside a transaction and requests the task list at
+growing table sizes, once buffered and once with ``LIST_STREAMING``,
+reporting the wall time and the tracemalloc peak of producing the whole
+body. The buffered list is skipped above ``--buffered-max`` rows, where
+it would take gigabytes. Everything is rolled back afterwards.
+"""
+
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.profiling import memory_baseline, memory_peak_kb
+from core.seed import Plan, write_chunk
+from tasks_app.api.views import TasksList
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark data."""
+
+
+class Command(BaseCommand):
+    """Compare time and peak memory of the buffered and streamed list."""
+
+    help = 'Benchmark the task list buffered and streamed on up to 1M tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=lambda value: [int(size) for size in value.split(',')],
+            default=[10_000, 100_000, 1_000_000],
+            help='Comma-separated task counts to measure at.'
+        )
+        parser.add_argument('--buffered-max', type=int, default=100_000)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Benchmark data rolled back.')
+
+    def run(self, options):
+        user = User.objects.create_user('bench-streaming')
+        view = TasksList.as_view(throttle_classes=[])
+        factory = APIRequestFactory()
+
+        def body():
+            request = factory.get('/api/v1/task/')
+            force_authenticate(request, user)
+            response = view(request)
+            if response.streaming:
+                return sum(map(len, response.streaming_content))
+            return len(response.render().content)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            'Tasks, mode, wall time, traced peak, body size'
+        ))
+        seeded = 0
+        for size in sorted(options['sizes']):
+            self.add_tasks(size - seeded, seeded)
+            seeded = size
+            for streaming in (False, True):
+                if not streaming and size > options['buffered_max']:
+                    continue
+                with override_settings(
+                    LIST_STREAMING=streaming,
+                    LIST_STREAMING_CHUNK_SIZE=options['chunk_size'],
+                ):
+                    started = time.perf_counter()
+                    length = body()
+                    elapsed = time.perf_counter() - started
+                    tracemalloc.start()
+                    try:
+                        baseline = memory_baseline()
+                        body()
+                        peak = memory_peak_kb(baseline)
+                    finally:
+                        tracemalloc.stop()
+                mode = 'streamed' if streaming else 'buffered'
+                self.stdout.write(
+                    f'{size:>10,}  {mode:<9} {elapsed:>8.2f} s '
+                    f'{peak / 1024:>10.1f} MiB {length / 2 ** 20:>10.1f} MiB'
+                )
+
+    def add_tasks(self, count, offset):
+        """Seed ``count`` more tasks with the ``seed`` command's generator."""
+        plan = Plan(
+            {'tasks': count}, seed=offset, today=timezone.localdate(),
+            chunk_size=50_000, using=DEFAULT_DB_ALIAS, password='bench-streaming',
+        )
+        for index, ids in plan.chunks('tasks'):
+            write_chunk(plan, 'tasks', index, ids)
@@ -0,0 +1,23 @@
+"""
+Management command rebuilding the task assignment index.
+"""
+
+from django.core.management.base import BaseCommand
+
+from tasks_app.workload import rebuild_assignments
+
+
+class Command(BaseCommand):
+    """Recreate TaskAssignment rows from every task's assignedTo list."""
+
+    help = 'Rebuild the per-contact task assignment index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = 0
+        for indexed in rebuild_assignments(options['batch_size']):
+            total += indexed
+            self.stdout.write(f'Indexed {total} tasks so far...')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} tasks.'))
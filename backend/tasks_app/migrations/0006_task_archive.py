@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def stamp_done_tasks(apps, schema_editor):
+    """Treat tasks already done as completed now, so none is archived early."""
+    Task = apps.get_model('tasks_app', 'Task')
+    Task.objects.filter(status=4).update(completedAt=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks_app', '0005_task_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('title', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('subtasks', models.JSONField(blank=True, default=list)),
+                ('priority', models.IntegerField()),
+                ('category', models.IntegerField(default=0)),
+                ('dueDate', models.DateField()),
+                ('assignedTo', models.JSONField(blank=True, default=list)),
+                ('status', models.IntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('completedAt', models.DateTimeField(blank=True, null=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('archivedAt', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='completedAt',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(stamp_done_tasks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 4)), fields=['completedAt'], name='task_done_completed_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
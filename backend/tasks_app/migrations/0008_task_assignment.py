@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def index_assignments(apps, schema_editor):
+    """Fill the assignment index from the existing tasks."""
+    Task = apps.get_model('tasks_app', 'Task')
+    TaskAssignment = apps.get_model('tasks_app', 'TaskAssignment')
+    rows = []
+    for task in Task.objects.iterator():
+        # Only integer entries of a list, as tasks_app.workload counts them.
+        assigned = task.assignedTo if isinstance(task.assignedTo, list) else []
+        contacts = {
+            contact for contact in assigned
+            if isinstance(contact, int) and not isinstance(contact, bool)
+        }
+        rows.extend(
+            TaskAssignment(
+                task_id=task.pk, contact_id=contact, status=task.status,
+                priority=task.priority, owner_id=task.owner_id,
+            )
+            for contact in contacts
+        )
+    TaskAssignment.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks_app', '0007_task_open_due_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contact_id', models.BigIntegerField()),
+                ('status', models.IntegerField()),
+                ('priority', models.IntegerField()),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='tasks_app.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['contact_id', 'status', 'priority', 'owner'], name='assignment_workload_idx')],
+            },
+        ),
+        migrations.RunPython(index_assignments, migrations.RunPython.noop),
+    ]
@@ -2,15 +2,87 @@
 Task model definitions for the tasks application.
 
 This module contains the Task model representing tasks with priorities,
-due dates, and assignees.
+due dates, and assignees, and the ArchivedTask model holding tasks that
+were done long enough to be moved out of the live table.
 """
 
+from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce, Now
 
+from user_auth_app.models import GuestAccount, is_guest
 
-class Task(models.Model):
+# Task.status value of the "Done" board column.
+STATUS_DONE = 4
+
+# Task.priority values: low, medium, urgent.
+PRIORITIES = (1, 2, 3)
+
+
+def completed_at_for(status):
     """
-    Model representing a task with all its properties.
+    Return the ``completedAt`` value to store for a task moved to ``status``.
+
+    Done tasks keep their original completion time when they already had
+    one; any other status clears it.
+    """
+    if status == STATUS_DONE:
+        return Coalesce(F('completedAt'), Now())
+    return None
+
+
+class OwnedQuerySet(models.QuerySet):
+    """QuerySet adding per-user visibility rules for rows with an owner."""
+
+    def visible_to(self, user):
+        """
+        Restrict the tasks to those ``user`` may see.
+
+        Guests only see their own sandbox tasks; everyone else sees the
+        shared board without any guest's tasks.
+        """
+        if is_guest(user):
+            return self.filter(owner=user)
+        return self.exclude(owner__in=GuestAccount.objects.values('user'))
+
+
+class TaskQuerySet(OwnedQuerySet):
+    """QuerySet adding visibility and deadline queries for tasks."""
+
+    def open(self):
+        """Restrict the tasks to those not done yet."""
+        return self.exclude(status=STATUS_DONE)
+
+    def overdue(self, today):
+        """Return open tasks due before ``today``, oldest deadline first."""
+        return self.open().filter(dueDate__lt=today).order_by('dueDate', 'id')
+
+    def due_between(self, start, end):
+        """Return open tasks due in ``[start, end)``, soonest first."""
+        return self.open().filter(
+            dueDate__gte=start, dueDate__lt=end
+        ).order_by('dueDate', 'id')
+
+    def next_deadlines(self):
+        """
+        Return the open task with the earliest deadline for each priority.
+
+        Runs one ``LIMIT 1`` scan of the open-task index per priority.
+
+        Returns:
+            dict: Maps each of ``PRIORITIES`` to a Task or ``None``.
+        """
+        return {
+            priority: self.open().filter(priority=priority)
+            .order_by('dueDate', 'id').first()
+            for priority in PRIORITIES
+        }
+
+
+class TaskFields(models.Model):
+    """
+    Abstract base with the columns shared by live and archived tasks.
 
     Attributes:
         title: The title of the task.
@@ -21,6 +93,10 @@ class Task(models.Model):
         dueDate: The due date for task completion.
         assignedTo: JSON list of users assigned to the task.
         status: Current status of the task (integer).
+        version: Row version incremented on every update, used for
+            optimistic concurrency control.
+        completedAt: When the task was last moved to done, or ``None``
+            while it is open.
     """
 
     title = models.CharField(max_length=100)
@@ -31,7 +107,109 @@ class Task(models.Model):
     dueDate = models.DateField()
     assignedTo = models.JSONField(default=list, blank=True)
     status = models.IntegerField(default=0)
+    version = models.PositiveIntegerField(default=1)
+    completedAt = models.DateTimeField(null=True, blank=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
 
     def __str__(self):
         """Return a string representation of the task."""
         return f"{self.title} {self.priority}"
+
+
+class Task(TaskFields):
+    """
+    Model representing a task with all its properties.
+
+    See TaskFields for the task columns.
+
+    Attributes:
+        owner: The User who created the task, if known.
+    """
+
+    owner = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='owned_tasks'
+    )
+
+    class Meta:
+        indexes = [
+            # Archival scans done tasks by completion time.
+            models.Index(
+                fields=['completedAt'], name='task_done_completed_idx',
+                condition=models.Q(status=STATUS_DONE),
+            ),
+            # Deadline queries only ever look at open tasks.
+            models.Index(
+                fields=['dueDate'], name='task_open_due_idx',
+                condition=~models.Q(status=STATUS_DONE),
+            ),
+            models.Index(
+                fields=['priority', 'dueDate'], name='task_open_priority_due_idx',
+                condition=~models.Q(status=STATUS_DONE),
+            ),
+        ]
+
+
+class ArchivedTask(TaskFields):
+    """
+    A done task moved out of the live table by ``archive_tasks``.
+
+    Keeps the primary key of the live task so a restored task gets its
+    old id back and clients holding references keep working.
+
+    Attributes:
+        id: The id the task had in the live table.
+        owner: The User who created the task, if known.
+        archivedAt: When the task was archived.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='archived_tasks'
+    )
+    archivedAt = models.DateTimeField(db_index=True)
+
+
+class TaskAssignment(models.Model):
+    """
+    One row per contact listed in a live task's ``assignedTo``.
+
+    Maintained by ``tasks_app.workload`` on task writes. Status,
+    priority and owner are copied from the task so per-contact workload
+    is a grouped scan of one covering index, without reading the tasks
+    or parsing their JSON.
+
+    Attributes:
+        task: The assigned task.
+        contact_id: The id listed in ``assignedTo``; not a foreign key
+            because the list may still name deleted contacts.
+        status: The task's status.
+        priority: The task's priority.
+        owner: The task's owner, for the visibility rules.
+    """
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='assignments'
+    )
+    contact_id = models.BigIntegerField()
+    status = models.IntegerField()
+    priority = models.IntegerField()
+    owner = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='+'
+    )
+
+    objects = OwnedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['contact_id', 'status', 'priority', 'owner'],
+                name='assignment_workload_idx',
+            ),
+        ]
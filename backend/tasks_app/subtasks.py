@@ -0,0 +1,144 @@
+"""
+Fine-grained edits of a task's subtasks.
+
+This module applies single subtask operations (add, update, toggle,
+move, delete) to the ``subtasks`` list of a task. Each edit reads only
+the ``subtasks`` and ``version`` columns and writes them back with
+``UPDATE ... WHERE version = ?``, so the rest of the task is neither
+validated nor rewritten and a concurrent edit is never overwritten.
+Subtasks are addressed by their position in the list.
+
+The request and response stay small, but the whole JSON array is still
+read and rewritten by every edit, so the cost of an edit grows linearly
+with the number of subtasks of the task.
+"""
+
+from django.db.models import F
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.concurrency import PreconditionFailed
+from tasks_app.models import Task
+
+# Conditional updates tried before giving up on a task that keeps changing.
+MAX_ATTEMPTS = 5
+
+
+class MalformedSubtasks(APIException):
+    """Raised when a task's ``subtasks`` is not a list of objects."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        "The task's subtasks are not a list of objects; replace them with a "
+        'task update first.'
+    )
+    default_code = 'malformed_subtasks'
+
+
+def stored_list(value):
+    """
+    Return a copy of a stored ``subtasks`` value to edit.
+
+    Raises:
+        MalformedSubtasks: If the value is not a list of objects.
+    """
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise MalformedSubtasks()
+    return list(value)
+
+
+def checked(subtasks, index):
+    """
+    Return the subtask at ``index``.
+
+    Raises:
+        IndexError: If there is no subtask at that position.
+    """
+    if not 0 <= index < len(subtasks):
+        raise IndexError(f'No subtask at position {index}.')
+    return subtasks[index]
+
+
+def add(subtasks, title, done=False, position=None):
+    """Insert a subtask at ``position``, appending by default."""
+    if position is None or position > len(subtasks):
+        position = len(subtasks)
+    subtask = {'title': title, 'done': done}
+    subtasks.insert(position, subtask)
+    return {'op': 'add', 'index': position, 'subtask': subtask}
+
+
+def update(subtasks, index, **fields):
+    """Rename the subtask at ``index`` and/or set its ``done`` flag."""
+    subtasks[index] = {**checked(subtasks, index), **fields}
+    return {'op': 'update', 'index': index, 'subtask': subtasks[index]}
+
+
+def toggle(subtasks, index):
+    """Flip the ``done`` flag of the subtask at ``index``."""
+    done = not checked(subtasks, index).get('done', False)
+    return {**update(subtasks, index, done=done), 'op': 'toggle'}
+
+
+def move(subtasks, index, to):
+    """Move the subtask at ``index`` to position ``to``."""
+    checked(subtasks, index)
+    to = min(to, len(subtasks) - 1)
+    subtasks.insert(to, subtasks.pop(index))
+    return {'op': 'move', 'index': index, 'to': to}
+
+
+def delete(subtasks, index):
+    """Remove the subtask at ``index``."""
+    checked(subtasks, index)
+    del subtasks[index]
+    return {'op': 'delete', 'index': index}
+
+
+def edit(tasks, pk, operation, *args, expected=None, **kwargs):
+    """
+    Apply one subtask operation to task ``pk``.
+
+    Without an expected version a write that loses the race against a
+    concurrent edit is retried on the fresh list, like the unconditional
+    task update.
+
+    Args:
+        tasks: Task queryset the task must belong to, typically already
+            restricted to what the user may see.
+        pk: The id of the task.
+        operation: One of the operations above; called with the task's
+            subtask list, which it changes in place, and ``args`` and
+            ``kwargs``.
+        expected: Version from the ``If-Match`` header, if any.
+
+    Returns:
+        tuple or None: The delta (task ``id``, new ``version`` and what
+            the operation changed) and the new subtask list, or ``None``
+            if the task does not exist.
+
+    Raises:
+        IndexError: If the operation addresses a missing subtask.
+        MalformedSubtasks: If the stored subtasks are not a list of
+            objects.
+        PreconditionFailed: If the task is not at ``expected`` version,
+            or kept changing for ``MAX_ATTEMPTS`` attempts.
+    """
+    for _ in range(MAX_ATTEMPTS):
+        row = tasks.filter(pk=pk).values('subtasks', 'version').first()
+        if row is None:
+            return None
+        if expected is not None and row['version'] != expected:
+            raise PreconditionFailed()
+        subtasks = stored_list(row['subtasks'])
+        delta = operation(subtasks, *args, **kwargs)
+        written = Task.objects.filter(pk=pk, version=row['version']).update(
+            subtasks=subtasks, version=F('version') + 1
+        )
+        if written:
+            return {'id': pk, 'version': row['version'] + 1, **delta}, subtasks
+        if expected is not None:
+            raise PreconditionFailed()
+    raise PreconditionFailed('The subtasks kept changing; try again.')
@@ -1,3 +1,562 @@
-from django.test import TestCase
+"""
+Tests for the tasks application API.
+"""
 
-# Create your tests here.
+import importlib
+import json
+import shutil
+import tempfile
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipIf
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.db import connection
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework.test import APITestCase, force_authenticate
+
+from core.idempotency import IdempotencyMixin
+from core.models import IdempotencyRecord
+from core.profiling import load_captures, memory_baseline, memory_peak_kb
+from core.queryplan import QueryPlanTestMixin
+from core.renderers import msgpack
+from tasks_app.api.views import TasksList
+from tasks_app.archive import archive_done
+from activity_app.models import ActivityEntry
+from tasks_app.models import ArchivedTask, Task, TaskAssignment
+from user_auth_app.models import GuestAccount
+
+MSGPACK = 'application/msgpack'
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+class TaskMessagePackTests(APITestCase):
+    """MessagePack responses and requests must round-trip the JSON API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(
+            title='Write docs', description='Ünïcode text', priority=2,
+            dueDate='2025-06-01', subtasks=[{'title': 'Draft', 'done': True}],
+            assignedTo=[1, 2], status=1,
+        )
+
+    def assert_same_payload(self, url):
+        as_json = self.client.get(url, HTTP_ACCEPT='application/json')
+        as_msgpack = self.client.get(url, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(as_msgpack['Content-Type'], MSGPACK)
+        self.assertEqual(msgpack.unpackb(as_msgpack.content), as_json.json())
+
+    def test_list_matches_json(self):
+        self.assert_same_payload('/api/v1/task/')
+
+    def test_detail_matches_json(self):
+        self.assert_same_payload(f'/api/v1/task/{self.task.pk}/')
+
+    def test_create_from_msgpack_body(self):
+        body = {
+            'title': 'Packed', 'priority': 3, 'dueDate': '2025-07-01',
+            'subtasks': [{'title': 'One', 'done': False}], 'assignedTo': [3],
+        }
+        response = self.client.post(
+            '/api/v1/task/', msgpack.packb(body), content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+        self.assertEqual(response.status_code, 201)
+        created = msgpack.unpackb(response.content)
+        self.assertEqual(created['subtasks'], body['subtasks'])
+        self.assertEqual(
+            created, self.client.get(f'/api/v1/task/{created["id"]}/').json()
+        )
+
+    def test_invalid_msgpack_body_is_rejected(self):
+        response = self.client.post(
+            '/api/v1/task/', b'\xc1', content_type=MSGPACK
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_keyed_map_is_rejected(self):
+        response = self.client.post(
+            '/api/v1/task/', b'\x81\x91\x01\x02', content_type=MSGPACK
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskVersioningTests(APITestCase):
+    """Updates honour If-Match and bump the task version."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(
+            title='Card', priority=1, dueDate='2025-06-01', status=1
+        )
+        self.url = f'/api/v1/task/{self.task.pk}/'
+
+    def test_detail_exposes_version_as_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], '"1"')
+        self.assertEqual(response.json()['version'], 1)
+
+    def test_matching_version_updates_in_one_statement(self):
+        # Guest check, permission-checked read, conditional UPDATE,
+        # re-read for the response, activity entry; plus SAVEPOINT and
+        # RELEASE, as the test itself runs in a transaction.
+        with self.assertNumQueries(7):
+            response = self.client.patch(self.url, {'status': 2}, HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.version), (2, 2))
+
+    def test_stale_version_is_rejected(self):
+        self.client.patch(self.url, {'status': 2}, HTTP_IF_MATCH='"1"')
+        response = self.client.patch(self.url, {'status': 3}, HTTP_IF_MATCH='W/"1"')
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.json()['version'], 2)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 2)
+
+    def test_update_without_if_match_still_bumps_version(self):
+        response = self.client.patch(self.url, {'title': 'Renamed'})
+        self.assertEqual(response.json()['version'], 2)
+
+    def test_version_is_read_only(self):
+        response = self.client.patch(self.url, {'version': 40})
+        self.assertEqual(response.json()['version'], 2)
+
+    def test_stale_delete_is_rejected(self):
+        response = self.client.delete(self.url, HTTP_IF_MATCH='"7"')
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(self.url, HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 204)
+
+    def test_missing_task_is_not_found(self):
+        response = self.client.patch('/api/v1/task/999/', {'status': 2}, HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskIdempotencyTests(APITestCase):
+    """Retried writes with an Idempotency-Key run only once."""
+
+    body = {'title': 'Retry me', 'priority': 2, 'dueDate': '2025-06-01'}
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+
+    def test_retried_create_is_replayed(self):
+        first = self.client.post('/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        retry = self.client.post('/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_key_reuse_with_other_payload_is_rejected(self):
+        self.client.post('/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        response = self.client.post(
+            '/api/v1/task/', {**self.body, 'title': 'Other'}, format='json',
+            HTTP_IDEMPOTENCY_KEY='abc',
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_racing_duplicate_does_not_replace_stored_response(self):
+        first = self.client.post('/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        lookups = []
+
+        def racing_lookup(view, key_hash):
+            # The duplicate checks before the first request has stored its record.
+            lookups.append(key_hash)
+            return None if len(lookups) == 1 else stored_record(view, key_hash)
+
+        stored_record = IdempotencyMixin.stored_record
+        with mock.patch.object(IdempotencyMixin, 'stored_record', racing_lookup):
+            retry = self.client.post(
+                '/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc'
+            )
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(IdempotencyRecord.objects.get().status_code, 201)
+
+    def test_duplicate_of_running_request_conflicts(self):
+        duplicates = []
+        perform_create = TasksList.perform_create
+
+        def slow_create(view, serializer):
+            duplicates.append(self.client.post(
+                '/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc'
+            ))
+            perform_create(view, serializer)
+
+        with mock.patch.object(TasksList, 'perform_create', slow_create):
+            first = self.client.post(
+                '/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc'
+            )
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual([response.status_code for response in duplicates], [409])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        with mock.patch.object(TasksList, 'perform_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    '/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc'
+                )
+        self.assertFalse(IdempotencyRecord.objects.exists())
+        response = self.client.post(
+            '/api/v1/task/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='abc'
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self.client.post('/api/v1/task/', self.body, format='json')
+        self.client.post('/api/v1/task/', self.body, format='json')
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_retried_update_replays_stored_version(self):
+        task = Task.objects.create(title='Card', priority=1, dueDate='2025-06-01')
+        url = f'/api/v1/task/{task.pk}/'
+        for _ in range(2):
+            response = self.client.patch(url, {'status': 2}, format='json', HTTP_IDEMPOTENCY_KEY='move-1')
+            self.assertEqual(response.json()['version'], 2)
+        task.refresh_from_db()
+        self.assertEqual(task.version, 2)
+
+
+class TaskArchiveTests(APITestCase):
+    """Long-done tasks move to the archive and can be restored."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(title='Ship', priority=1, dueDate='2025-06-01')
+
+    def test_status_changes_maintain_completion_time(self):
+        url = f'/api/v1/task/{self.task.pk}/'
+        self.client.patch(url, {'status': 4}, format='json')
+        self.task.refresh_from_db()
+        completed = self.task.completedAt
+        self.assertIsNotNone(completed)
+        self.client.patch(url, {'status': 4, 'title': 'Shipped'}, format='json')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.completedAt, completed)
+        self.client.patch(url, {'status': 2}, format='json')
+        self.task.refresh_from_db()
+        self.assertIsNone(self.task.completedAt)
+
+    def test_only_long_done_tasks_are_archived(self):
+        now = timezone.now()
+        Task.objects.filter(pk=self.task.pk).update(status=4, completedAt=now - timedelta(days=40))
+        recent = Task.objects.create(
+            title='Recent', priority=1, dueDate='2025-06-01', status=4, completedAt=now,
+        )
+        self.assertEqual(list(archive_done(days=30, batch_size=1, now=now)), [1])
+        self.assertEqual([t['id'] for t in self.client.get('/api/v1/task/').json()], [recent.pk])
+        page = self.client.get('/api/v1/task/archive/').json()
+        self.assertEqual([t['id'] for t in page['results']], [self.task.pk])
+
+    def test_restore_moves_task_back_under_its_id(self):
+        Task.objects.filter(pk=self.task.pk).update(
+            status=4, completedAt=timezone.now() - timedelta(days=40)
+        )
+        list(archive_done(days=30))
+        response = self.client.post(f'/api/v1/task/archive/{self.task.pk}/restore/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.task.pk)
+        self.assertEqual(response.json()['version'], 2)
+        self.assertFalse(ArchivedTask.objects.exists())
+        missing = self.client.post(f'/api/v1/task/archive/{self.task.pk}/restore/')
+        self.assertEqual(missing.status_code, 404)
+
+
+class TaskDeadlineTests(APITestCase):
+    """Deadline endpoints only return open tasks in due-date order."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        self.late = Task.objects.create(title='Late', priority=3, dueDate=today - timedelta(days=2), status=1)
+        Task.objects.create(title='Done', priority=3, dueDate=today - timedelta(days=3), status=4)
+        self.soon = Task.objects.create(title='Soon', priority=1, dueDate=today + timedelta(days=2), status=2)
+        self.later = Task.objects.create(title='Later', priority=3, dueDate=today + timedelta(days=20), status=1)
+
+    def ids(self, url):
+        return [task['id'] for task in self.client.get(url).json()]
+
+    def test_overdue_and_upcoming(self):
+        self.assertEqual(self.ids('/api/v1/task/due/overdue/'), [self.late.pk])
+        self.assertEqual(self.ids('/api/v1/task/due/upcoming/'), [self.soon.pk])
+        self.assertEqual(self.ids('/api/v1/task/due/upcoming/?days=30&limit=1'), [self.soon.pk])
+        self.assertEqual(self.client.get('/api/v1/task/due/upcoming/?days=x').status_code, 400)
+
+    def test_next_deadline_per_priority(self):
+        data = self.client.get('/api/v1/task/due/next/').json()
+        self.assertEqual(data['3']['id'], self.late.pk)
+        self.assertEqual(data['1']['id'], self.soon.pk)
+        self.assertIsNone(data['2'])
+
+
+class TaskWorkloadTests(APITestCase):
+    """Workload counts follow task writes, with and without the index."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        body = {'title': 'Card', 'priority': 3, 'dueDate': '2025-06-01', 'status': 1}
+        self.first = self.client.post('/api/v1/task/', {**body, 'assignedTo': [7, 8]}, format='json').json()
+        self.client.post('/api/v1/task/', {**body, 'assignedTo': [7], 'status': 4}, format='json')
+
+    def test_counts_follow_writes(self):
+        self.client.patch(f'/api/v1/task/{self.first["id"]}/', {'assignedTo': [7]}, format='json')
+        data = self.client.get('/api/v1/task/workload/').json()
+        self.assertEqual(data, [{
+            'contact': 7, 'open': 1, 'total': 2,
+            'byStatus': {'1': 1, '4': 1}, 'byPriority': {'3': 1},
+        }])
+        self.client.patch(f'/api/v1/task/{self.first["id"]}/', {'status': 4}, format='json')
+        self.assertEqual(self.client.get('/api/v1/task/workload/').json()[0]['byStatus'], {'4': 2})
+        self.client.delete(f'/api/v1/task/{self.first["id"]}/')
+        self.assertEqual(self.client.get('/api/v1/task/workload/').json()[0]['total'], 1)
+
+    def test_json_fallback_matches_index(self):
+        self.client.post('/api/v1/task/', {
+            'title': 'Odd', 'priority': 1, 'dueDate': '2025-06-01',
+            'assignedTo': ['abc', '9', 2.5, True, None, {'id': 7}, 9],
+        }, format='json')
+        indexed = self.client.get('/api/v1/task/workload/').json()
+        self.assertEqual([entry['contact'] for entry in indexed], [7, 8, 9])
+        with override_settings(TASK_ASSIGNMENT_INDEX=False):
+            computed = self.client.get('/api/v1/task/workload/').json()
+        self.assertEqual(computed, indexed)
+
+    def test_non_object_update_is_rejected(self):
+        response = self.client.patch(
+            f'/api/v1/task/{self.first["id"]}/', [{'assignedTo': [7]}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_plain_value_assignees_are_not_counted(self):
+        for assigned in (5, True, 'x', {'id': 7}):
+            response = self.client.post('/api/v1/task/', {
+                'title': 'Plain', 'priority': 1, 'dueDate': '2025-06-01',
+                'assignedTo': assigned,
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+        indexed = self.client.get('/api/v1/task/workload/').json()
+        self.assertEqual([entry['contact'] for entry in indexed], [7, 8])
+        with override_settings(TASK_ASSIGNMENT_INDEX=False):
+            self.assertEqual(self.client.get('/api/v1/task/workload/').json(), indexed)
+        migration = importlib.import_module('tasks_app.migrations.0008_task_assignment')
+        TaskAssignment.objects.all().delete()
+        Task.objects.create(
+            title='Odd', priority=1, dueDate='2025-06-01',
+            assignedTo=['9', True, 2.5, 9],
+        )
+        migration.index_assignments(apps, None)
+        self.assertEqual(
+            sorted(TaskAssignment.objects.values_list('contact_id', flat=True)),
+            [7, 7, 8, 9],
+        )
+
+
+class SubtaskTests(APITestCase):
+    """Single subtasks are edited without rewriting the task."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(
+            title='Card', priority=1, dueDate='2025-06-01', description='keep',
+            subtasks=[{'title': 'A', 'done': False}, {'title': 'B', 'done': True}],
+        )
+        self.url = f'/api/v1/task/{self.task.pk}/subtasks/'
+
+    def test_operations_return_deltas_and_bump_version(self):
+        added = self.client.post(self.url, {'title': 'C', 'position': 0}, format='json')
+        self.assertEqual(added.status_code, 201)
+        self.assertEqual(added.json(), {
+            'id': self.task.pk, 'version': 2, 'op': 'add', 'index': 0,
+            'subtask': {'title': 'C', 'done': False},
+        })
+        toggled = self.client.post(f'{self.url}1/toggle/', format='json').json()
+        self.assertEqual(toggled['subtask'], {'title': 'A', 'done': True})
+        moved = self.client.patch(
+            f'{self.url}2/', {'title': 'B2', 'position': 0}, format='json'
+        ).json()
+        self.assertEqual((moved['index'], moved['to']), (2, 0))
+        self.assertEqual(self.client.delete(f'{self.url}1/').json()['version'], 5)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.subtasks, [
+            {'title': 'B2', 'done': True}, {'title': 'A', 'done': True},
+        ])
+        self.assertEqual((self.task.version, self.task.description), (5, 'keep'))
+
+    def test_missing_subtask_and_stale_version(self):
+        self.assertEqual(self.client.delete(f'{self.url}5/').status_code, 404)
+        response = self.client.post(f'{self.url}0/toggle/', HTTP_IF_MATCH='"7"')
+        self.assertEqual(response.status_code, 412)
+        response = self.client.post(f'{self.url}0/toggle/', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response['ETag'], '"2"')
+
+    def test_malformed_subtasks_are_left_alone(self):
+        for stored in ({'note': 'x'}, ['text'], 'text'):
+            Task.objects.filter(pk=self.task.pk).update(subtasks=stored)
+            added = self.client.post(self.url, {'title': 'C'}, format='json')
+            toggled = self.client.post(f'{self.url}0/toggle/', format='json')
+            self.assertEqual((added.status_code, toggled.status_code), (409, 409))
+            self.task.refresh_from_db()
+            self.assertEqual((self.task.subtasks, self.task.version), (stored, 1))
+
+    def test_activity_records_the_new_list(self):
+        self.client.post(f'{self.url}0/toggle/', format='json')
+        entry = ActivityEntry.objects.get(object_id=self.task.pk)
+        self.assertEqual(entry.changes, {'subtasks': [
+            {'title': 'A', 'done': True}, {'title': 'B', 'done': True},
+        ]})
+
+
+class TaskQueryPlanTests(QueryPlanTestMixin, APITestCase):
+    """The hot task queries stay on their indexes and within budget."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('planner', password='pw-12345678')
+        self.guest = User.objects.create_user('guest-planner', password='pw-12345678')
+        GuestAccount.objects.create(user=self.guest)
+        today = timezone.localdate()
+        self.task = Task.objects.create(
+            title='Open', priority=3, dueDate=today, assignedTo=[1], status=1,
+        )
+        Task.objects.create(
+            title='Late', priority=1, dueDate=today - timedelta(days=3), status=2,
+            owner=self.guest,
+        )
+        ArchivedTask.objects.create(
+            id=999, title='Old', priority=2, dueDate=today, status=4,
+            archivedAt=timezone.now(),
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_and_detail(self):
+        # The board list returns every shared task by design.
+        self.assertHotPath('get', '/api/v1/task/', queries=2, scans={'tasks_app_task'})
+        self.assertHotPath('get', f'/api/v1/task/{self.task.pk}/', queries=2)
+        self.client.force_authenticate(self.guest)
+        self.assertHotPath('get', '/api/v1/task/', queries=2)
+
+    def test_deadline_filters_use_open_task_indexes(self):
+        self.assertHotPath('get', '/api/v1/task/due/overdue/', queries=2)
+        self.assertHotPath('get', '/api/v1/task/due/upcoming/?days=30', queries=2)
+        self.assertHotPath('get', '/api/v1/task/due/next/', queries=4)
+
+    def test_workload_and_archive(self):
+        # Workload aggregates every assignment, off the covering index.
+        self.assertHotPath(
+            'get', '/api/v1/task/workload/', queries=2,
+            scans={'tasks_app_taskassignment'},
+        )
+        # A page of the archive walks the archivedAt index and stops early.
+        self.assertHotPath(
+            'get', '/api/v1/task/archive/', queries=2,
+            scans={'tasks_app_archivedtask'},
+        )
+        self.assertHotPath('get', '/api/v1/task/archive/999/', queries=2)
+
+    def test_dropped_index_and_extra_queries_fail(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX task_open_due_idx')
+        with self.assertRaisesRegex(AssertionError, 'scans tasks_app_task in full'):
+            self.assertHotPath('get', '/api/v1/task/due/overdue/', queries=2)
+        with self.assertRaisesRegex(AssertionError, 'budget 2'):
+            self.assertHotPath('get', '/api/v1/task/due/next/', queries=2)
+
+
+@override_settings(LIST_STREAMING=True, LIST_STREAMING_CHUNK_SIZE=500)
+class ListStreamingTests(APITestCase):
+    """Streamed lists match the buffered ones in flat memory."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('streamer', password='pw-12345678')
+        self.client.force_authenticate(self.user)
+
+    def add_tasks(self, count):
+        Task.objects.bulk_create(
+            (Task(title=f'Task {index}', description='Notes ' * 40, priority=2,
+                  dueDate='2025-06-01', assignedTo=[1, 2]) for index in range(count)),
+            batch_size=2000,
+        )
+
+    def traced_peak(self, consume):
+        tracemalloc.start()
+        try:
+            baseline = memory_baseline()
+            consume()
+            return memory_peak_kb(baseline)
+        finally:
+            tracemalloc.stop()
+
+    def streamed_peak(self):
+        response = self.client.get('/api/v1/task/')
+        self.assertTrue(response.streaming)
+        return self.traced_peak(lambda: sum(map(len, response.streaming_content)))
+
+    def test_streamed_body_matches_buffered(self):
+        self.assertEqual(
+            json.loads(b''.join(self.client.get('/api/v1/task/').streaming_content)), []
+        )
+        self.add_tasks(1201)
+        streamed = self.client.get('/api/v1/task/')
+        self.assertEqual(streamed['Content-Type'], 'application/json')
+        with self.settings(LIST_STREAMING=False):
+            buffered = self.client.get('/api/v1/task/')
+        self.assertFalse(buffered.streaming)
+        self.assertEqual(json.loads(b''.join(streamed.streaming_content)), buffered.json())
+        # MessagePack keeps the buffered response.
+        response = self.client.get('/api/v1/task/', HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(response.streaming, msgpack is None)
+
+    def test_peak_memory_does_not_grow_with_rows(self):
+        self.add_tasks(2000)
+        small = self.streamed_peak()
+        self.add_tasks(8000)
+        large = self.streamed_peak()
+        with self.settings(LIST_STREAMING=False):
+            buffered = self.traced_peak(lambda: self.client.get('/api/v1/task/'))
+        self.assertLess(large, small * 1.5)
+        self.assertGreater(buffered, large * 5)
+
+    def test_asgi_request_is_buffered(self):
+        self.add_tasks(3)
+        request = AsyncRequestFactory().get('/api/v1/task/')
+        force_authenticate(request, self.user)
+        response = TasksList.as_view()(request)
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data), 3)
+
+    def test_profiling_records_peak_of_streamed_body(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        with self.settings(
+            PROFILING_ENABLED=True, PROFILING_MEMORY=True, PROFILING_PEAK_KB=1,
+            PROFILING_DIR=directory,
+        ):
+            self.add_tasks(50)
+            try:
+                response = self.client.get('/api/v1/task/')
+                self.assertEqual(load_captures(), [])
+                b''.join(response.streaming_content)
+            finally:
+                tracemalloc.stop()
+            [capture] = load_captures()
+        self.assertEqual(capture['endpoint'], 'api/v1/task/')
+        self.assertGreater(capture['peak_kb'], 1)
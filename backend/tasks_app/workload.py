@@ -0,0 +1,179 @@
+"""
+Per-contact workload of tasks.
+
+This module keeps the TaskAssignment index in step with task writes and
+aggregates it into per-contact counts by status and priority. With
+``TASK_ASSIGNMENT_INDEX`` disabled the same counts are computed from the
+``assignedTo`` JSON lists with the database's JSON table functions.
+"""
+
+from django.conf import settings
+from django.db import NotSupportedError, connections, transaction
+from django.db.models import Count
+
+from tasks_app.models import STATUS_DONE, Task, TaskAssignment
+
+ASSIGNMENT_COLUMNS = ('id', 'assignedTo', 'status', 'priority', 'owner')
+
+# Task fields copied into the assignment rows.
+ASSIGNMENT_FIELDS = {'assignedTo', 'status', 'priority'}
+
+# Unnests assignedTo into one row per contact id; the task filter is
+# spliced in as a subquery. Only integer entries of a list count, as in
+# ``assignments_for``.
+JSON_WORKLOAD_SQL = {
+    'sqlite': """
+        SELECT j.value, t.status, t.priority, COUNT(DISTINCT t.id)
+        FROM tasks_app_task t, json_each(t."assignedTo") j
+        WHERE t.id IN ({tasks}) AND json_type(t."assignedTo") = 'array'
+              AND j.type = 'integer'
+        GROUP BY 1, 2, 3
+    """,
+    'postgresql': """
+        SELECT CAST(j.value #>> '{{}}' AS bigint), t.status, t.priority,
+               COUNT(DISTINCT t.id)
+        FROM tasks_app_task t,
+             jsonb_array_elements(CASE jsonb_typeof(t."assignedTo")
+                 WHEN 'array' THEN t."assignedTo" ELSE '[]' END) AS j(value)
+        WHERE t.id IN ({tasks}) AND jsonb_typeof(j.value) = 'number'
+              AND j.value #>> '{{}}' ~ '^-?[0-9]+$'
+        GROUP BY 1, 2, 3
+    """,
+}
+
+
+def contact_ids(assigned):
+    """
+    Return the contact ids listed in an ``assignedTo`` value.
+
+    Only integer entries of a list are contact ids; any other value or
+    entry is skipped.
+    """
+    if not isinstance(assigned, list):
+        return set()
+    return {
+        contact for contact in assigned
+        if isinstance(contact, int) and not isinstance(contact, bool)
+    }
+
+
+def assignments_for(rows):
+    """Build the TaskAssignment rows for task dicts of ``ASSIGNMENT_COLUMNS``."""
+    for row in rows:
+        contacts = contact_ids(row['assignedTo'])
+        for contact in sorted(contacts):
+            yield TaskAssignment(
+                task_id=row['id'], contact_id=contact, status=row['status'],
+                priority=row['priority'], owner_id=row['owner'],
+            )
+
+
+def replace_assignments(rows):
+    """
+    Replace the assignment rows of tasks whose assignees were written.
+
+    Call inside the transaction that created or updated the tasks;
+    deleting a task removes its rows through the foreign key. Does
+    nothing when the index is disabled.
+
+    Args:
+        rows: Task dicts (or serializer data) with ``ASSIGNMENT_COLUMNS``.
+    """
+    if not settings.TASK_ASSIGNMENT_INDEX:
+        return
+    rows = list(rows)
+    TaskAssignment.objects.filter(task_id__in=[row['id'] for row in rows]).delete()
+    TaskAssignment.objects.bulk_create(assignments_for(rows))
+
+
+def refresh_assignments(row):
+    """
+    Copy a task's new status and priority onto its assignment rows.
+
+    Cheaper than ``replace_assignments`` when the assignees are unchanged;
+    unassigned tasks have no rows and cost no query.
+
+    Args:
+        row: Task dict (or serializer data) with ``ASSIGNMENT_COLUMNS``.
+    """
+    if not settings.TASK_ASSIGNMENT_INDEX or not row['assignedTo']:
+        return
+    TaskAssignment.objects.filter(task_id=row['id']).update(
+        status=row['status'], priority=row['priority']
+    )
+
+
+def rebuild_assignments(batch_size=2000):
+    """
+    Rebuild the whole assignment index in batches of tasks.
+
+    Yields:
+        int: Number of tasks indexed by each batch.
+    """
+    TaskAssignment.objects.all().delete()
+    last = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Task.objects.filter(pk__gt=last).order_by('pk')
+                .values(*ASSIGNMENT_COLUMNS)[:batch_size]
+            )
+            TaskAssignment.objects.bulk_create(assignments_for(rows))
+        if not rows:
+            return
+        last = rows[-1]['id']
+        yield len(rows)
+
+
+def workload_counts(user):
+    """
+    Count the tasks ``user`` may see per contact, status and priority.
+
+    Returns:
+        list: ``(contact_id, status, priority, count)`` tuples.
+    """
+    if settings.TASK_ASSIGNMENT_INDEX:
+        return list(
+            TaskAssignment.objects.visible_to(user)
+            .values_list('contact_id', 'status', 'priority')
+            .annotate(count=Count('id')).order_by()
+        )
+    tasks = Task.objects.visible_to(user)
+    connection = connections[tasks.db]
+    if connection.vendor not in JSON_WORKLOAD_SQL:
+        raise NotSupportedError(
+            'Enable TASK_ASSIGNMENT_INDEX on this database backend.'
+        )
+    subquery, params = tasks.values('id').query.sql_with_params()
+    sql = JSON_WORKLOAD_SQL[connection.vendor].format(tasks=subquery)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def workload(user):
+    """
+    Return the workload of every contact assigned to a task ``user`` sees.
+
+    Args:
+        user: The requesting user; guests only count their own tasks.
+
+    Returns:
+        list: One dict per contact with ``contact``, ``open`` and
+            ``total`` task counts, ``byStatus`` over all tasks and
+            ``byPriority`` over open tasks, busiest contact first.
+    """
+    contacts = {}
+    for contact, status, priority, count in workload_counts(user):
+        entry = contacts.setdefault(contact, {
+            'contact': contact, 'open': 0, 'total': 0,
+            'byStatus': {}, 'byPriority': {},
+        })
+        entry['total'] += count
+        by_status = entry['byStatus']
+        by_status[str(status)] = by_status.get(str(status), 0) + count
+        if status != STATUS_DONE:
+            entry['open'] += count
+            by_priority = entry['byPriority']
+            by_priority[str(priority)] = by_priority.get(str(priority), 0) + count
+    return sorted(contacts.values(), key=lambda e: (-e['open'], e['contact']))
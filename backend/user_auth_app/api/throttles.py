@@ -0,0 +1,142 @@
+"""
+Rate limiting for the user authentication endpoints.
+
+This module defines per-IP throttles for login and registration, a
+lockout of one account for one client IP address after repeated failed
+logins and a backoff of an account guessed at from many addresses, all
+kept in the shared counter store.
+"""
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+
+from core.counters import get_store
+from core.throttling import SlidingWindowThrottle
+
+# How long a client that logged in successfully skips the account backoff.
+KNOWN_CLIENT_PERIOD = 30 * 24 * 60 * 60
+
+
+class LoginRateThrottle(SlidingWindowThrottle):
+    """Limits login attempts per client IP address."""
+
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        """Return the counter key for the client's IP address."""
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class RegistrationRateThrottle(LoginRateThrottle):
+    """Limits account registrations per client IP address."""
+
+    scope = 'registration'
+
+
+class GuestLoginRateThrottle(LoginRateThrottle):
+    """Limits guest account claims per client IP address."""
+
+    scope = 'guest'
+
+
+def normalized(username):
+    """Return ``username`` as the counter keys spell it."""
+    return username.strip().lower()
+
+
+def account_key(request, username):
+    """
+    Return the failure counter key for ``username`` from this client.
+
+    The key includes the client's IP address, so failed logins from one
+    address cannot lock the account for everyone else.
+    """
+    ident = LoginRateThrottle().get_ident(request)
+    return f'login_failures_{normalized(username)}_{ident}'
+
+
+def known_client_key(request, username):
+    """Return the key marking this client as having logged in to ``username``."""
+    ident = LoginRateThrottle().get_ident(request)
+    return f'login_known_{normalized(username)}_{ident}'
+
+
+def check_account_backoff(request, username):
+    """
+    Slow down guessing at ``username`` from many addresses.
+
+    Once the account had ``LOGIN_ACCOUNT_FAILURE_LIMIT`` failed logins
+    from any addresses within ``LOGIN_FAILURE_WINDOW``, clients that have
+    not logged in to it before get one attempt per
+    ``LOGIN_ACCOUNT_BACKOFF`` seconds between them. The account is never
+    locked: its owner waits a few seconds at most, and not at all from a
+    client they logged in from within ``KNOWN_CLIENT_PERIOD``.
+
+    Raises:
+        Throttled: If another client used the attempt of this period.
+    """
+    store = get_store()
+    name = normalized(username)
+    failures = store.peek(f'login_failures_{name}', settings.LOGIN_FAILURE_WINDOW)
+    if failures < settings.LOGIN_ACCOUNT_FAILURE_LIMIT:
+        return
+    if store.peek(known_client_key(request, username), KNOWN_CLIENT_PERIOD):
+        return
+    backoff = settings.LOGIN_ACCOUNT_BACKOFF
+    if store.peek(f'login_backoff_{name}', backoff) >= 1:
+        raise Throttled(
+            wait=backoff,
+            detail='Too many failed logins for this account; try again shortly.',
+        )
+    store.hit(f'login_backoff_{name}', backoff)
+
+
+def check_account_lock(request, username):
+    """
+    Reject the login if the account had too many recent failures.
+
+    Args:
+        request: The login request.
+        username: The username sent with the login request.
+
+    Raises:
+        Throttled: If ``LOGIN_FAILURE_LIMIT`` failures from the client's
+            IP address happened within the last ``LOGIN_FAILURE_WINDOW``
+            seconds, or the account is in backoff (see
+            ``check_account_backoff``).
+    """
+    if not username:
+        return
+    failures = get_store().peek(
+        account_key(request, username), settings.LOGIN_FAILURE_WINDOW
+    )
+    if failures >= settings.LOGIN_FAILURE_LIMIT:
+        raise Throttled(
+            wait=settings.LOGIN_FAILURE_WINDOW,
+            detail='Too many failed logins for this account.',
+        )
+    check_account_backoff(request, username)
+
+
+def record_login_failure(request, username):
+    """Count a failed login for ``username`` from this client and overall."""
+    if username:
+        store = get_store()
+        store.hit(account_key(request, username), settings.LOGIN_FAILURE_WINDOW)
+        store.hit(f'login_failures_{normalized(username)}', settings.LOGIN_FAILURE_WINDOW)
+
+
+def reset_login_failures(request, username):
+    """
+    Clear the client's failure count after a successful login.
+
+    The client is remembered as known to the account. The account-wide
+    count is kept: a login by the owner must not reset the budget of
+    someone guessing from elsewhere.
+    """
+    store = get_store()
+    store.reset(account_key(request, username))
+    store.hit(known_client_key(request, username), KNOWN_CLIENT_PERIOD)
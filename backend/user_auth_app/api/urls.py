@@ -12,6 +12,7 @@ from .views import (
     RegistrationView,
     CustomLoginView,
     LogoutView,
+    GuestLoginView,
 )
 
 urlpatterns = [
@@ -20,4 +21,5 @@ urlpatterns = [
     path('registration/', RegistrationView.as_view(), name='registration'),
     path('login/', CustomLoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('guest/', GuestLoginView.as_view(), name='guest-login'),
 ]
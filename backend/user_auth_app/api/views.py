@@ -5,15 +5,31 @@ This module provides API endpoints for user registration, login, logout,
 and user profile management.
 """
 
+from collections.abc import Mapping
+
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
+from django.db.models import Q
+from core.streaming import StreamingListMixin
+from jobs_app.queue import enqueue
+from user_auth_app.deletion import mark_for_deletion
+from user_auth_app.guests import claim_guest
 from .serializers import RegistrationSerializer, UserProfileSerializer
 from .permissions import IsOwnerOrAdmin
+from .throttles import (
+    GuestLoginRateThrottle,
+    LoginRateThrottle,
+    RegistrationRateThrottle,
+    check_account_lock,
+    record_login_failure,
+    reset_login_failures,
+)
 
 
 class LogoutView(APIView):
@@ -39,37 +55,57 @@ class LogoutView(APIView):
         return Response({"message": "Logged out successfully"}, status=200)
 
 
-class UserList(generics.ListAPIView):
+class UserList(StreamingListMixin, generics.ListAPIView):
     """
     API view to list all users.
 
-    GET: Returns a list of all registered users.
+    GET: Returns a list of all registered users. Guest accounts are
+    hidden, except the requesting guest itself, and so are users being
+    deleted. The list is streamed with ``LIST_STREAMING``.
     """
 
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deletion__isnull=True)
     serializer_class = UserProfileSerializer
 
+    def get_queryset(self):
+        """Return registered users plus the requesting user."""
+        return super().get_queryset().filter(
+            Q(guest_account__isnull=True) | Q(pk=self.request.user.pk)
+        )
+
 
 class UserDetail(generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a specific user.
 
-    Only the owner or admin can modify user data.
+    Only the owner or admin can modify user data. DELETE deactivates the
+    user at once and answers 204; a background job then removes the
+    account and its data in batches. The deletion also revokes the
+    user's tokens, so there is no job status for them to poll.
     """
 
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deletion__isnull=True)
     serializer_class = UserProfileSerializer
     permission_classes = [IsOwnerOrAdmin]
 
+    def destroy(self, request, *args, **kwargs):
+        """Mark the user for deletion and queue the deletion job."""
+        user = self.get_object()
+        mark_for_deletion(user)
+        enqueue('delete_users')
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class RegistrationView(APIView):
     """
     API view for user registration.
 
     Creates a new user account and returns an authentication token.
+    Registrations are rate limited per client IP address.
     """
 
     permission_classes = [AllowAny]
+    throttle_classes = [RegistrationRateThrottle]
 
     def post(self, request):
         """
@@ -119,9 +155,16 @@ class CustomLoginView(ObtainAuthToken):
     Custom login view extending Django REST framework's ObtainAuthToken.
 
     Returns user details along with the authentication token.
+    Uses the project-wide parsers and renderers instead of the JSON-only
+    defaults of ObtainAuthToken, so MessagePack clients can log in too.
+    Attempts are rate limited per client IP address, and an account is
+    locked for that address for a while after repeated failed logins.
     """
 
     permission_classes = [AllowAny]
+    throttle_classes = [LoginRateThrottle]
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
     def post(self, request):
         """
@@ -134,11 +177,21 @@ class CustomLoginView(ObtainAuthToken):
             Response with user data and token on success,
             or authentication errors on failure.
         """
+        if not isinstance(request.data, Mapping):
+            return Response(
+                {'non_field_errors': [
+                    f'Invalid data. Expected a dictionary, but got {type(request.data).__name__}.'
+                ]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        username = str(request.data.get('username', ''))
+        check_account_lock(request, username)
         serializer = self.serializer_class(data=request.data)
 
         data = {}
         if serializer.is_valid():
             user = serializer.validated_data['user']
+            reset_login_failures(request, username)
 
             token, created = Token.objects.get_or_create(user=user)
             data = {
@@ -155,6 +208,7 @@ class CustomLoginView(ObtainAuthToken):
             if 'non_field_errors' in data and \
                     "Unable to log in with provided credentials." in \
                     data['non_field_errors']:
+                record_login_failure(request, username)
                 return Response(data, status=status.HTTP_401_UNAUTHORIZED)
             if 'username' in data and \
                     "This field is required." in data['username']:
@@ -164,4 +218,40 @@ class CustomLoginView(ObtainAuthToken):
                 return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(data)
-    
\ No newline at end of file
+
+
+class GuestLoginView(APIView):
+    """
+    API view handing out an ephemeral guest account.
+
+    Each visitor gets their own pre-provisioned account from the guest
+    pool, seeded with template tasks and contacts, instead of sharing
+    one guest login.
+    """
+
+    permission_classes = [AllowAny]
+    throttle_classes = [GuestLoginRateThrottle]
+
+    def post(self, request):
+        """
+        Handle guest login request.
+
+        Args:
+            request: The HTTP request.
+
+        Returns:
+            Response with the guest's user data, token and expiry.
+        """
+        guest = claim_guest()
+        user = guest.user
+        token, created = Token.objects.get_or_create(user=user)
+        data = {
+            'id': user.id,
+            'token': token.key,
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'email': user.email,
+            'expires_at': guest.expires_at,
+        }
+        return Response(data, status=status.HTTP_201_CREATED)
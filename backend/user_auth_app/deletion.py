@@ -0,0 +1,124 @@
+"""
+Batched deletion of user accounts.
+
+Deleting a user through the ORM collects every dependent row in memory
+and removes them all in one long transaction. Instead, this module
+soft-marks the user right away (deactivated, tokens revoked, hidden from
+the user list) and leaves the dependent rows to a background run. That
+run removes them in fixed-size batches of raw ``DELETE ... WHERE id IN
+(...)`` statements, each batch in its own short transaction, following
+the ``on_delete`` rule of every relation pointing at the user.
+"""
+
+from django.contrib.auth.models import User
+from django.db import connections, models, router, transaction
+from rest_framework.authtoken.models import Token
+
+from .models import UserDeletion
+
+
+def mark_for_deletion(user):
+    """
+    Deactivate ``user`` and queue the account for deletion.
+
+    The user can no longer log in or authenticate with a token, and is
+    hidden from the user list, as soon as this returns.
+    """
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        Token.objects.filter(user_id=user.pk).delete()
+        UserDeletion.objects.get_or_create(user_id=user.pk)
+
+
+def dependents(model, rows, seen=()):
+    """
+    Plan the removal of everything referencing ``rows`` of ``model``.
+
+    Rows of cascading relations are planned children first, so each
+    batch can be deleted without violating a foreign key. Deletion
+    markers are skipped; they go with the user itself.
+
+    Args:
+        model: The model of the rows being deleted.
+        rows: Queryset of those rows.
+        seen: Models already on the path, to stop at cycles.
+
+    Yields:
+        tuple: ``(action, model, queryset, field)`` with action
+            ``'delete'`` or ``'null'``.
+    """
+    for relation in model._meta.get_fields(include_hidden=True):
+        if not (relation.auto_created and not relation.concrete):
+            continue
+        if not (relation.one_to_many or relation.one_to_one):
+            continue
+        child, field = relation.related_model, relation.field
+        if child is UserDeletion or child in seen:
+            continue
+        children = child._base_manager.filter(
+            **{f'{field.name}__in': rows.values(field.target_field.attname)}
+        )
+        if relation.on_delete is models.CASCADE:
+            yield from dependents(child, children, (*seen, model))
+            yield 'delete', child, children, field
+        elif relation.on_delete is models.SET_NULL:
+            yield 'null', child, children, field
+
+
+def delete_rows(model, ids):
+    """Delete the rows ``ids`` of ``model`` with one raw statement."""
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(model._meta.pk.column)} IN ({placeholders})',
+            ids,
+        )
+        return cursor.rowcount
+
+
+def delete_user(user_id, batch_size=500):
+    """
+    Delete one marked user and its dependent rows in batches.
+
+    Yields:
+        tuple: ``(model label, rows)`` for each batch of deleted or
+            detached rows, and finally ``('auth.User', 1)``.
+    """
+    rows = User.objects.filter(pk=user_id)
+    for action, model, queryset, field in dependents(User, rows):
+        while True:
+            with transaction.atomic():
+                ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                if action == 'delete':
+                    count = delete_rows(model, ids)
+                else:
+                    count = model._base_manager.filter(pk__in=ids).update(
+                        **{field.name: None}
+                    )
+            yield model._meta.label, count
+    with transaction.atomic():
+        # Only the user row and its marker are left to collect.
+        rows.delete()
+    yield User._meta.label, 1
+
+
+def delete_marked(batch_size=500):
+    """
+    Delete every user marked for deletion, oldest request first.
+
+    An interrupted run resumes where it stopped, because every batch
+    only deletes rows that still exist.
+
+    Yields:
+        tuple: ``(model label, rows)`` per batch, see ``delete_user``.
+    """
+    while True:
+        marker = UserDeletion.objects.order_by('requested_at').first()
+        if marker is None:
+            return
+        yield from delete_user(marker.user_id, batch_size)
@@ -0,0 +1,57 @@
+"""
+Template data copied into every new guest account.
+
+Tasks reference contacts by their index in ``CONTACTS``; the indexes are
+mapped to the ids of the copied contacts during provisioning. Due dates
+are given as offsets in days from the provisioning date.
+"""
+
+CONTACTS = [
+    {'firstName': 'Anja', 'lastName': 'Schulz', 'email': 'anja.schulz@example.com', 'phoneNumber': '+49 151 2345678'},
+    {'firstName': 'Benedikt', 'lastName': 'Ziegler', 'email': 'benedikt@example.com', 'phoneNumber': '+49 160 9876543'},
+    {'firstName': 'David', 'lastName': 'Eisenberg', 'email': 'davidberg@example.com', 'phoneNumber': '+49 170 1112223'},
+    {'firstName': 'Eva', 'lastName': 'Fischer', 'email': 'eva@example.com', 'phoneNumber': '+49 152 4445556'},
+    {'firstName': 'Marcel', 'lastName': 'Bauer', 'email': 'bauer@example.com', 'phoneNumber': '+49 157 7778889'},
+]
+
+TASKS = [
+    {
+        'title': 'Kochwelt Page & Recipe Recommender',
+        'description': 'Build start page with recipe recommendation.',
+        'subtasks': [
+            {'title': 'Implement recipe recommendation', 'done': True},
+            {'title': 'Start page layout', 'done': False},
+        ],
+        'priority': 2, 'category': 1, 'due_in_days': 14, 'assignedTo': [0, 1], 'status': 2,
+    },
+    {
+        'title': 'HTML Base Template Creation',
+        'description': 'Create reusable HTML base templates.',
+        'subtasks': [],
+        'priority': 1, 'category': 2, 'due_in_days': 21, 'assignedTo': [2, 3], 'status': 3,
+    },
+    {
+        'title': 'Daily Kochwelt Recipe',
+        'description': 'Implement daily recipe and portion calculator.',
+        'subtasks': [],
+        'priority': 2, 'category': 1, 'due_in_days': 7, 'assignedTo': [1, 3, 4], 'status': 3,
+    },
+    {
+        'title': 'CSS Architecture Planning',
+        'description': 'Define CSS naming conventions and structure.',
+        'subtasks': [
+            {'title': 'Establish CSS methodology', 'done': True},
+            {'title': 'Setup base styles', 'done': True},
+        ],
+        'priority': 3, 'category': 2, 'due_in_days': 3, 'assignedTo': [0, 4], 'status': 4,
+    },
+    {
+        'title': 'Contact Form & Imprint',
+        'description': 'Create a contact form and imprint page.',
+        'subtasks': [
+            {'title': 'Create contact form', 'done': False},
+            {'title': 'Set up imprint page', 'done': False},
+        ],
+        'priority': 3, 'category': 1, 'due_in_days': 5, 'assignedTo': [2], 'status': 1,
+    },
+]
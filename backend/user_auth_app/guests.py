@@ -0,0 +1,149 @@
+"""
+Pool of ephemeral guest accounts.
+
+Guests are provisioned in bulk ahead of time, each with a token and a
+copy of the template contacts and tasks, so claiming one on login is a
+single conditional UPDATE. Expired guests are reclaimed in batches.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from contacts_app.models import Contact
+from tasks_app.models import ArchivedTask, Task
+from tasks_app.workload import replace_assignments
+from . import guest_template
+from .models import GuestAccount
+
+
+def provision_guests(count):
+    """
+    Create ``count`` pooled guest accounts with template data.
+
+    Users, tokens, guest markers, contacts and tasks are each inserted
+    with a single ``bulk_create`` inside one transaction.
+
+    Args:
+        count: Number of guest accounts to create.
+
+    Returns:
+        list: The created GuestAccount instances.
+    """
+    if count <= 0:
+        return []
+    today = timezone.localdate()
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(
+                username=f'guest-{uuid.uuid4().hex[:16]}@guest.join',
+                email='', first_name='Guest', last_name='User',
+                password=make_password(None),
+            )
+            for _ in range(count)
+        ])
+        Token.objects.bulk_create([
+            Token(key=Token.generate_key(), user=user) for user in users
+        ])
+        guests = GuestAccount.objects.bulk_create([
+            GuestAccount(user=user) for user in users
+        ])
+        contacts = Contact.objects.bulk_create([
+            Contact(uid=user, **fields)
+            for user in users for fields in guest_template.CONTACTS
+        ])
+        per_user = len(guest_template.CONTACTS)
+        tasks = []
+        for offset, user in enumerate(users):
+            ids = [c.pk for c in contacts[offset * per_user:(offset + 1) * per_user]]
+            for fields in guest_template.TASKS:
+                fields = dict(fields)
+                due_in_days = fields.pop('due_in_days')
+                fields['assignedTo'] = [ids[index] for index in fields['assignedTo']]
+                tasks.append(Task(
+                    owner=user, dueDate=today + timedelta(days=due_in_days),
+                    **fields
+                ))
+        Task.objects.bulk_create(tasks)
+        replace_assignments(
+            {
+                'id': task.pk, 'assignedTo': task.assignedTo, 'status': task.status,
+                'priority': task.priority, 'owner': task.owner_id,
+            }
+            for task in tasks
+        )
+    return guests
+
+
+def fill_pool(size=None):
+    """Top the pool of unclaimed guests up to ``size`` accounts."""
+    size = settings.GUEST_POOL_SIZE if size is None else size
+    pooled = GuestAccount.objects.filter(claimed_at__isnull=True).count()
+    return provision_guests(size - pooled)
+
+
+def claim_guest():
+    """
+    Hand out one pooled guest account to a visitor.
+
+    Candidates are claimed with ``UPDATE ... WHERE claimed_at IS NULL``
+    so two concurrent visitors never get the same account. When the
+    pool is empty a fresh account is provisioned on the spot.
+
+    Returns:
+        GuestAccount: The claimed account, with ``user`` loaded.
+    """
+    now = timezone.now()
+    expires = now + timedelta(seconds=settings.GUEST_TTL)
+    for _ in range(5):
+        candidates = list(
+            GuestAccount.objects.filter(claimed_at__isnull=True)
+            .order_by('created_at').values_list('pk', flat=True)[:5]
+        )
+        if not candidates:
+            candidates = [guest.pk for guest in provision_guests(1)]
+        for pk in candidates:
+            claimed = GuestAccount.objects.filter(
+                pk=pk, claimed_at__isnull=True
+            ).update(claimed_at=now, expires_at=expires)
+            if claimed:
+                return GuestAccount.objects.select_related('user').get(pk=pk)
+    raise RuntimeError('Could not claim a guest account.')
+
+
+def reclaim_expired(batch_size=200, now=None):
+    """
+    Delete expired guests and their data in batches.
+
+    Each batch deletes the guests' tasks, contacts and tokens with set
+    based deletes in one short transaction before removing the users.
+
+    Args:
+        batch_size: Number of guest accounts removed per transaction.
+        now: Reference time, defaults to the current time.
+
+    Yields:
+        int: Number of guests removed by each batch.
+    """
+    now = now or timezone.now()
+    while True:
+        ids = list(
+            GuestAccount.objects.filter(expires_at__lt=now)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        with transaction.atomic():
+            Task.objects.filter(owner_id__in=ids).delete()
+            ArchivedTask.objects.filter(owner_id__in=ids).delete()
+            Contact.objects.filter(uid_id__in=ids).delete()
+            Token.objects.filter(user_id__in=ids).delete()
+            GuestAccount.objects.filter(pk__in=ids).delete()
+            User.objects.filter(pk__in=ids).delete()
+        yield len(ids)
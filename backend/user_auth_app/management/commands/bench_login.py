@@ -0,0 +1,57 @@
+"""
+Benchmark of password verification cost per hashing profile.
+
+Password verification dominates a login request, so the number of
+verifications per second on one thread approximates the logins per
+second a single core can serve.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from core.counters import get_store
+
+
+class Command(BaseCommand):
+    """Measure logins per second per core for each hasher profile."""
+
+    help = 'Benchmark password hashing profiles in logins/second/core.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        budget = options['seconds']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Preferred profile: {settings.PASSWORD_HASHER}'
+        ))
+        for name, path in settings.PASSWORD_HASHER_PROFILES.items():
+            hasher = import_string(path)()
+            try:
+                encoded = hasher.encode('SuperSafeGuest123!', hasher.salt())
+            except ValueError as exc:
+                self.stdout.write(f'{name:<8} unavailable: {exc}')
+                continue
+            rounds, start = 0, time.process_time()
+            while time.process_time() - start < budget:
+                hasher.verify('SuperSafeGuest123!', encoded)
+                rounds += 1
+            elapsed = time.process_time() - start
+            self.stdout.write(
+                f'{name:<8} {rounds / elapsed:>8.1f} logins/s/core '
+                f'{elapsed / rounds * 1000:>8.1f} ms/login'
+            )
+
+        store = get_store()
+        rounds, start = 0, time.perf_counter()
+        while time.perf_counter() - start < budget / 4:
+            store.hit('bench_login_ratelimit', 60)
+            rounds += 1
+        elapsed = time.perf_counter() - start
+        store.reset('bench_login_ratelimit')
+        self.stdout.write(
+            f'{"ratelimit":<8} {elapsed / rounds * 1e6:>8.1f} us/hit'
+        )
@@ -0,0 +1,27 @@
+"""
+Management command deleting the users marked for deletion.
+"""
+
+from django.core.management.base import BaseCommand
+
+from user_auth_app.deletion import delete_marked
+
+
+class Command(BaseCommand):
+    """Remove marked users and their dependent rows in batches."""
+
+    help = 'Delete users marked for deletion and their data in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        totals = {}
+        for label, count in delete_marked(options['batch_size']):
+            totals[label] = totals.get(label, 0) + count
+            self.stdout.write(f'{label}: {totals[label]} rows so far...')
+        users = totals.pop('auth.User', 0)
+        rows = ', '.join(f'{label} {count}' for label, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {users} users' + (f' ({rows}).' if rows else '.')
+        ))
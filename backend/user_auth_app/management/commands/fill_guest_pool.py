@@ -0,0 +1,25 @@
+"""
+Management command provisioning pooled guest accounts.
+"""
+
+from django.core.management.base import BaseCommand
+
+from user_auth_app.guests import fill_pool
+
+
+class Command(BaseCommand):
+    """Top the guest pool up to GUEST_POOL_SIZE unclaimed accounts."""
+
+    help = 'Provision unclaimed guest accounts with template data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=None,
+            help='Target number of unclaimed guests (default: GUEST_POOL_SIZE).'
+        )
+
+    def handle(self, *args, **options):
+        created = fill_pool(options['size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Provisioned {len(created)} guest accounts.'
+        ))
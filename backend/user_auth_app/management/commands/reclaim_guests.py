@@ -0,0 +1,30 @@
+"""
+Management command deleting expired guest accounts and their data.
+"""
+
+from django.core.management.base import BaseCommand
+
+from user_auth_app.guests import fill_pool, reclaim_expired
+
+
+class Command(BaseCommand):
+    """Reclaim expired guests in batches, then refill the pool."""
+
+    help = 'Delete expired guest accounts, their tasks and contacts in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--no-refill', action='store_true',
+            help='Do not top the pool up after reclaiming.'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for removed in reclaim_expired(options['batch_size']):
+            total += removed
+            self.stdout.write(f'Reclaimed {total} guests so far...')
+        self.stdout.write(self.style.SUCCESS(f'Reclaimed {total} expired guests.'))
+        if not options['no_refill']:
+            created = fill_pool()
+            self.stdout.write(f'Provisioned {len(created)} guest accounts.')
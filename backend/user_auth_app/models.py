@@ -1,9 +1,73 @@
 """
 Model definitions for the user authentication application.
 
-This module can contain additional user-related models. Currently uses
-Django's built-in User model.
+Uses Django's built-in User model for accounts. The GuestAccount model
+marks users that belong to the pool of ephemeral demo accounts, the
+UserDeletion model users whose account is being deleted.
 """
 
 from django.contrib.auth.models import User
-from django.db import models
\ No newline at end of file
+from django.db import models
+
+
+class GuestAccount(models.Model):
+    """
+    Model marking a user as an ephemeral guest account.
+
+    Guests are provisioned ahead of time into a pool, claimed by one
+    visitor each and reclaimed together with their data once expired.
+
+    Attributes:
+        user: The guest's user account.
+        created_at: When the account was provisioned.
+        claimed_at: When a visitor claimed it, ``None`` while pooled.
+        expires_at: When the account becomes eligible for reclaiming.
+    """
+
+    user = models.OneToOneField(
+        User, primary_key=True, on_delete=models.CASCADE,
+        related_name='guest_account'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        """Return a string representation of the guest account."""
+        return f"{self.user_id} {'claimed' if self.claimed_at else 'pooled'}"
+
+
+class UserDeletion(models.Model):
+    """
+    Model marking a user whose account is queued for deletion.
+
+    The user is deactivated when the marker is created; the marker goes
+    away together with the user once all dependent rows are deleted.
+
+    Attributes:
+        user: The user being deleted.
+        requested_at: When the deletion was requested.
+    """
+
+    user = models.OneToOneField(
+        User, primary_key=True, on_delete=models.CASCADE,
+        related_name='deletion'
+    )
+    requested_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """Return a string representation of the deletion marker."""
+        return f'{self.user_id} deleting since {self.requested_at:%Y-%m-%d %H:%M}'
+
+
+def is_guest(user):
+    """
+    Return True if ``user`` is an ephemeral guest account.
+
+    The answer is cached on the user object for the rest of the request.
+    """
+    if not getattr(user, 'is_authenticated', False):
+        return False
+    if not hasattr(user, '_is_guest'):
+        user._is_guest = GuestAccount.objects.filter(pk=user.pk).exists()
+    return user._is_guest
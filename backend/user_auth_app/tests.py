@@ -1,3 +1,195 @@
-from django.test import TestCase
+"""
+Tests for the user authentication application API.
+"""
 
-# Create your tests here.
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from io import StringIO
+from unittest import skipIf
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from contacts_app.models import Contact
+from core.renderers import msgpack
+from jobs_app.models import Job
+from tasks_app.models import Task
+from user_auth_app import guest_template
+from user_auth_app.guests import fill_pool, reclaim_expired
+
+MSGPACK = 'application/msgpack'
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+class UserMessagePackTests(APITestCase):
+    """MessagePack responses and requests must round-trip the JSON API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'ada@example.com', email='ada@example.com', password='pw-12345678',
+            first_name='Ada', last_name='Lovelace',
+        )
+
+    def test_user_list_matches_json(self):
+        as_json = self.client.get('/api/v1/auth/users/', HTTP_ACCEPT='application/json')
+        as_msgpack = self.client.get('/api/v1/auth/users/', HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(msgpack.unpackb(as_msgpack.content), as_json.json())
+
+    def test_login_with_msgpack(self):
+        response = self.client.post(
+            '/api/v1/auth/login/',
+            msgpack.packb({'username': 'ada@example.com', 'password': 'pw-12345678'}),
+            content_type=MSGPACK, HTTP_ACCEPT=MSGPACK,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(msgpack.unpackb(response.content)['id'], self.user.id)
+
+    def test_registration_with_msgpack(self):
+        response = self.client.post(
+            '/api/v1/auth/registration/',
+            msgpack.packb({
+                'first_name': 'Grace', 'last_name': 'Hopper',
+                'email': 'grace@example.com', 'password': 'pw-12345678',
+            }),
+            content_type=MSGPACK, HTTP_ACCEPT=MSGPACK,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content)['username'], 'grace@example.com')
+
+
+@override_settings(LOGIN_FAILURE_LIMIT=2)
+class LoginProtectionTests(APITestCase):
+    """Failed logins lock the account and old hashes are upgraded."""
+
+    def setUp(self):
+        self.user = User.objects.create(
+            username='legacy@example.com', email='legacy@example.com',
+            password=make_password('pw-12345678', hasher='pbkdf2_sha1'),
+        )
+        # A fresh counter store per test: account-wide counts outlive resets.
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        store = self.settings(RATE_LIMIT_STORE_PATH=Path(directory) / 'counters.sqlite3')
+        store.enable()
+        self.addCleanup(store.disable)
+
+    def login(self, password, ip='127.0.0.1'):
+        return self.client.post(
+            '/api/v1/auth/login/',
+            {'username': 'legacy@example.com', 'password': password}, format='json',
+            REMOTE_ADDR=ip,
+        )
+
+    def test_account_is_locked_after_repeated_failures(self):
+        self.assertEqual(self.login('wrong').status_code, 401)
+        self.assertEqual(self.login('wrong').status_code, 401)
+        response = self.login('pw-12345678')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_lock_applies_only_to_the_failing_address(self):
+        self.login('wrong', ip='203.0.113.9')
+        self.login('wrong', ip='203.0.113.9')
+        self.assertEqual(self.login('pw-12345678', ip='203.0.113.9').status_code, 429)
+        self.assertEqual(self.login('pw-12345678').status_code, 200)
+
+    @override_settings(LOGIN_ACCOUNT_FAILURE_LIMIT=3, LOGIN_ACCOUNT_BACKOFF=60)
+    def test_guessing_from_many_addresses_is_slowed_down(self):
+        self.assertEqual(self.login('pw-12345678').status_code, 200)
+        for index in range(3):
+            self.assertEqual(self.login('wrong', ip=f'203.0.113.{index}').status_code, 401)
+        # One attempt per backoff period for clients new to the account.
+        self.assertEqual(self.login('wrong', ip='203.0.113.7').status_code, 401)
+        response = self.login('pw-12345678', ip='203.0.113.8')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        # The owner's known client is not held back.
+        self.assertEqual(self.login('pw-12345678').status_code, 200)
+
+    def test_non_object_body_is_rejected(self):
+        response = self.client.post(
+            '/api/v1/auth/login/', [{'username': 'legacy@example.com'}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_successful_login_rehashes_with_preferred_hasher(self):
+        self.assertEqual(self.login('pw-12345678').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+
+@override_settings(GUEST_POOL_SIZE=2)
+class GuestPoolTests(APITestCase):
+    """Visitors get isolated guest accounts from a pool."""
+
+    def claim(self):
+        response = self.client.post('/api/v1/auth/guest/')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_each_visitor_gets_own_seeded_account(self):
+        fill_pool()
+        first, second = self.claim(), self.claim()
+        self.assertNotEqual(first['id'], second['id'])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {first["token"]}')
+        tasks = self.client.get('/api/v1/task/').json()
+        contacts = self.client.get('/api/v1/contact/').json()
+        self.assertEqual(len(tasks), len(guest_template.TASKS))
+        self.assertEqual(len(contacts), len(guest_template.CONTACTS))
+        contact_ids = {c['id'] for c in contacts}
+        for task in tasks:
+            self.assertTrue(set(task['assignedTo']) <= contact_ids)
+
+    def test_guest_data_is_hidden_from_registered_users(self):
+        guest = self.claim()
+        user = User.objects.create_user('member', password='pw-12345678')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get('/api/v1/task/').json(), [])
+        users = self.client.get('/api/v1/auth/users/').json()
+        self.assertNotIn(guest['id'], [u['id'] for u in users])
+
+    def test_expired_guests_are_reclaimed_with_their_data(self):
+        guest = self.claim()
+        later = timezone.now() + timedelta(days=2)
+        self.assertEqual(sum(reclaim_expired(now=later)), 1)
+        self.assertFalse(User.objects.filter(pk=guest['id']).exists())
+        self.assertFalse(Task.objects.filter(owner_id=guest['id']).exists())
+        self.assertFalse(Contact.objects.filter(uid_id=guest['id']).exists())
+
+
+class UserDeletionTests(APITestCase):
+    """Deleted users are deactivated at once and purged in batches."""
+
+    def test_delete_marks_user_and_job_removes_data(self):
+        user = User.objects.create_user('leaving', password='pw-12345678')
+        other = User.objects.create_user('staying', password='pw-12345678')
+        Contact.objects.bulk_create(
+            Contact(firstName='C', lastName=str(index), uid=user) for index in range(7)
+        )
+        task = Task.objects.create(title='Shared', priority=1, dueDate='2025-06-01', owner=user)
+        Contact.objects.create(firstName='Kept', lastName='C', uid=other)
+        self.client.force_authenticate(user)
+
+        response = self.client.delete(f'/api/v1/auth/users/{user.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.has_header('Location'))
+        job = Job.objects.get(name='delete_users')
+        self.assertIsNone(job.created_by)
+        self.assertFalse(User.objects.get(pk=user.pk).is_active)
+        users = self.client.get('/api/v1/auth/users/').json()
+        self.assertNotIn(user.pk, [u['id'] for u in users])
+
+        out = StringIO()
+        call_command('delete_users', batch_size=3, stdout=out)
+        self.assertIn('contacts_app.Contact: 6 rows so far', out.getvalue())
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertEqual(Contact.objects.get().uid, other)
+        task.refresh_from_db()
+        self.assertIsNone(task.owner)
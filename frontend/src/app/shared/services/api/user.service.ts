@@ -112,13 +112,24 @@ export class UserService {
     }
 
     /**
-     * Logs in as a guest user anonymously
-     * @returns {Promise<any>} Promise that resolves when guest login is successful
+     * Logs in as a guest user anonymously.
+     * Each visitor receives their own temporary guest account with demo data.
+     * @returns {Promise<AuthUser>} Promise that resolves when guest login is successful
      */
-    async loginGuest() {
-        const email = 'guest@join.com'
-        const password = 'SuperSafeGuest123!'
-
-        await this.login(email, password)
+    async loginGuest(): Promise<AuthUser> {
+        const response = await firstValueFrom(this.http.post<AuthUser>(GlobalConfig.apiUrl + this.apiEndpoint + 'guest/', {})).catch(error => {
+            if (error instanceof HttpErrorResponse && error.status === 0) {
+                this.notify.pushNotification('Cannot connect to server. Please try again later.', NotificationType.ERROR, NotificationPosition.BOTTOM_RIGHT, 8000);
+                throw new Error('Cannot connect to server.');
+            } else {
+                throw error;
+            }
+        });
+        const token = response.token;
+        sessionStorage.setItem('authToken', token);
+        GlobalConfig.token = token;
+        this.user = response;
+        sessionStorage.setItem('user', JSON.stringify(this.user));
+        return response
     }
 }
@@ -0,0 +1,61 @@
+#!/bin/bash
+# Load test of the scale-out mode: throughput of 1 to 4 backend replicas
+#
+# Brings the stack up with docker-compose.scale.yml at every replica count,
+# runs `manage.py load_test` (a poll-heavy request mix) from a one-off
+# worker container against Traefik and prints the requests per second of
+# each step next to the speedup over the first one. Every replica is capped
+# at BACKEND_REPLICA_CPUS (default 1), so the steps compare 1 to 4 CPUs of
+# backend; the host needs about two cores more for Traefik and the load
+# generator, or the numbers flatten out early.
+#
+# Usage: ./scale-test.sh
+#   REPLICA_COUNTS="1 2 3 4"  replica counts to measure
+#   LOADTEST_DURATION=30      seconds measured per step (after a 5 s warm-up)
+#   LOADTEST_CONNECTIONS=32   concurrent keep-alive connections
+#   LOADTEST_WRITE_RATIO=0    share of task updates in the mix
+#   LOADTEST_SEED_TASKS=0     seed this many synthetic tasks first (manage.py seed)
+
+set -e
+
+GREEN='\033[0;32m'
+NC='\033[0m' # No Color
+
+COMPOSE="docker compose -f docker-compose.yml -f docker-compose.scale.yml"
+REPLICA_COUNTS=${REPLICA_COUNTS:-1 2 3 4}
+DURATION=${LOADTEST_DURATION:-30}
+CONNECTIONS=${LOADTEST_CONNECTIONS:-32}
+WRITE_RATIO=${LOADTEST_WRITE_RATIO:-0}
+SEED_TASKS=${LOADTEST_SEED_TASKS:-0}
+
+export BACKEND_REPLICA_CPUS=${BACKEND_REPLICA_CPUS:-1}
+# The load users would run into the per-user budgets otherwise.
+export DJANGO_THROTTLE_READ=${LOADTEST_THROTTLE:-1000000/min}
+export DJANGO_THROTTLE_WRITE=${LOADTEST_THROTTLE:-1000000/min}
+
+if [ "$SEED_TASKS" -gt 0 ]; then
+    echo "Seeding $SEED_TASKS tasks..."
+    $COMPOSE up -d --wait --scale backend=1 traefik backend
+    $COMPOSE exec -T --index 1 backend python manage.py seed \
+        --users 50 --contacts $((SEED_TASKS / 10)) --tasks "$SEED_TASKS"
+fi
+
+results=()
+for replicas in $REPLICA_COUNTS; do
+    echo
+    echo -e "${GREEN}== $replicas backend replica(s) ==${NC}"
+    $COMPOSE up -d --wait --scale backend="$replicas" traefik backend
+    result=$($COMPOSE run --rm --no-deps -T --entrypoint python worker \
+        manage.py load_test --url http://traefik --host "${LOADTEST_HOST:-localhost}" \
+        --duration "$DURATION" --processes 2 --concurrency $((CONNECTIONS / 2)) \
+        --write-ratio "$WRITE_RATIO" --label "$replicas" | tee /dev/stderr | grep '^RESULT')
+    results+=("$result")
+done
+
+echo
+echo -e "${GREEN}Replicas     req/s   speedup   linear        p95${NC}"
+# RESULT <replicas> <req/s> req/s <ok/s> ok/s p95 <ms> ms
+printf '%s\n' "${results[@]}" | awk '
+    NR == 1 { base = $3; first = $2 }
+    { printf "%8s %9.1f %8.2fx %7.2fx %7s ms\n", $2, $3, $3 / base, $2 / first, $8 }
+'